@@ -44,6 +44,10 @@ plt.rcParams['grid.linewidth'] = 0.8
 
 class ChartDesign:
 
+    def __init__(self, analyzer=None):
+        # share the app-wide analyzer (and its pooled connections) instead of building one per chart
+        self.analyzer = analyzer or SalesAnalyzer()
+
     def convert_to_base64(self, fig):
         # change chart to base64 which can be used by html
         buffer = io.BytesIO()
@@ -54,7 +58,7 @@ class ChartDesign:
         return f"data:image/png;base64,{image_base64}"
 
     def generate_bar_chart_top5_slow_products(self):
-        sql = SalesAnalyzer()
+        sql = self.analyzer
 
         data = sql.top5_slow_products()
 
@@ -113,7 +117,7 @@ class ChartDesign:
         }
 
     def generate_scatter_price_vs_days(self):
-        sql = SalesAnalyzer()
+        sql = self.analyzer
 
         data = sql.price_vs_days()
 
@@ -190,7 +194,7 @@ class ChartDesign:
         }
 
     def generate_pie_warehouse_distribution(self):
-        sql = SalesAnalyzer()
+        sql = self.analyzer
 
         data = sql.warehouse_distribution()
 
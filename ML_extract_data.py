@@ -1,5 +1,6 @@
 import pandas as pd
 from database import DatabaseManager
+from data_writers import iter_formatted
 
 
 class ml_data():
@@ -7,8 +8,7 @@ class ml_data():
         self.mysql = DatabaseManager()
         self.mysql.connect()  # test connect
 
-    def extract(self):
-        query = """
+    query = """
         SELECT 
             o.order_id,
             o.order_time,
@@ -33,23 +33,79 @@ class ml_data():
         WHERE o.order_time >= '2024-01-01'
         """
 
-        # conncect to database
-        conn = self.mysql.get_connection()
+    def iter_chunks(self, chunk_size=None):
+        """Stream the extract as DataFrame chunks (server-side cursor, bounded memory)"""
+        return self.mysql.read_chunks(self.query, chunk_size=chunk_size)
+
+    def iter_since(self, watermark=None, chunk_size=None):
+        """
+        Only rows with order_time after `watermark` (None: everything), oldest first.
+        Uses the orders.order_time index, so the cost follows the new rows, not the history.
+        """
+        if watermark is None:
+            return self.mysql.read_chunks(self.query + " ORDER BY o.order_time", chunk_size=chunk_size)
+        return self.mysql.read_chunks(self.query + " AND o.order_time > %s ORDER BY o.order_time",
+                                      params=(watermark,), chunk_size=chunk_size)
+
+    def extract(self):
+        # read data from database chunk by chunk, then build one frame for training
+        chunks = list(self.iter_chunks())
+        if not chunks:
+            return pd.DataFrame()
+        return pd.concat(chunks, ignore_index=True)
+
+    def export_csv(self, path, chunk_size=None):
+        """Write the extract to CSV without holding it in memory; returns the row count"""
+        rows = 0
+        for i, chunk in enumerate(self.iter_chunks(chunk_size)):
+            chunk.to_csv(path, mode='w' if i == 0 else 'a', header=(i == 0), index=False)
+            rows += len(chunk)
+        return rows
+
+
+def extract_from_files(path, months=None, since=None):
+    """
+    Same columns as ml_data.query, read from a data_writers.py dataset directory
+    instead of MySQL (months: e.g. ['2024-03', '2024-04'] to read only those partitions;
+    since: keep only orders placed after that time, like ml_data.iter_since)
+    """
+    def frame(table, **kwargs):
+        chunks = [pd.DataFrame(chunk) for chunk in iter_formatted(path, table, **kwargs)]
+        return pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame()
+
+    orders = frame('orders', months=months)
+    if orders.empty:
+        return pd.DataFrame()
+
+    inform = frame('inform', months=months).rename(columns={'status': 'order_status'})
+    products = frame('products').rename(columns={'type': 'product_category'})
+    warehouses = frame('warehouses').rename(columns={'location': 'warehouse_location'})
+
+    df = (orders.merge(inform, on='order_id')
+          .merge(products[['product_id', 'product_name', 'product_category', 'price', 'manufacturer']],
+                 on='product_id')
+          .merge(warehouses, on='warehouse_id'))
+
+    df['order_time'] = pd.to_datetime(df['order_time'])
+    df = df[df['order_time'] >= '2024-01-01']
+    if since is not None:
+        df = df[df['order_time'] > pd.Timestamp(since)]
+
+    # HOUR / DAYOFWEEK (Sunday = 1) / MONTH, as in the SQL extract
+    df['order_hour'] = df['order_time'].dt.hour
+    df['order_day'] = (df['order_time'].dt.dayofweek + 1) % 7 + 1
+    df['order_month'] = df['order_time'].dt.month
 
-        try:
-            # read data from database
-            df = pd.read_sql(query, conn)
-            return df
-        finally:
-            if conn:
-                conn.close()
+    return df[['order_id', 'order_time', 'product_id', 'product_name', 'product_category', 'price',
+               'manufacturer', 'orderquantity', 'order_status', 'warehouse_id', 'warehouse_location',
+               'user_id', 'order_hour', 'order_day', 'order_month']].reset_index(drop=True)
 
 
-test = ml_data()
-df = test.extract()
+if __name__ == "__main__":
+    test = ml_data()
 
-# Save to CSV for future use
-save_csv = True
-if save_csv:
-   df.to_csv('warehouse_data.csv', index=False)
-   print("\n✓ Data saved to 'warehouse_data.csv'")
+    # Save to CSV for future use
+    save_csv = True
+    if save_csv:
+        count = test.export_csv('warehouse_data.csv')
+        print(f"\n✓ {count} rows saved to 'warehouse_data.csv'")
@@ -1,5 +1,4 @@
-import os
-from dotenv import load_dotenv  # load .env file
+from settings import get_settings
 from google import genai
 from google.genai.errors import APIError
 
@@ -8,10 +7,8 @@ class PromotionAdvisor:
     def __init__(self, env_file='config.env'):
         # Initialization class
 
-        # load API
-        load_dotenv('config.env')
-        # get API KEY
-        api_key = os.environ.get("GEMINI_API_KEY")
+        # get API KEY (config.env is loaded once by the shared settings)
+        api_key = get_settings(env_file).gemini_api_key
 
         # NOTE: For Canvas environment, api_key is often empty and handled by the runtime
         if not api_key:
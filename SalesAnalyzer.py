@@ -1,170 +1,204 @@
-import os
-import tempfile
-from dotenv import load_dotenv
-import mysql.connector
-from mysql.connector import Error
 from datetime import datetime, timedelta
-from PromotionAdvisor import PromotionAdvisor
+from database import DatabaseManager
+from settings import get_settings
+from snapshot_cache import SnapshotCache
+
+
+# Slow-moving rule shared by every view: supplied at least 10 days ago
+MIN_DAYS_IN_STOCK = 10
+
+# One row per stocked product/warehouse with everything the dashboard derives from:
+# catalog data, warehouse, sell-through summary and trailing 30-day sales
+INVENTORY_SNAPSHOT_QUERY = """
+SELECT 
+    p.product_id,
+    p.product_name,
+    p.type,
+    p.price,
+    p.manufacturer,
+    sr.warehouse_id,
+    w.location,
+    sr.storequantity as stock_quantity,
+    s.supplier_id,
+    s.supply_quantity,
+    s.first_supply_time as supply_time,
+    DATEDIFF(CURDATE(), DATE(s.first_supply_time)) as days_in_stock,
+    s.sell_through_rate,
+    COALESCE(ms.monthly_sales, 0) as monthly_sales
+FROM store_records sr
+JOIN products p
+    ON sr.product_id = p.product_id
+JOIN warehouses w
+    ON sr.warehouse_id = w.warehouse_id
+LEFT JOIN product_sell_through s
+    ON sr.product_id = s.product_id
+    AND sr.warehouse_id = s.warehouse_id
+LEFT JOIN (
+    SELECT ds.product_id, ds.warehouse_id, SUM(ds.quantity) as monthly_sales
+    FROM daily_sales ds
+    WHERE ds.sale_date >= DATE_SUB(CURDATE(), INTERVAL 30 DAY)
+    GROUP BY ds.product_id, ds.warehouse_id
+) ms
+    ON sr.product_id = ms.product_id
+    AND sr.warehouse_id = ms.warehouse_id
+"""
+
+CATEGORY_PERFORMANCE_QUERY = """
+SELECT 
+    p.type as category,
+    COUNT(DISTINCT p.product_id) as total_products,
+    AVG(sr.storequantity) as avg_stock,
+    SUM(CASE 
+        WHEN sr.storequantity > 100 THEN 1 
+        ELSE 0 
+    END) as high_stock_count
+FROM products p
+LEFT JOIN store_records sr ON p.product_id = sr.product_id
+GROUP BY p.type
+ORDER BY high_stock_count DESC
+"""
+
+# Trailing-N-day units sold from the daily rollup: a PK range over at most N rows
+TRAILING_SALES_QUERY = """
+SELECT COALESCE(SUM(quantity), 0) as total
+FROM daily_sales
+WHERE product_id = %s
+    AND sale_date >= DATE_SUB(CURDATE(), INTERVAL %s DAY)
+"""
+
+TRAILING_SALES_BY_WAREHOUSE_QUERY = TRAILING_SALES_QUERY + """    AND warehouse_id = %s
+"""
+
+
+def _avg(values):
+    """AVG(): NULLs are ignored"""
+    values = [v for v in values if v is not None]
+    return sum(values) / len(values) if values else None
+
+
+def _min(values):
+    """MIN(): NULLs are ignored, None if every value is NULL"""
+    return min((v for v in values if v is not None), default=None)
+
+
+def _group_by_name(rows):
+    """GROUP BY product_name, keeping first-seen order"""
+    groups = {}
+    for row in rows:
+        groups.setdefault(row['product_name'], []).append(row)
+    return groups
+
+
+def _is_slow(row, max_rate):
+    return (row['sell_through_rate'] is not None
+            and row['days_in_stock'] is not None
+            and row['days_in_stock'] >= MIN_DAYS_IN_STOCK
+            and row['sell_through_rate'] < max_rate)
 
 
 class SalesAnalyzer:
+    # Shared by every analyzer in the process (see get_inventory_snapshot)
+    _snapshot_cache = None
+
     def __init__(self):
-        # Load environment variables first
-        load_dotenv('config.env')
+        # Shared process-wide settings (config.env is loaded once)
+        settings = get_settings()
+        self.db = DatabaseManager()
 
         # Then get the constants
-        self.ANALYSIS_DAYS = int(os.environ.get('ANALYSIS_DAYS', 30))
-        self.LOW_SALES_THRESHOLD = int(os.environ.get('LOW_SALES_THRESHOLD', 10))
-
-        # Database configuration
-        ssl_ca_content = os.environ.get('DB_SSL_CA_CONTENT')
-        if ssl_ca_content:
-
-            temp_file = tempfile.NamedTemporaryFile(mode='w', delete=False)
-            temp_file.write(ssl_ca_content)
-            temp_file.close()
-
-        DB_CONFIG = {
-            'host': os.environ.get('DB_HOST'),
-            'database': os.environ.get('DB_DATABASE'),
-            'user': os.environ.get('DB_USER'),
-            'password': os.environ.get('DB_PASSWORD'),
-            'port': int(os.environ.get('DB_PORT', 5432)),
-            'ssl_ca': temp_file.name,
-            'ssl_verify_cert': bool(os.environ.get('DB_SSL_VERIFY_CERT')) == True
-        }
+        self.ANALYSIS_DAYS = settings.analysis_days
+        self.LOW_SALES_THRESHOLD = settings.low_sales_threshold
 
-        self.config = DB_CONFIG.copy()
-        self.config['use_pure'] = True
+        if SalesAnalyzer._snapshot_cache is None:
+            SalesAnalyzer._snapshot_cache = SnapshotCache(
+                'inventory_snapshot',
+                self._load_inventory_snapshot,
+                ttl=settings.snapshot_ttl,
+                cache_dir=settings.snapshot_cache_dir
+            )
 
     def _get_connection(self):
-        """Connect to database"""
-        try:
-            return mysql.connector.connect(**self.config)
-        except Error as e:
-            print(f"Connection failed: {e}")
+        """Borrow a connection from the shared pool"""
+        return self.db.get_connection()
+
+    def _load_inventory_snapshot(self):
+        """Run the snapshot and category queries over one connection; None on failure"""
+        results = self.db.fetch_many([
+            ('inventory', INVENTORY_SNAPSHOT_QUERY),
+            ('category_performance', CATEGORY_PERFORMANCE_QUERY)
+        ], dictionary=True)
+
+        if results is None:
+            return None
+
+        # Calculate percentages
+        for row in results['category_performance']:
+            if row['total_products'] > 0:
+                row['high_stock_percentage'] = round(
+                    (row['high_stock_count'] / row['total_products']) * 100, 2
+                )
+            else:
+                row['high_stock_percentage'] = 0.0
+
+            # Round avg_stock
+            if row['avg_stock']:
+                row['avg_stock'] = round(row['avg_stock'], 2)
+
+        return results
+
+    def get_inventory_snapshot(self):
+        """Cached inventory snapshot rows (refreshed every SNAPSHOT_TTL_SECONDS)"""
+        snapshot = self._snapshot_cache.get()
+        if snapshot is None:
             return None
 
+        return snapshot['inventory']
+
+    def invalidate_snapshot(self):
+        """Drop the cached snapshot so the next view re-queries MySQL"""
+        self._snapshot_cache.invalidate()
+
+    def snapshot_stats(self):
+        return self._snapshot_cache.stats()
+
     def get_slow_moving_products(self, days=None):
 
         if days is None:
             days = self.ANALYSIS_DAYS
 
-        conn = None
-        cursor = None
-
-        try:
-            conn = self._get_connection()
-            if not conn:
-                return None
-
-            cursor = conn.cursor(dictionary=True)
-
-            # Fixed SQL query based on your actual table structure
-            query = """
-            SELECT 
-                MIN(gs.supplier_id) as supplier_id,
-                MIN(p.product_id) as product_id,
-                p.product_name,
-                MIN(p.type) as type,
-                AVG(p.price) as price,
-                MIN(p.manufacturer) as manufacturer,
-                SUM(sr.storequantity) as stock_quantity,
-                SUM(gs.quantity) as supply_quantity,
-                MIN(sr.warehouse_id) as warehouse_id,
-                MIN(gs.supply_time) as supply_time,
-                MAX(DATEDIFF(CURDATE(), DATE(gs.supply_time))) as days_in_stock,
-                AVG(ROUND((gs.quantity - sr.storequantity) / gs.quantity, 2)) as sell_through_rate
-            FROM good_supply gs
-            LEFT JOIN store_records sr 
-                ON gs.warehouse_id = sr.warehouse_id 
-                AND gs.product_id = sr.product_id
-            LEFT JOIN products p
-                ON gs.product_id = p.product_id
-            WHERE DATEDIFF(CURDATE(), DATE(gs.supply_time)) >= 10
-                AND (gs.quantity - sr.storequantity) / gs.quantity < 0.4
-
-            GROUP BY p.product_name
-
-            ORDER BY sell_through_rate ASC
-            LIMIT 50
-            """
-
-            cursor.execute(query)
-            results = cursor.fetchall()
-
-            # Convert datetime to string
-            for row in results:
-                if row.get('supply_time'):
-                    row['supply_time'] = row['supply_time'].strftime('%Y-%m-%d %H:%M:%S')
-
-            return results
-
-        except Error as e:
-            print(f"Query failed: {e}")
-            print(f"Error details: {e}")
+        rows = self.get_inventory_snapshot()
+        if rows is None:
             return None
 
-        finally:
-            if cursor:
-                cursor.close()
-            if conn:
-                conn.close()
+        results = []
+        for name, group in _group_by_name(r for r in rows if _is_slow(r, 0.4)).items():
+            supply_time = _min(r['supply_time'] for r in group)
+            results.append({
+                'supplier_id': _min(r['supplier_id'] for r in group),
+                'product_id': min(r['product_id'] for r in group),
+                'product_name': name,
+                'type': _min(r['type'] for r in group),
+                'price': _avg([r['price'] for r in group]),
+                'manufacturer': _min(r['manufacturer'] for r in group),
+                'stock_quantity': sum(r['stock_quantity'] for r in group),
+                'supply_quantity': sum(r['supply_quantity'] for r in group),
+                'warehouse_id': min(r['warehouse_id'] for r in group),
+                # Convert datetime to string
+                'supply_time': supply_time.strftime('%Y-%m-%d %H:%M:%S') if supply_time else None,
+                'days_in_stock': max(r['days_in_stock'] for r in group),
+                'sell_through_rate': _avg([r['sell_through_rate'] for r in group])
+            })
+
+        results.sort(key=lambda r: r['sell_through_rate'])
+        return results[:50]
 
     def get_category_performance(self):
 
-        conn = None
-        cursor = None
-
-        try:
-            conn = self._get_connection()
-            if not conn:
-                return None
-
-            cursor = conn.cursor(dictionary=True)
-
-            query = """
-            SELECT 
-                p.type as category,
-                COUNT(DISTINCT p.product_id) as total_products,
-                AVG(sr.storequantity) as avg_stock,
-                SUM(CASE 
-                    WHEN sr.storequantity > 100 THEN 1 
-                    ELSE 0 
-                END) as high_stock_count
-            FROM products p
-            LEFT JOIN store_records sr ON p.product_id = sr.product_id
-            GROUP BY p.type
-            ORDER BY high_stock_count DESC
-            """
-
-            cursor.execute(query)
-            results = cursor.fetchall()
-
-            # Calculate percentages
-            for row in results:
-                if row['total_products'] > 0:
-                    row['high_stock_percentage'] = round(
-                        (row['high_stock_count'] / row['total_products']) * 100, 2
-                    )
-                else:
-                    row['high_stock_percentage'] = 0.0
-
-                # Round avg_stock
-                if row['avg_stock']:
-                    row['avg_stock'] = round(row['avg_stock'], 2)
-
-            return results
-
-        except Error as e:
-            print(f"Query failed: {e}")
+        snapshot = self._snapshot_cache.get()
+        if snapshot is None:
             return None
 
-        finally:
-            if cursor:
-                cursor.close()
-            if conn:
-                conn.close()
+        return snapshot['category_performance']
 
     def format_data_for_ai(self):
         """Format data for AI analysis"""
@@ -188,192 +222,92 @@ class SalesAnalyzer:
 
     def top5_slow_products(self):
 
-        conn = None
-        cursor = None
-
-        try:
-            conn = self._get_connection()
-            if not conn:
-                return None
-
-            cursor = conn.cursor(dictionary=True)
-
-            query = """
-            SELECT 
-                p.product_name,
-                AVG(ROUND((gs.quantity - sr.storequantity) / gs.quantity, 2)) as sell_through_rate
-            FROM good_supply gs
-            LEFT JOIN store_records sr 
-                ON gs.warehouse_id = sr.warehouse_id 
-                AND gs.product_id = sr.product_id
-            LEFT JOIN products p
-                ON gs.product_id = p.product_id
-            WHERE DATEDIFF(CURDATE(), DATE(gs.supply_time)) >= 10
-                AND (gs.quantity - sr.storequantity) / gs.quantity < 0.3
-
-            GROUP BY p.product_name
-
-            ORDER BY sell_through_rate ASC
-            LIMIT 5
-            """
-
-            cursor.execute(query)
-            results = cursor.fetchall()
-
-            return results
-
-        except Error as e:
-            print(f"Query failed: {e}")
+        rows = self.get_inventory_snapshot()
+        if rows is None:
             return None
 
-        finally:
-            if cursor:
-                cursor.close()
-            if conn:
-                conn.close()
-
-    def price_vs_days(self):
+        results = [
+            {'product_name': name, 'sell_through_rate': _avg([r['sell_through_rate'] for r in group])}
+            for name, group in _group_by_name(r for r in rows if _is_slow(r, 0.3)).items()
+        ]
 
-        conn = None
-        cursor = None
+        results.sort(key=lambda r: r['sell_through_rate'])
+        return results[:5]
 
-        try:
-            conn = self._get_connection()
-            if not conn:
-                return None
-
-            cursor = conn.cursor(dictionary=True)
-
-            query = """
-            SELECT 
-                p.price,
-                DATEDIFF(NOW(), gs.supply_time) as days_in_stock,
-                p.product_name
-            FROM products p
-            JOIN good_supply gs ON p.product_id = gs.product_id
-            WHERE gs.supply_time IS NOT NULL
-                AND DATEDIFF(NOW(), gs.supply_time) > 0
-            LIMIT 100
-            """
-
-            cursor.execute(query)
-            results = cursor.fetchall()
-
-            return results
+    def price_vs_days(self):
 
-        except Error as e:
-            print(f"Query failed: {e}")
+        rows = self.get_inventory_snapshot()
+        if rows is None:
             return None
 
-        finally:
-            if cursor:
-                cursor.close()
-            if conn:
-                conn.close()
-
-    def warehouse_distribution(self):
-
-        conn = None
-        cursor = None
-
-        try:
-            conn = self._get_connection()
-            if not conn:
-                return None
+        results = [
+            {'price': r['price'], 'days_in_stock': r['days_in_stock'], 'product_name': r['product_name']}
+            for r in rows
+            if r['days_in_stock'] is not None and r['days_in_stock'] > 0
+        ]
 
-            cursor = conn.cursor(dictionary=True)
+        return results[:100]
 
-            query = """
-            SELECT 
-                w.location,
-                w.warehouse_id,
-                SUM(sr.storequantity) as total_stock
-            FROM warehouses w
-            JOIN store_records sr ON w.warehouse_id = sr.warehouse_id
-            GROUP BY w.warehouse_id, w.location
-            ORDER BY total_stock DESC
-            """
-
-            cursor.execute(query)
-            results = cursor.fetchall()
-
-            return results
+    def warehouse_distribution(self):
 
-        except Error as e:
-            print(f"Query failed: {e}")
+        rows = self.get_inventory_snapshot()
+        if rows is None:
             return None
 
-        finally:
-            if cursor:
-                cursor.close()
-            if conn:
-                conn.close()
+        totals = {}
+        for r in rows:
+            entry = totals.setdefault(r['warehouse_id'], {
+                'location': r['location'],
+                'warehouse_id': r['warehouse_id'],
+                'total_stock': 0
+            })
+            entry['total_stock'] += r['stock_quantity'] or 0
+
+        return sorted(totals.values(), key=lambda r: r['total_stock'], reverse=True)
 
     def get_slow_moving_products_ML(self, days=30):
         """
         Get top 5 slowest-selling products with ML-required fields
         """
-        conn = None
-        cursor = None
-
-        try:
-            conn = self._get_connection()
-            if not conn:
-                return None
-
-            query = """
-            SELECT 
-                MIN(p.product_id) as product_id,
-                p.product_name,
-                MIN(p.type) as category,
-                AVG(p.price) as price,
-                MIN(p.manufacturer) as manufacturer,
-                MIN(gs.supplier_id) as supplier_id,
-                MIN(sr.warehouse_id) as warehouse_id,
-                SUM(sr.storequantity) AS stock_quantity,
-                SUM(gs.quantity) AS supply_quantity,
-                MAX(DATEDIFF(CURDATE(), DATE(gs.supply_time))) AS days_in_stock,
-
-                SUM(COALESCE(
-                    (SELECT SUM(i.orderquantity) 
-                     FROM inform i 
-                     JOIN orders o ON i.order_id = o.order_id
-                     WHERE i.product_id = p.product_id 
-                       AND o.order_time >= DATE_SUB(CURDATE(), INTERVAL 30 DAY)
-                    ), 0
-                )) as monthly_sales,
-
-                AVG(ROUND((gs.quantity - sr.storequantity) / gs.quantity, 2)) as sell_through_rate
-
-            FROM good_supply gs
-            LEFT JOIN store_records sr 
-                ON gs.warehouse_id = sr.warehouse_id 
-                AND gs.product_id = sr.product_id
-            LEFT JOIN products p
-                ON gs.product_id = p.product_id
-
-            WHERE DATEDIFF(CURDATE(), DATE(gs.supply_time)) >= 10
-                AND (gs.quantity - sr.storequantity) / gs.quantity < 0.4
-                AND sr.storequantity > 30
-
-            GROUP BY p.product_name
-
-            HAVING monthly_sales < 20
-
-            ORDER BY sell_through_rate ASC
-            LIMIT 5;
-            """
-
-            cursor = conn.cursor(dictionary=True)
-            cursor.execute(query)
-            products = cursor.fetchall()
-
-            return products
-
-        except Exception as e:
-            print(f"Error: {e}")
+        rows = self.get_inventory_snapshot()
+        if rows is None:
             return []
 
-        finally:
-            if conn:
-                conn.close()
\ No newline at end of file
+        candidates = (r for r in rows if _is_slow(r, 0.4) and (r['stock_quantity'] or 0) > 30)
+
+        products = []
+        for name, group in _group_by_name(candidates).items():
+            monthly_sales = sum(r['monthly_sales'] for r in group)
+            if monthly_sales >= 20:
+                continue
+            products.append({
+                'product_id': min(r['product_id'] for r in group),
+                'product_name': name,
+                'category': _min(r['type'] for r in group),
+                'price': _avg([r['price'] for r in group]),
+                'manufacturer': _min(r['manufacturer'] for r in group),
+                'supplier_id': _min(r['supplier_id'] for r in group),
+                'warehouse_id': min(r['warehouse_id'] for r in group),
+                'stock_quantity': sum(r['stock_quantity'] for r in group),
+                'supply_quantity': sum(r['supply_quantity'] for r in group),
+                'days_in_stock': max(r['days_in_stock'] for r in group),
+                'monthly_sales': monthly_sales,
+                'sell_through_rate': _avg([r['sell_through_rate'] for r in group])
+            })
+
+        products.sort(key=lambda r: r['sell_through_rate'])
+        return products[:5]
+
+    def get_trailing_sales(self, product_id, warehouse_id=None, days=30):
+        """
+        Units sold over the last `days` days, from the daily_sales rollup
+        """
+        if warehouse_id is None:
+            row = self.db.fetch_one(TRAILING_SALES_QUERY, (product_id, days))
+        else:
+            row = self.db.fetch_one(TRAILING_SALES_BY_WAREHOUSE_QUERY, (product_id, days, warehouse_id))
+
+        if row is None:
+            return None
+
+        return int(row[0])
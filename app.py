@@ -8,7 +8,7 @@ from threading import Thread
 from datetime import datetime
 from decimal import Decimal
 import traceback
-import joblib
+import hmac
 import numpy as np
 
 from SalesAnalyzer import SalesAnalyzer
@@ -16,6 +16,12 @@ from PromotionAdvisor import PromotionAdvisor
 from Scheduler import PromotionScheduler
 from mongoDB import HistoryDB
 from ChartDesign import ChartDesign
+from db_pool import pool_stats
+from model_registry import ModelRegistry
+from model_store import ModelStore
+from prediction_cache import PredictionCache
+from pricing_optimizer import optimize_price
+from settings import get_settings
 
 # --- Flask  init ---
 app = Flask(__name__)
@@ -32,15 +38,16 @@ last_analysis_time = None
 is_analyzing = False
 
 
-# Load model
-try:
-    model = joblib.load('models/demand_forecast_model.pkl')
-    le_category = joblib.load('models/category_encoder.pkl')
-    le_warehouse = joblib.load('models/warehouse_encoder.pkl')
-    print("✓ ML models loaded successfully")
-except Exception as e:
-    print(f"Warning: ML models not loaded - {e}")
-    model = None
+# Demand model: memory-mapped artifacts, loaded on the first prediction
+# (MODEL_WARM_UP=1 loads it at import, e.g. in the gunicorn --preload master).
+# New registry versions are swapped in by a per-worker poller, without a restart.
+model_store = ModelStore(get_settings().model_dir, registry=ModelRegistry())
+if get_settings().model_warm_up:
+    model_store.warm_up()
+model_store.start_watching(get_settings().model_poll_seconds)
+
+# Predictions keyed on the encoded features (price in cents), dropped when the model changes
+prediction_cache = PredictionCache(get_settings().prediction_cache_size)
 
 try:
     # init AI
@@ -209,49 +216,133 @@ def run_ai_analysis():
         is_analyzing = False
 
 
-def predict_quantity(category, price, warehouse_id):
+def predict_quantities(category, warehouse_id, prices):
     """
-    Use ML model to predict order quantity at given price
+    Predict order quantity for every candidate price of one product in a single
+    model.predict call (categories are encoded once, not once per price)
     """
+    prices = np.asarray(prices, dtype=np.float64).ravel()
+    fallback = np.ones(len(prices))
+
+    model = model_store.get()
     if model is None:
-        return 1.0
+        return fallback
     try:
         # Encode categorical features
         try:
-            category_encoded = le_category.transform([category])[0]
+            category_encoded = model.category_encoder.encode(category)
         except Exception as e:
             print(f"Category encoding error: {e}")
-            return 1.0
+            return fallback
 
         try:
-            warehouse_encoded = le_warehouse.transform([warehouse_id])[0]
+            warehouse_encoded = model.warehouse_encoder.encode(warehouse_id)
         except Exception as e:
             print(f"Warehouse encoding error: {e}")
-            return 1.0
+            return fallback
 
         # Current time features
         now = datetime.now()
 
-        # Prepare features
-        features = np.array([[
-            category_encoded,
-            price,
-            now.hour,
-            now.isoweekday(),
-            now.month,
-            warehouse_encoded
-        ]])
+        # Prepare features: one row per price, everything else shared
+        features = np.empty((len(prices), 6))
+        # order_day is MySQL DAYOFWEEK (Sunday = 1), as in training
+        features[:] = [category_encoded, 0.0, now.hour, now.isoweekday() % 7 + 1, now.month, warehouse_encoded]
+        features[:, 1] = prices
 
-        # Predict
-        prediction = model.predict(features)[0]
+        # Predict (cached rows skip the model; misses use the demand surface or the compiled forest)
+        predictions = prediction_cache.predict(model, features)
 
-        return max(0.1, prediction)
+        return np.maximum(0.1, predictions)
 
     except Exception as e:
         print(f"Prediction error: {e}")
         import traceback
         traceback.print_exc()
-        return 1.0
+        return fallback
+
+
+def predict_quantity(category, price, warehouse_id):
+    """
+    Use ML model to predict order quantity at given price
+    """
+    return float(predict_quantities(category, warehouse_id, [price])[0])
+
+
+# Discount levels (%) evaluated when the client does not send its own grid
+DEFAULT_DISCOUNTS = [10, 20, 30, 40]
+MAX_DISCOUNT_POINTS = 1000
+
+
+def parse_discount_grid(data):
+    """
+    Discount percentages from the request: an explicit `discounts` list, or a
+    range up to `max_discount` in `discount_step` steps (from `min_discount`, default one step)
+    """
+    if data.get('discounts') is not None:
+        discounts = [float(d) for d in data['discounts']]
+    elif data.get('max_discount') is not None:
+        step = float(data.get('discount_step', 1))
+        if step <= 0:
+            raise ValueError("discount_step must be positive")
+        start = float(data.get('min_discount', step))
+        stop = float(data['max_discount'])
+        discounts = np.round(np.arange(start, stop + step / 2, step), 4).tolist()
+    else:
+        discounts = DEFAULT_DISCOUNTS
+
+    discounts = sorted(set(d for d in discounts if d != 0))
+    if not discounts:
+        raise ValueError("discount grid is empty")
+    if len(discounts) > MAX_DISCOUNT_POINTS:
+        raise ValueError(f"discount grid too large (max {MAX_DISCOUNT_POINTS} points)")
+    if discounts[0] < 0 or discounts[-1] >= 100:
+        raise ValueError("discounts must be between 0 and 100 percent")
+    return discounts
+
+
+# Continuous price search range, as a share of the current price (min_price / max_price override it)
+DEFAULT_PRICE_RANGE = (0.5, 1.0)
+
+
+def optional_float(data, key):
+    return float(data[key]) if data.get(key) is not None else None
+
+
+def unpredictable_reason(category, warehouse_id):
+    """Why predict_quantities would return its fallback for this product, or None"""
+    model = model_store.get()
+    if model is None:
+        return 'ML model not loaded'
+    if category not in model.category_encoder:
+        return f"unknown category: {category}"
+    if warehouse_id not in model.warehouse_encoder:
+        return f"unknown warehouse: {warehouse_id}"
+    return None
+
+
+def search_optimal_price(data, current_price, category, warehouse_id):
+    """
+    Best price in a continuous range (optimize_price: dense grid, then local
+    refinement), honouring the optional price_floor / unit_cost + min_margin constraints
+    """
+    low = optional_float(data, 'min_price')
+    high = optional_float(data, 'max_price')
+    if low is None:
+        low = current_price * DEFAULT_PRICE_RANGE[0]
+    if high is None:
+        high = current_price * DEFAULT_PRICE_RANGE[1]
+    if low >= high:
+        raise ValueError(f"min_price ({low:.2f}) must be below max_price ({high:.2f})")
+
+    return optimize_price(
+        lambda prices: predict_quantities(category, warehouse_id, prices),
+        low, high,
+        floor=optional_float(data, 'price_floor'),
+        unit_cost=optional_float(data, 'unit_cost'),
+        min_margin=optional_float(data, 'min_margin'),
+        objective=data.get('objective', 'revenue'),
+    )
 
 
 @app.route('/api/report', methods=['GET'])
@@ -324,32 +415,47 @@ def delete_report_api(id):
 
 @app.route('/api/charts/bar-top5', methods=['GET'])
 def get_bar_chart_top5():
-    chart = ChartDesign()
+    chart = ChartDesign(Analyzer)
     bar = chart.generate_bar_chart_top5_slow_products()
     return bar
 
 @app.route('/api/charts/scatter-price-days', methods=['GET'])
 def get_scatter_chart():
-    chart = ChartDesign()
+    chart = ChartDesign(Analyzer)
     scatter = chart.generate_scatter_price_vs_days()
     return scatter
 
 @app.route('/api/charts/pie-warehouse', methods=['GET'])
 def get_pie_chart_warehouse():
-    chart = ChartDesign()
+    chart = ChartDesign(Analyzer)
     pie = chart.generate_pie_warehouse_distribution()
     return pie
 
+@app.route('/api/cache/invalidate', methods=['POST'])
+def invalidate_snapshot_cache():
+    """Drop the cached inventory snapshot (e.g. after a data load) so the next view re-queries MySQL"""
+    token = get_settings().cache_admin_token
+    if not token or not hmac.compare_digest(request.headers.get('X-Admin-Token', ''), token):
+        return jsonify({'error': 'Forbidden'}), 403
+
+    analyzer = Analyzer or SalesAnalyzer()
+    analyzer.invalidate_snapshot()
+    return jsonify({'status': 'success', 'message': 'Inventory snapshot cache invalidated'})
+
 # Machine Learning
 @app.route('/api/predict-demand', methods=['POST'])
 def predict_demand():
     """Predict order quantity"""
     data = request.json
 
+    model = model_store.get()
+    if model is None:
+        return jsonify({'error': 'ML model not loaded'}), 503
+
     try:
         # Encode categorical features
-        category_encoded = le_category.transform([data['product_category']])[0]
-        warehouse_encoded = le_warehouse.transform([data['warehouse_id']])[0]
+        category_encoded = model.category_encoder.encode(data['product_category'])
+        warehouse_encoded = model.warehouse_encoder.encode(data['warehouse_id'])
 
         # Prepare features
         features = np.array([[
@@ -362,7 +468,7 @@ def predict_demand():
         ]])
 
         # Predict
-        prediction = model.predict(features)[0]
+        prediction = float(prediction_cache.predict(model, features)[0])
 
         return jsonify({
             'predicted_quantity': round(prediction, 1),
@@ -373,9 +479,139 @@ def predict_demand():
         return jsonify({'error': str(e)}), 400
 
 
+# Batch prediction: fields of one row, and how many rows one request may carry
+BATCH_FIELDS = ['product_category', 'warehouse_id', 'price', 'order_hour', 'order_day', 'order_month']
+MAX_BATCH_ROWS = 10000
+
+# numeric field -> (lowest, highest) accepted value
+BATCH_RANGES = {
+    'price': (0.0, np.inf),
+    'order_hour': (0, 23),
+    'order_day': (1, 7),
+    'order_month': (1, 12),
+}
+
+
+def parse_batch(data):
+    """
+    Batch payload -> ({field: list of values}, 'rows' | 'columns').
+    Accepts {"rows": [{field: value, ...}, ...]} or {"columns": {field: [values], ...}}.
+    """
+    if not isinstance(data, dict):
+        raise ValueError("expected a JSON object with 'rows' or 'columns'")
+
+    if 'rows' in data:
+        rows = data['rows']
+        if not isinstance(rows, list):
+            raise ValueError("'rows' must be a list of objects")
+        columns = {field: [row.get(field) if isinstance(row, dict) else None for row in rows]
+                   for field in BATCH_FIELDS}
+        layout = 'rows'
+    elif 'columns' in data:
+        columns = data['columns']
+        if not isinstance(columns, dict):
+            raise ValueError("'columns' must be an object of equal-length lists")
+        missing = [field for field in BATCH_FIELDS if not isinstance(columns.get(field), list)]
+        if missing:
+            raise ValueError(f"missing columns: {', '.join(missing)}")
+        if len(set(len(columns[field]) for field in BATCH_FIELDS)) > 1:
+            raise ValueError("columns must have the same length")
+        layout = 'columns'
+    else:
+        raise ValueError("expected 'rows' or 'columns'")
+
+    count = len(columns[BATCH_FIELDS[0]])
+    if count > MAX_BATCH_ROWS:
+        raise ValueError(f"too many rows (max {MAX_BATCH_ROWS})")
+    return columns, layout
+
+
+def predict_batch(model, columns):
+    """
+    Encode, validate and predict every row at once.
+    Returns (predictions with NaN for invalid rows, per-row error message or None).
+    """
+    count = len(columns[BATCH_FIELDS[0]])
+    errors = np.full(count, None, dtype=object)
+    invalid = np.zeros(count, dtype=bool)
+
+    def flag(bad, message):
+        # keep the first error of each row
+        rows = np.flatnonzero(bad & ~invalid)
+        errors[rows] = [message(i) for i in rows]
+        invalid[rows] = True
+
+    for field in BATCH_FIELDS:
+        flag(np.array([v is None for v in columns[field]], dtype=bool), lambda i, field=field: f"missing {field}")
+
+    category = [str(v) if v is not None else '' for v in columns['product_category']]
+    warehouse = [str(v) if v is not None else '' for v in columns['warehouse_id']]
+    category_encoded, category_known = model.category_encoder.encode_known(category)
+    warehouse_encoded, warehouse_known = model.warehouse_encoder.encode_known(warehouse)
+    flag(~category_known, lambda i: f"unknown category: {columns['product_category'][i]!r}")
+    flag(~warehouse_known, lambda i: f"unknown warehouse: {columns['warehouse_id'][i]!r}")
+
+    features = np.empty((count, 6))
+    features[:, 0] = category_encoded
+    features[:, 5] = warehouse_encoded
+    for position, field in [(1, 'price'), (2, 'order_hour'), (3, 'order_day'), (4, 'order_month')]:
+        values = np.array([float(v) if isinstance(v, (int, float)) and not isinstance(v, bool) else np.nan
+                           for v in columns[field]], dtype=np.float64)
+        lowest, highest = BATCH_RANGES[field]
+        flag(np.isnan(values), lambda i, field=field: f"{field} must be a number")
+        bad = ~np.isnan(values) & ((values < lowest) | (values > highest))
+        if field != 'price':
+            bad |= ~np.isnan(values) & (values != np.round(values))
+        flag(bad, lambda i, field=field: f"{field} out of range")
+        features[:, position] = values
+
+    predictions = np.full(count, np.nan)
+    if not invalid.all():
+        predictions[~invalid] = prediction_cache.predict(model, features[~invalid])
+    return predictions, errors
+
+
+@app.route('/api/predict-demand/batch', methods=['POST'])
+def predict_demand_batch():
+    """
+    Predict order quantities for many rows in one request.
+    Results come back in request order, in the request's layout, with an error per invalid row.
+    """
+    model = model_store.get()
+    if model is None:
+        return jsonify({'error': 'ML model not loaded'}), 503
+
+    try:
+        columns, layout = parse_batch(request.get_json(silent=True))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    predictions, errors = predict_batch(model, columns)
+    quantities = [None if e is not None else round(p, 1) for p, e in zip(predictions.tolist(), errors.tolist())]
+    response = {'status': 'success', 'count': len(quantities),
+                'error_count': sum(e is not None for e in errors.tolist())}
+
+    if layout == 'rows':
+        response['results'] = [{'error': e} if e is not None else {'predicted_quantity': q}
+                               for q, e in zip(quantities, errors.tolist())]
+    else:
+        response['predicted_quantity'] = quantities
+        response['errors'] = errors.tolist()
+    return jsonify(response)
+
+
 @app.route('/health', methods=['GET'])
 def health():
-    return jsonify({'status': 'healthy', 'model_loaded': True})
+    # stats only: the first probe must not load the model (warm_up / first prediction do)
+    model_stats = model_store.stats()
+    return jsonify({
+        'status': 'healthy',
+        'model_loaded': model_stats['loaded'],
+        'model': model_stats,
+        'prediction_cache': prediction_cache.stats(),
+        'db_pool': pool_stats(),
+        'snapshot_cache': Analyzer.snapshot_stats() if Analyzer else None
+    })
 
 
 @app.route('/api/slow-moving-products', methods=['GET'])
@@ -384,9 +620,9 @@ def get_slow_moving_products_api():
     Get top 5 slowest-selling products for ML pricing analysis
     """
     try:
-        # get data from mysql
-        mysql = SalesAnalyzer()
-        products = mysql.get_slow_moving_products_ML()
+        # get data from mysql (shared analyzer, pooled connection)
+        analyzer = Analyzer or SalesAnalyzer()
+        products = analyzer.get_slow_moving_products_ML()
 
         return jsonify({
             'status': 'success',
@@ -421,76 +657,105 @@ def ml_pricing():
 @app.route('/api/pricing-analysis', methods=['POST'])
 def pricing_analysis():
     """
-    Analyze pricing strategy using pure ML prediction
+    Analyze pricing strategy using pure ML prediction.
+    Optional discount grid: "discounts": [5, 10, ...] or "max_discount": 60, "discount_step": 1
+    Continuous optimum (unless "optimize": false): "min_price" / "max_price" (default 50-100% of
+    the current price), "price_floor", "unit_cost" with "min_margin" (percent), "objective": revenue | profit
     """
     data = request.json
 
     try:
         # 强制转换成float - 这是关键！
         current_price = float(data['current_price'])  # ← 加 float()
-        monthly_sales = int(data.get('current_monthly_sales', 30))
         category = str(data['category'])  # ← 确保是字符串
         warehouse_id = str(data['warehouse_id'])  # ← 确保是字符串
         product_name = str(data['product_name'])
 
+        # Trailing 30-day sales from the daily_sales rollup when the client did not send them
+        monthly_sales = data.get('current_monthly_sales')
+        if monthly_sales is None and data.get('product_id') and Analyzer is not None:
+            monthly_sales = Analyzer.get_trailing_sales(data['product_id'], warehouse_id, days=30)
+        monthly_sales = int(monthly_sales if monthly_sales is not None else 30)
+
         if monthly_sales == 0:
             monthly_sales = 10  # 默认假设月销10件
 
         print(f"Converting types - price: {type(current_price)}, monthly_sales: {type(monthly_sales)}")
 
-        scenarios = []
+        discounts = parse_discount_grid(data)
 
-        # Current price
-        current_qty = predict_quantity(category, current_price, warehouse_id)
-        current_qty = float(current_qty)  # ← 确保是float
+        # Current price and every discounted price in one prediction
+        prices = current_price * (1 - np.asarray([0.0] + discounts) / 100)
+        quantities = predict_quantities(category, warehouse_id, prices)
 
+        current_qty = float(quantities[0])
         current_revenue = current_price * current_qty * monthly_sales
         print(f"Current revenue calculation: {current_price} * {current_qty} * {monthly_sales} = {current_revenue}")
 
-        scenarios.append({
-            'discount_percent': 0,
-            'price': round(float(current_price), 2),
-            'predicted_qty_per_order': round(float(current_qty), 1),
-            'estimated_monthly_sales': int(current_qty * monthly_sales),
-            'estimated_monthly_revenue': round(float(current_revenue), 2),
-            'revenue_change_percent': 0,
-            'quantity_increase_percent': 0
-        })
-
-        # Test discounts: 10%, 20%, 30%, 40%
-        for discount in [10, 20, 30, 40]:
-            discounted_price = current_price * (1 - discount / 100)
-            discounted_price = float(discounted_price)  # ← 确保是float
-
-            predicted_qty = predict_quantity(category, discounted_price, warehouse_id)
-            predicted_qty = float(predicted_qty)  # ← 确保是float
-
+        def scenario(discount, price, predicted_qty):
             estimated_sales = predicted_qty * monthly_sales
-            estimated_revenue = discounted_price * estimated_sales
+            estimated_revenue = price * estimated_sales
 
             revenue_change = ((estimated_revenue - current_revenue) / current_revenue) * 100
             qty_change = ((predicted_qty - current_qty) / current_qty) * 100
 
-            scenarios.append({
-                'discount_percent': discount,
-                'price': round(float(discounted_price), 2),
+            return {
+                'discount_percent': int(discount) if float(discount).is_integer() else discount,
+                'price': round(float(price), 2),
                 'predicted_qty_per_order': round(float(predicted_qty), 1),
                 'estimated_monthly_sales': int(estimated_sales),
                 'estimated_monthly_revenue': round(float(estimated_revenue), 2),
                 'revenue_change_percent': round(float(revenue_change), 1),
                 'quantity_increase_percent': round(float(qty_change), 1)
-            })
+            }
+
+        scenarios = [scenario(0, current_price, current_qty)]
+        for discount, discounted_price, predicted_qty in zip(discounts, prices[1:].tolist(), quantities[1:].tolist()):
+            scenarios.append(scenario(discount, discounted_price, predicted_qty))
 
         # Find optimal (max revenue)
         optimal_scenario = max(scenarios[1:], key=lambda x: x['estimated_monthly_revenue'])
 
-        return jsonify({
+        result = {
             'status': 'success',
             'product_name': product_name,
             'current_scenario': scenarios[0],
             'price_scenarios': scenarios[1:],
             'optimal_scenario': optimal_scenario
-        })
+        }
+
+        # Continuous search: the best price is usually between the grid's discounts.
+        # Without the model or with an unknown category / warehouse predict_quantities
+        # falls back to a flat 1.0, which would always "optimize" to the top of the range.
+        skip_reason = None
+        if data.get('optimize', True):
+            skip_reason = unpredictable_reason(category, warehouse_id)
+            if skip_reason:
+                print(f"Price optimization skipped: {skip_reason}")
+                result['optimization_skipped'] = skip_reason
+
+        if data.get('optimize', True) and not skip_reason:
+            search = search_optimal_price(data, current_price, category, warehouse_id)
+            curve_prices, curve_qty, _ = search['curve']
+            result['optimal_price'] = {
+                **scenario(round((1 - search['price'] / current_price) * 100, 2), search['price'], search['quantity']),
+                'objective': data.get('objective', 'revenue'),
+                'price_range': [round(bound, 2) for bound in search['bounds']],
+                'evaluations': search['evaluations'],
+            }
+            result['revenue_curve'] = {
+                'price': np.round(curve_prices, 2).tolist(),
+                'predicted_qty_per_order': np.round(curve_qty, 3).tolist(),
+                'estimated_monthly_revenue': np.round(curve_prices * curve_qty * monthly_sales, 2).tolist(),
+            }
+
+        return jsonify(result)
+
+    except ValueError as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 400
 
     except Exception as e:
         print(f"❌ Error in pricing analysis: {e}")
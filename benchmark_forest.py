@@ -0,0 +1,77 @@
+"""
+Compare sklearn RandomForestRegressor.predict with CompiledForest (and the
+demand surface, when built) for single-row and batch latency.
+
+    python benchmark_forest.py
+"""
+import time
+import warnings
+
+import joblib
+import numpy as np
+
+from demand_surface import file_sha256, load_surface
+from encoders import load_encoder
+from forest_engine import CompiledForest
+
+warnings.filterwarnings('ignore')
+
+
+def random_features(n, n_categories, n_warehouses, seed=0):
+    rng = np.random.default_rng(seed)
+    return np.column_stack([
+        rng.integers(0, n_categories, n),
+        np.round(rng.uniform(0.5, 80, n), 2),
+        rng.integers(0, 24, n),
+        rng.integers(1, 8, n),
+        rng.integers(1, 13, n),
+        rng.integers(0, n_warehouses, n),
+    ]).astype(np.float64)
+
+
+def timed(fn, repeat):
+    fn()  # warm-up
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat
+
+
+def fmt(seconds):
+    return f"{seconds * 1e6:10.1f} us" if seconds < 1e-3 else f"{seconds * 1e3:10.2f} ms"
+
+
+if __name__ == "__main__":
+    model = joblib.load('models/demand_forecast_model.pkl')
+    category_encoder = load_encoder('models/category_encoder.pkl', 'category')
+    warehouse_encoder = load_encoder('models/warehouse_encoder.pkl', 'warehouse')
+
+    started = time.perf_counter()
+    forest = CompiledForest.from_sklearn(model)
+    print(f"compiled {forest.n_trees} trees, {len(forest.value):,} nodes, depth {forest.max_depth} "
+          f"in {(time.perf_counter() - started) * 1e3:.1f} ms")
+
+    surface = load_surface(model_sha256=file_sha256('models/demand_forecast_model.pkl'),
+                           category_encoder=category_encoder, warehouse_encoder=warehouse_encoder)
+
+    X = random_features(100000, len(category_encoder.classes_), len(warehouse_encoder.classes_))
+    expected = model.predict(X)
+    compiled = forest.predict(X)
+    print(f"bit-identical to sklearn on {len(X):,} rows: {np.array_equal(expected, compiled)}")
+    if surface is not None:
+        looked_up = surface.lookup(X[:, 0], X[:, 1], X[:, 2], X[:, 3], X[:, 4], X[:, 5])
+        print(f"surface identical to sklearn: {np.array_equal(expected, looked_up)}")
+
+    print("\n" + "=" * 60)
+    print(f"{'rows':>8} {'sklearn':>13} {'compiled':>13} {'surface':>13}")
+    print("=" * 60)
+    for rows in [1, 10, 100, 1000, 10000]:
+        batch = X[:rows]
+        repeat = max(3, 2000 // rows)
+        sklearn_time = timed(lambda: model.predict(batch), max(3, repeat // 20))
+        compiled_time = timed(lambda: forest.predict(batch), repeat)
+        surface_time = (timed(lambda: surface.lookup(batch[:, 0], batch[:, 1], batch[:, 2], batch[:, 3],
+                                                     batch[:, 4], batch[:, 5]), repeat)
+                        if surface is not None else None)
+        print(f"{rows:>8} {fmt(sklearn_time)} {fmt(compiled_time)} "
+              f"{fmt(surface_time) if surface_time is not None else '          -':>13}")
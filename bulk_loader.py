@@ -0,0 +1,238 @@
+"""
+Bulk loader for generated data (data_generator.py).
+
+Two load paths, both streamed chunk by chunk with a commit per chunk:
+
+- insert: chunked executemany, which mysql-connector sends as one multi-row
+  INSERT per chunk instead of one statement per row
+- infile: each chunk is written to a temporary CSV shard and sent with
+  LOAD DATA LOCAL INFILE (the server needs local_infile=ON)
+
+For the whole load the session skips unique/foreign key checks and the summary
+triggers; they are restored afterwards and the summary tables are rebuilt once.
+
+Generation runs in a process pool and is loaded shard by shard as it arrives,
+so only a few shards are in memory at a time. A dataset written by
+data_writers.py can be loaded instead with --from-dir (CSV datasets go straight
+to LOAD DATA in infile mode).
+
+    python bulk_loader.py --orders 10000000 --users 200000 --method infile --workers 8
+    python bulk_loader.py --from-dir out/bench --method infile
+"""
+import argparse
+import csv
+import os
+import tempfile
+import time
+
+import mysql.connector
+from mysql.connector import Error
+
+from data_generator import TABLE_COLUMNS, TABLE_ORDER, format_table, iter_shards, table_rows
+from data_writers import chunk_rows, iter_formatted, load_manifest, table_files
+from database import DatabaseManager
+from settings import get_settings
+from summary_tables import rebuild_sell_through, rebuild_daily_sales
+
+
+# rows per multi-row INSERT (keeps each statement well under max_allowed_packet)
+INSERT_CHUNK_ROWS = 5000
+# rows per CSV shard for LOAD DATA
+INFILE_CHUNK_ROWS = 250000
+
+FAST_SESSION = [
+    "SET unique_checks = 0",
+    "SET foreign_key_checks = 0",
+    "SET @skip_summary_triggers = 1",
+]
+
+RESTORE_SESSION = [
+    "SET unique_checks = 1",
+    "SET foreign_key_checks = 1",
+    "SET @skip_summary_triggers = NULL",
+]
+
+LOAD_DATA_SQL = """
+LOAD DATA LOCAL INFILE %s INTO TABLE {table}
+CHARACTER SET utf8mb4
+FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '"'
+LINES TERMINATED BY '\\n'
+{ignore}({columns})
+"""
+
+
+def generated_chunks(columns, catalog, chunk_size):
+    """Stream a generated table as formatted chunks of chunk_size rows"""
+    total = table_rows(columns)
+    for start in range(0, total, chunk_size):
+        yield format_table(columns, catalog, start, start + chunk_size)
+
+
+class BulkLoader:
+
+    def __init__(self, method='insert', chunk_size=None):
+        if method not in ('insert', 'infile'):
+            raise ValueError(f"unknown load method: {method} (use insert or infile)")
+
+        self.method = method
+        self.chunk_size = chunk_size or (INFILE_CHUNK_ROWS if method == 'infile' else INSERT_CHUNK_ROWS)
+        self.conn = None
+        self.cursor = None
+
+    def connect(self):
+        """
+        Dedicated connection (not from the pool): the session settings below
+        must not leak into pooled connections, and LOAD DATA needs allow_local_infile.
+        """
+        try:
+            config = get_settings().mysql_config()
+            if self.method == 'infile':
+                config['allow_local_infile'] = True
+            self.conn = mysql.connector.connect(**config)
+            self.cursor = self.conn.cursor()
+            for sql in FAST_SESSION:
+                self.cursor.execute(sql)
+            return True
+        except Error as e:
+            print(f"connect fail: {e}")
+            return False
+
+    def close(self):
+        if self.cursor:
+            try:
+                for sql in RESTORE_SESSION:
+                    self.cursor.execute(sql)
+                self.cursor.close()
+            except Error:
+                pass
+        if self.conn:
+            self.conn.close()
+        self.conn = None
+        self.cursor = None
+
+    def _insert(self, table, columns, rows):
+        sql = (f"INSERT INTO {table} ({', '.join(columns)}) "
+               f"VALUES ({', '.join(['%s'] * len(columns))})")
+        self.cursor.executemany(sql, rows)
+
+    def _load_csv(self, table, columns, path, header=False):
+        sql = LOAD_DATA_SQL.format(table=table, columns=', '.join(columns),
+                                   ignore='IGNORE 1 LINES\n' if header else '')
+        self.cursor.execute(sql, (path,))
+
+    def _load_infile(self, table, columns, rows):
+        fd, path = tempfile.mkstemp(prefix=f"{table}-", suffix='.csv')
+        try:
+            with os.fdopen(fd, 'w', newline='', encoding='utf-8') as f:
+                csv.writer(f, lineterminator='\n').writerows(rows)
+            self._load_csv(table, columns, path)
+        finally:
+            os.remove(path)
+
+    def load_table(self, table, chunks, total=None):
+        """
+        Load an iterable of {column: array} chunks into `table`, committing per chunk.
+        Returns the number of rows loaded; raises mysql.connector.Error on failure
+        (chunks committed so far stay loaded).
+        """
+        columns = TABLE_COLUMNS[table]
+        loaded = 0
+        started = time.perf_counter()
+
+        for chunk in chunks:
+            rows = chunk_rows(chunk, columns)
+            if not rows:
+                continue
+
+            if self.method == 'infile':
+                self._load_infile(table, columns, rows)
+            else:
+                self._insert(table, columns, rows)
+            self.conn.commit()
+
+            loaded += len(rows)
+            elapsed = time.perf_counter() - started
+            progress = f"{loaded:,}/{total:,}" if total else f"{loaded:,}"
+            print(f"\r  {table:18} {progress} rows ({loaded / max(elapsed, 1e-9):,.0f} rows/s)", end='', flush=True)
+
+        print()
+        return loaded
+
+    def load_dataset(self, catalog, tables):
+        """Load every generated table in foreign-key order; returns {table: rows}"""
+        counts = {}
+        for table in TABLE_ORDER:
+            if table not in tables:
+                continue
+            columns = tables[table]
+            counts[table] = self.load_table(
+                table, generated_chunks(columns, catalog, self.chunk_size), total=table_rows(columns)
+            )
+        return counts
+
+    def load_directory(self, path):
+        """Load a data_writers.py dataset; returns {table: rows}"""
+        manifest = load_manifest(path)
+        counts = {}
+
+        for table in TABLE_ORDER:
+            total = manifest['rows'].get(table)
+            if not total:
+                continue
+
+            if manifest['format'] == 'csv' and self.method == 'infile':
+                # the files already hold MySQL values: hand them to the server as they are
+                started = time.perf_counter()
+                for file in table_files(path, table, 'csv'):
+                    self._load_csv(table, TABLE_COLUMNS[table], os.path.abspath(file), header=True)
+                    self.conn.commit()
+                print(f"  {table:18} {total:,} rows ({time.perf_counter() - started:.1f}s)")
+                counts[table] = total
+            else:
+                counts[table] = self.load_table(table, iter_formatted(path, table), total=total)
+
+        return counts
+
+
+def rebuild_summaries():
+    """The triggers were skipped during the load: recompute both summary tables once"""
+    db = DatabaseManager()
+    print("rebuilding summary tables...")
+    ok = rebuild_sell_through(db) and rebuild_daily_sales(db)
+    print("successful" if ok else "fail")
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate and bulk-load synthetic warehouse data")
+    parser.add_argument('--orders', type=int, default=2000)
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument('--products', type=int, default=100)
+    parser.add_argument('--suppliers', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--method', choices=['insert', 'infile'], default='insert')
+    parser.add_argument('--chunk-size', type=int, default=None)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--from-dir', default=None, help="load a data_writers.py dataset instead of generating")
+    args = parser.parse_args()
+
+    loader = BulkLoader(args.method, args.chunk_size)
+    if not loader.connect():
+        exit(1)
+
+    started = time.perf_counter()
+    try:
+        if args.from_dir:
+            loader.load_directory(args.from_dir)
+        else:
+            for catalog, tables in iter_shards(args.seed, args.users, args.orders, args.products,
+                                               args.suppliers, workers=args.workers):
+                loader.load_dataset(catalog, tables)
+    except Error as e:
+        print(f"\n✗ load fail: {e}")
+        exit(1)
+    finally:
+        loader.close()
+
+    print(f"✓ loaded in {time.perf_counter() - started:.1f}s")
+    rebuild_summaries()
@@ -1,27 +1,11 @@
 import mysql.connector
 import random
 from datetime import datetime, timedelta
-import os
-from dotenv import load_dotenv
-import tempfile
 import numpy as np
+from settings import get_settings
 
-# MySQL Configuration
-load_dotenv('config.env')
-ssl_ca_content = os.environ.get('DB_SSL_CA_CONTENT')
-if ssl_ca_content:
-    temp_file = tempfile.NamedTemporaryFile(mode='w', delete=False)
-    temp_file.write(ssl_ca_content)
-    temp_file.close()
-DB_CONFIG = {
-    'host': os.environ.get('DB_HOST'),
-    'database': os.environ.get('DB_DATABASE'),
-    'user': os.environ.get('DB_USER'),
-    'password': os.environ.get('DB_PASSWORD'),
-    'port': int(os.environ.get('DB_PORT', 3306)),
-    'ssl_ca': temp_file.name,
-    'ssl_verify_cert': bool(os.environ.get('DB_SSL_VERIFY_CERT', False))
-}
+# MySQL Configuration (shared settings, loaded once)
+DB_CONFIG = get_settings().mysql_config()
 
 random.seed(42)
 np.random.seed(42)
@@ -71,6 +55,38 @@ US_CITIES_STATES = [
 
 STREET_NAMES = ['Main St', 'Oak Ave', 'Maple Dr', 'Park Blvd', 'Washington St']
 
+FIRST_NAMES = ['James', 'John', 'Mary', 'Patricia', 'Michael', 'Jennifer', 'William', 'Linda']
+LAST_NAMES = ['Smith', 'Johnson', 'Williams', 'Brown', 'Jones', 'Garcia', 'Miller', 'Davis']
+
+WAREHOUSE_LOCATIONS = [
+    ('1500 Logistics Pkwy', 'Seattle', 'WA', '98188'),
+    ('2800 Distribution Dr', 'Los Angeles', 'CA', '90058'),
+    ('4200 Warehouse Rd', 'Chicago', 'IL', '60638'),
+    ('3600 Fulfillment Blvd', 'Dallas', 'TX', '75237'),
+]
+
+SUPPLIER_PREFIXES = ['Global', 'Premier', 'United', 'Elite', 'Prime', 'Alpha', 'Metro', 'Pacific']
+SUPPLIER_SUFFIXES = ['Supply Inc', 'Wholesale Corp', 'Distribution LLC', 'Trading Co', 'Logistics Group']
+
+EXPRESS_COMPANIES = [
+    ('FedEx', (1, 3)), ('UPS', (1, 4)), ('USPS Priority', (2, 5)),
+    ('Amazon Logistics', (1, 2)), ('DHL Express', (2, 4))
+]
+
+# Shopping hours: weekends peak in the afternoon, weekdays at lunch and in the evening
+WEEKEND_HOURS = range(9, 23)
+WEEKEND_HOUR_WEIGHTS = [1, 2, 3, 4, 5, 6, 7, 6, 5, 4, 3, 2, 1, 1]
+WEEKDAY_HOURS = range(8, 22)
+WEEKDAY_HOUR_WEIGHTS = [1, 1, 2, 3, 5, 4, 3, 2, 4, 6, 7, 5, 3, 2]
+PEAK_HOURS = [12, 13, 18, 19, 20]
+
+# 20% are "bulk buyers", 60% normal, 20% minimal
+BUYING_POWERS = [0.7, 1.0, 1.5]
+BUYING_POWER_WEIGHTS = [0.2, 0.6, 0.2]
+
+ORDER_STATUSES = ['pending', 'shipped', 'delivered']
+ORDER_STATUS_WEIGHTS = [0.05, 0.15, 0.80]
+
 
 def generate_id(prefix, index):
     return f"{prefix}{str(index).zfill(8)}"
@@ -85,9 +101,9 @@ def random_date(start_date, end_date):
 def random_datetime_in_day(base_date):
     is_weekend = base_date.weekday() >= 5
     if is_weekend:
-        hour = random.choices(range(9, 23), weights=[1, 2, 3, 4, 5, 6, 7, 6, 5, 4, 3, 2, 1, 1], k=1)[0]
+        hour = random.choices(WEEKEND_HOURS, weights=WEEKEND_HOUR_WEIGHTS, k=1)[0]
     else:
-        hour = random.choices(range(8, 22), weights=[1, 1, 2, 3, 5, 4, 3, 2, 4, 6, 7, 5, 3, 2], k=1)[0]
+        hour = random.choices(WEEKDAY_HOURS, weights=WEEKDAY_HOUR_WEIGHTS, k=1)[0]
     return base_date.replace(hour=hour, minute=random.randint(0, 59), second=random.randint(0, 59))
 
 
@@ -119,7 +135,7 @@ def calculate_realistic_quantity(product_price, product_multiplier, user_buying_
     promo_factor = 1.3 if is_promotion_month else 1.0
 
     # Peak hour effect (lunch and evening)
-    if hour in [12, 13, 18, 19, 20]:
+    if hour in PEAK_HOURS:
         time_factor = 1.15
     else:
         time_factor = 1.0
@@ -134,13 +150,35 @@ def calculate_realistic_quantity(product_price, product_multiplier, user_buying_
     return max(1, min(10, actual_qty))
 
 
+def calculate_realistic_quantities(product_prices, product_multipliers, user_buying_powers,
+                                   is_weekend, is_promotion_month, hours, rng):
+    """
+    Vectorized calculate_realistic_quantity: same factors, one quantity per array element
+    """
+    product_prices = np.asarray(product_prices)
+
+    price_factor = np.select(
+        [product_prices < 2, product_prices < 10, product_prices < 30],
+        [1.5, 1.2, 1.0],
+        default=0.8
+    )
+    weekend_factor = np.where(is_weekend, 1.2, 1.0)
+    promo_factor = np.where(is_promotion_month, 1.3, 1.0)
+    time_factor = np.where(np.isin(hours, PEAK_HOURS), 1.15, 1.0)
+
+    expected_qty = (np.asarray(product_multipliers) * price_factor * np.asarray(user_buying_powers)
+                    * weekend_factor * promo_factor * time_factor)
+
+    # int() truncates toward zero
+    actual_qty = np.trunc(rng.normal(expected_qty, expected_qty * 0.2)).astype(np.int64)
+
+    return np.clip(actual_qty, 1, 10)
+
+
 def insert_users(cursor, conn, count=100):
     print(f"Inserting {count} users...")
     users = []
 
-    first_names = ['James', 'John', 'Mary', 'Patricia', 'Michael', 'Jennifer', 'William', 'Linda']
-    last_names = ['Smith', 'Johnson', 'Williams', 'Brown', 'Jones', 'Garcia', 'Miller', 'Davis']
-
     start_date = datetime(2023, 1, 1)
     end_date = datetime(2024, 11, 1)
 
@@ -149,12 +187,12 @@ def insert_users(cursor, conn, count=100):
 
     for i in range(count):
         user_id = generate_id('U', i + 1)
-        nickname = f"{random.choice(first_names)}{random.choice(last_names)}{random.randint(100, 999)}"
+        nickname = f"{random.choice(FIRST_NAMES)}{random.choice(LAST_NAMES)}{random.randint(100, 999)}"
         register_time = random_date(start_date, end_date)
         register_time = register_time.replace(hour=random.randint(8, 22), minute=random.randint(0, 59))
 
         # Assign buying power: 20% are "bulk buyers", 60% normal, 20% minimal
-        buying_power = random.choices([0.7, 1.0, 1.5], weights=[0.2, 0.6, 0.2])[0]
+        buying_power = random.choices(BUYING_POWERS, weights=BUYING_POWER_WEIGHTS)[0]
         user_buying_powers[user_id] = buying_power
 
         users.append((user_id, nickname, register_time))
@@ -170,15 +208,8 @@ def insert_users(cursor, conn, count=100):
 
 def insert_warehouses(cursor, conn):
     print("Inserting warehouses...")
-    warehouse_locations = [
-        ('1500 Logistics Pkwy', 'Seattle', 'WA', '98188'),
-        ('2800 Distribution Dr', 'Los Angeles', 'CA', '90058'),
-        ('4200 Warehouse Rd', 'Chicago', 'IL', '60638'),
-        ('3600 Fulfillment Blvd', 'Dallas', 'TX', '75237'),
-    ]
-
     warehouses = []
-    for i, (street, city, state, zipcode) in enumerate(warehouse_locations):
+    for i, (street, city, state, zipcode) in enumerate(WAREHOUSE_LOCATIONS):
         warehouse_id = generate_id('W', i + 1)
         location = f"{street}, {city}, {state} {zipcode}"
         warehouses.append((warehouse_id, location))
@@ -252,12 +283,9 @@ def insert_suppliers(cursor, conn, count=10):
     print(f"Inserting {count} suppliers...")
     suppliers = []
 
-    prefixes = ['Global', 'Premier', 'United', 'Elite', 'Prime', 'Alpha', 'Metro', 'Pacific']
-    suffixes = ['Supply Inc', 'Wholesale Corp', 'Distribution LLC', 'Trading Co', 'Logistics Group']
-
     for i in range(count):
         supplier_id = generate_id('S', i + 1)
-        supplier_name = f"{random.choice(prefixes)} {random.choice(suffixes)} #{i + 1}"
+        supplier_name = f"{random.choice(SUPPLIER_PREFIXES)} {random.choice(SUPPLIER_SUFFIXES)} #{i + 1}"
 
         city, state = random.choice(US_CITIES_STATES)
         street = random.choice(STREET_NAMES)
@@ -378,8 +406,7 @@ def insert_orders_realistic(cursor, conn, users, user_buying_powers, store_recor
 
             order_qty = min(order_qty, store_qty)
 
-            status = random.choices(['pending', 'shipped', 'delivered'],
-                                    weights=[0.05, 0.15, 0.80])[0]
+            status = random.choices(ORDER_STATUSES, weights=ORDER_STATUS_WEIGHTS)[0]
 
             informs.append((order_id, product_id, warehouse_id, order_qty, status))
 
@@ -450,10 +477,6 @@ def insert_good_supply(cursor, conn, suppliers, store_records):
 
 def insert_logistics(cursor, conn, orders):
     print("Inserting logistics data...")
-    express_companies = [
-        ('FedEx', (1, 3)), ('UPS', (1, 4)), ('USPS Priority', (2, 5)),
-        ('Amazon Logistics', (1, 2)), ('DHL Express', (2, 4))
-    ]
 
     logistics_records = []
     shipping_records = []
@@ -464,7 +487,7 @@ def insert_logistics(cursor, conn, orders):
         order_id = order[0]
         order_time = order[2]
 
-        express_company, (min_days, max_days) = random.choice(express_companies)
+        express_company, (min_days, max_days) = random.choice(EXPRESS_COMPANIES)
         logistics_status = random.choices(['in_transit', 'delivered'], weights=[0.10, 0.90])[0]
 
         logistics_records.append((logistics_id, order_id, express_company, logistics_status))
@@ -1,39 +1,25 @@
+import sys
+
 from database import DatabaseManager
-from db_config import create_user, create_store, create_orders,create_product,create_information
-from db_config import create_delivery, create_logistic, create_warehouses, create_shipping
-from db_config import create_supplier, create_good_supply
-import time
+from schema_bootstrap import bootstrap
+
+# python create_database.py           create missing tables, triggers and indexes (no-op when up to date)
+# python create_database.py --reset   drop every table and recreate the schema
 
 if __name__ == "__main__":
     db = DatabaseManager()
-    sql_statements = [
-        create_user, create_store, create_orders, create_product, create_information,
-        create_delivery, create_logistic, create_warehouses, create_shipping,
-        create_supplier, create_good_supply
-    ]
-
 
     if not db.connect():
         print("connect database fail")
         exit(1)
 
-    # start create
-    print("\nstart create table...")
-    success_count = 0
-
-    for i, sql in enumerate(sql_statements, 1):
-        print(f"\n[{i}/{len(sql_statements)}] creating...")
-
-        if db.execute_sql(sql):
-            success_count += 1
-            print(f"successful")
-        else:
-            print(f"fail")
-
-        time.sleep(0.3)  # insert sleep avoid sync up error
+    reset = '--reset' in sys.argv[1:]
 
     print(f"\n{'=' * 60}")
-    print(f"Successful table information: {success_count}/{len(sql_statements)} ")
+    print("recreating schema..." if reset else "applying schema...")
+    success = bootstrap(db, reset=reset)
+    print("successful" if success else "fail")
     print(f"{'=' * 60}")
 
-    db.close()
\ No newline at end of file
+    db.close()
+    exit(0 if success else 1)
@@ -0,0 +1,539 @@
+"""
+NumPy-vectorized synthetic data generator: the large-scale counterpart of create_data.py.
+
+Same business patterns (weekend/holiday factors, buying power, price factors,
+shopping hours), but every table is produced column by column as arrays, so
+generation scales linearly to tens of millions of order lines.
+
+Tables are dicts of column arrays. ID columns hold 1-based integer indexes and
+categorical columns hold codes; format_table() turns a (slice of a) table into
+the strings stored in MySQL, so big tables are only formatted chunk by chunk.
+
+Users and orders are generated in fixed-size shards (see plan_shards), in a
+process pool with --workers; the output does not depend on the worker count.
+
+    python data_generator.py --orders 5000000 --users 100000 --workers 8
+"""
+import argparse
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+
+from create_data import (PRODUCTS_DATA, US_CITIES_STATES, STREET_NAMES, FIRST_NAMES, LAST_NAMES,
+                         WAREHOUSE_LOCATIONS, SUPPLIER_PREFIXES, SUPPLIER_SUFFIXES, EXPRESS_COMPANIES,
+                         WEEKEND_HOURS, WEEKEND_HOUR_WEIGHTS, WEEKDAY_HOURS, WEEKDAY_HOUR_WEIGHTS,
+                         BUYING_POWERS, BUYING_POWER_WEIGHTS, ORDER_STATUSES, ORDER_STATUS_WEIGHTS,
+                         calculate_realistic_quantities)
+
+
+# Column order matches the INSERT statements in create_data.py
+TABLE_COLUMNS = {
+    'users': ['user_id', 'nickname', 'register_time'],
+    'warehouses': ['warehouse_id', 'location'],
+    'products': ['product_id', 'product_name', 'type', 'price', 'manufacturer', 'shelf_life', 'batch_number'],
+    'suppliers': ['supplier_id', 'supplier_name', 'address', 'star', 'duration', 'status'],
+    'store_records': ['warehouse_id', 'product_id', 'storequantity'],
+    'orders': ['order_id', 'user_id', 'order_time'],
+    'inform': ['order_id', 'product_id', 'warehouse_id', 'orderquantity', 'status'],
+    'good_supply': ['supplier_id', 'product_id', 'warehouse_id', 'quantity', 'supply_time'],
+    'logistics': ['logistics_id', 'order_id', 'express_company', 'logistics_status'],
+    'shipping_product': ['logistics_id', 'shipping_time', 'shipping_address'],
+    'delivery_product': ['logistics_id', 'delivery_time', 'delivery_address'],
+}
+
+# Load order respecting foreign keys
+TABLE_ORDER = ['users', 'warehouses', 'products', 'suppliers', 'store_records', 'orders',
+               'inform', 'good_supply', 'logistics', 'shipping_product', 'delivery_product']
+
+# integer index column -> (prefix, zero padding); 'ORD' also gets the catalog's year
+ID_FORMATS = {
+    'user_id': ('U', 8),
+    'warehouse_id': ('W', 8),
+    'product_id': ('P', 8),
+    'supplier_id': ('S', 8),
+    'logistics_id': ('L', 8),
+    'order_id': ('ORD', 10),
+}
+
+# code column -> labels
+CATEGORY_LABELS = {
+    'status': ORDER_STATUSES,
+    'express_company': [name for name, _ in EXPRESS_COMPANIES],
+    'logistics_status': ['in_transit', 'delivered'],
+}
+
+USER_START, USER_END = np.datetime64('2023-01-01'), np.datetime64('2024-11-01')
+ORDER_START, ORDER_END = np.datetime64('2024-01-01'), np.datetime64('2024-11-27')
+SUPPLY_START, SUPPLY_END = np.datetime64('2024-01-01'), np.datetime64('2024-11-01')
+
+SECOND = np.timedelta64(1, 's')
+HOUR = np.timedelta64(3600, 's')
+DAY = np.timedelta64(86400, 's')
+
+
+def _weighted(rng, values, weights, size):
+    weights = np.asarray(weights, dtype=np.float64)
+    return np.asarray(values)[rng.choice(len(weights), size=size, p=weights / weights.sum())]
+
+
+def _random_days(rng, start, end, size):
+    """Uniform whole days in [start, end], as datetime64[s] midnights"""
+    days = rng.integers(0, (end - start).astype(int) + 1, size=size)
+    return start.astype('datetime64[s]') + days * DAY
+
+
+def _weekday(times):
+    # 1970-01-01 was a Thursday; Monday == 0 like datetime.weekday()
+    return (times.astype('datetime64[D]').astype(np.int64) + 3) % 7
+
+
+def _month(times):
+    return times.astype('datetime64[M]').astype(np.int64) % 12 + 1
+
+
+def _hash_uniform(seed, index, salt):
+    """
+    Stateless uniform [0, 1) per index (SplitMix64), so per-user attributes do not
+    depend on which shard or process generated the user.
+    """
+    x = np.asarray(index, dtype=np.uint64) * np.uint64(0x9E3779B97F4A7C15)
+    x = x + np.uint64((seed * 1000003 + salt) & 0xFFFFFFFFFFFFFFFF)
+    x = x ^ (x >> np.uint64(30))
+    x = x * np.uint64(0xBF58476D1CE4E5B9)
+    x = x ^ (x >> np.uint64(27))
+    x = x * np.uint64(0x94D049BB133111EB)
+    x = x ^ (x >> np.uint64(31))
+    return (x >> np.uint64(11)).astype(np.float64) / float(1 << 53)
+
+
+def user_buying_powers(seed, user_index):
+    """Buying power of 0-based user indexes (20% bulk, 60% normal, 20% minimal)"""
+    cumulative = np.cumsum(BUYING_POWER_WEIGHTS) / np.sum(BUYING_POWER_WEIGHTS)
+    u = _hash_uniform(seed, user_index, salt=1)
+    return np.asarray(BUYING_POWERS)[np.searchsorted(cumulative, u, side='right')]
+
+
+def _sample_without_replacement(rng, rows, k, population):
+    """k distinct integers in [0, population) per row (like random.sample), vectorized"""
+    picks = np.empty((rows, k), dtype=np.int64)
+    for j in range(k):
+        r = rng.integers(0, population - j, size=rows)
+        # shift past the values already taken, smallest first
+        taken = np.sort(picks[:, :j], axis=1)
+        for c in range(j):
+            r += r >= taken[:, c]
+        picks[:, j] = r
+    return picks
+
+
+def _addresses(rng, size, apartments=False):
+    cities = rng.integers(0, len(US_CITIES_STATES), size=size)
+    streets = rng.integers(0, len(STREET_NAMES), size=size)
+    numbers = rng.integers(100, 10000, size=size)
+    zips = rng.integers(10000, 100000, size=size)
+    if apartments:
+        apts = np.where(rng.random(size) < 0.4, rng.integers(1, 1000, size=size), 0)
+    else:
+        apts = np.zeros(size, dtype=np.int64)
+
+    return np.array([
+        f"{n} {STREET_NAMES[s]}{f' Apt {a}' if a else ''}, "
+        f"{US_CITIES_STATES[c][0]}, {US_CITIES_STATES[c][1]} {z}"
+        for n, s, a, c, z in zip(numbers.tolist(), streets.tolist(), apts.tolist(),
+                                 cities.tolist(), zips.tolist())
+    ], dtype=object)
+
+
+def generate_catalog(seed=42, users=100, products=100, suppliers=10, today=None):
+    """
+    Small dimension tables plus the lookup arrays the fact generators need.
+    Fully determined by `seed`, so every process can rebuild the same catalog.
+    """
+    rng = np.random.default_rng([seed, 0])
+    today = np.datetime64(today or datetime.now().date(), 'D')
+
+    # warehouses
+    warehouse_count = len(WAREHOUSE_LOCATIONS)
+    warehouses = {
+        'warehouse_id': np.arange(1, warehouse_count + 1),
+        'location': np.array([f"{street}, {city}, {state} {zipcode}"
+                              for street, city, state, zipcode in WAREHOUSE_LOCATIONS], dtype=object),
+    }
+
+    # products: same per-category split as insert_products
+    total_base_products = sum(len(items) for items in PRODUCTS_DATA.values())
+    names, types, prices, makers, shelf_lives, multipliers = [], [], [], [], [], []
+    for category, items in PRODUCTS_DATA.items():
+        category_count = int(products * len(items) / total_base_products)
+        products_per_item = max(1, category_count // len(items))
+
+        for base_product, base_price, manufacturer, shelf_life, variants, qty_multiplier in items:
+            n = min(products_per_item, products - len(names))
+            if n <= 0:
+                break
+            use_base = (rng.random(n) < 0.7) | (not variants)
+            variant = np.asarray(variants or [base_product], dtype=object)[rng.integers(0, len(variants or [1]), n)]
+            factor = np.where(use_base, rng.uniform(0.95, 1.05, n), rng.uniform(0.90, 1.10, n))
+
+            names.extend(np.where(use_base, base_product, variant).tolist())
+            prices.extend(np.round(base_price * factor, 2).tolist())
+            types.extend([category] * n)
+            makers.extend([manufacturer] * n)
+            shelf_lives.extend([shelf_life] * n)
+            multipliers.extend([qty_multiplier] * n)
+
+    product_count = len(names)
+    batch_dates = np.datetime_as_string(today - rng.integers(0, 366, product_count), unit='D')
+    batch_suffix = rng.integers(1000, 10000, product_count)
+    product_prices = np.asarray(prices)
+    products_table = {
+        'product_id': np.arange(1, product_count + 1),
+        'product_name': np.asarray(names, dtype=object),
+        'type': np.asarray(types, dtype=object),
+        'price': product_prices,
+        'manufacturer': np.asarray(makers, dtype=object),
+        'shelf_life': np.asarray(shelf_lives),
+        'batch_number': np.array([f"B{d.replace('-', '')}{s}" for d, s in zip(batch_dates, batch_suffix)],
+                                 dtype=object),
+    }
+
+    # suppliers
+    duration = np.stack([rng.integers(6, 25, suppliers), rng.integers(24, 61, suppliers),
+                         rng.integers(60, 121, suppliers)], axis=1)
+    suppliers_table = {
+        'supplier_id': np.arange(1, suppliers + 1),
+        'supplier_name': np.array([
+            f"{SUPPLIER_PREFIXES[p]} {SUPPLIER_SUFFIXES[s]} #{i + 1}"
+            for i, (p, s) in enumerate(zip(rng.integers(0, len(SUPPLIER_PREFIXES), suppliers),
+                                           rng.integers(0, len(SUPPLIER_SUFFIXES), suppliers)))
+        ], dtype=object),
+        'address': _addresses(rng, suppliers),
+        'star': _weighted(rng, [3, 4, 5], [0.1, 0.4, 0.5], suppliers),
+        'duration': duration[np.arange(suppliers), _weighted(rng, [0, 1, 2], [0.2, 0.5, 0.3], suppliers)],
+        'status': _weighted(rng, np.array(['active', 'inactive'], dtype=object), [0.95, 0.05], suppliers),
+    }
+
+    # store records: cheap products are stocked in more warehouses, and in larger amounts
+    stocked = np.select(
+        [product_prices < 5, product_prices < 50],
+        [rng.integers(3, warehouse_count + 1, product_count), rng.integers(2, 4, product_count)],
+        default=rng.integers(1, 3, product_count)
+    )
+    stocked = np.minimum(stocked, warehouse_count)
+    shuffled = np.argsort(rng.random((product_count, warehouse_count)), axis=1)
+    sr_product = np.repeat(np.arange(product_count), stocked)
+    sr_offsets = np.concatenate([[0], np.cumsum(stocked)[:-1]])
+    sr_warehouse = shuffled[sr_product, np.arange(len(sr_product)) - np.repeat(sr_offsets, stocked)]
+    sr_price = product_prices[sr_product]
+    sr_quantity = np.select(
+        [sr_price < 5, sr_price < 20],
+        [rng.integers(500, 2001, len(sr_product)), rng.integers(200, 801, len(sr_product))],
+        default=rng.integers(50, 301, len(sr_product))
+    )
+    store_records = {
+        'warehouse_id': sr_warehouse + 1,
+        'product_id': sr_product + 1,
+        'storequantity': sr_quantity,
+    }
+
+    # good supply: each active supplier delivers 10-20 products to 1-2 of their warehouses
+    gs_supplier, gs_product, gs_warehouse = [], [], []
+    for supplier in np.flatnonzero(suppliers_table['status'] == 'active'):
+        chosen = rng.permutation(product_count)[:min(rng.integers(10, 21), product_count)]
+        counts = np.minimum(rng.integers(1, 3, len(chosen)), stocked[chosen])
+        for product, count in zip(chosen, counts):
+            picked = rng.permutation(stocked[product])[:count] + sr_offsets[product]
+            gs_supplier.extend([supplier] * count)
+            gs_product.extend([product] * count)
+            gs_warehouse.extend(sr_warehouse[picked].tolist())
+
+    supply_count = len(gs_supplier)
+    supply_time = (_random_days(rng, SUPPLY_START, SUPPLY_END, supply_count)
+                   + rng.integers(8, 18, supply_count) * HOUR
+                   + rng.integers(0, 60, supply_count) * 60 * SECOND)
+    good_supply = {
+        'supplier_id': np.asarray(gs_supplier, dtype=np.int64) + 1,
+        'product_id': np.asarray(gs_product, dtype=np.int64) + 1,
+        'warehouse_id': np.asarray(gs_warehouse, dtype=np.int64) + 1,
+        'quantity': rng.integers(200, 1001, supply_count),
+        'supply_time': supply_time,
+    }
+
+    return {
+        'seed': seed,
+        'users': users,
+        'order_year': int(str(today)[:4]),
+        'tables': {
+            'warehouses': warehouses,
+            'products': products_table,
+            'suppliers': suppliers_table,
+            'store_records': store_records,
+            'good_supply': good_supply,
+        },
+        # lookups for the order generator (0-based product index)
+        'product_price': product_prices,
+        'product_multiplier': np.asarray(multipliers),
+        'stock_offsets': sr_offsets,
+        'stock_counts': stocked,
+        'stock_warehouse': sr_warehouse,
+        'stock_quantity': sr_quantity,
+    }
+
+
+def generate_users(catalog, start, stop, rng):
+    """users[start:stop] (0-based indexes)"""
+    n = stop - start
+    nicknames = (np.asarray(FIRST_NAMES, dtype=object)[rng.integers(0, len(FIRST_NAMES), n)]
+                 + np.asarray(LAST_NAMES, dtype=object)[rng.integers(0, len(LAST_NAMES), n)]
+                 + rng.integers(100, 1000, n).astype(str).astype(object))
+    register_time = (_random_days(rng, USER_START, USER_END, n)
+                     + rng.integers(8, 23, n) * HOUR
+                     + rng.integers(0, 60, n) * 60 * SECOND)
+    return {
+        'users': {
+            'user_id': np.arange(start + 1, stop + 1),
+            'nickname': nicknames,
+            'register_time': register_time,
+        }
+    }
+
+
+def generate_orders(catalog, start, stop, rng):
+    """
+    orders[start:stop] (0-based indexes) with their order lines and logistics records.
+    Returns orders, inform, logistics, shipping_product and delivery_product.
+    """
+    n = stop - start
+    product_count = len(catalog['product_price'])
+
+    # who and when
+    user = rng.integers(0, catalog['users'], n)
+    buying_power = user_buying_powers(catalog['seed'], user)
+
+    order_day = _random_days(rng, ORDER_START, ORDER_END, n)
+    is_weekend = _weekday(order_day) >= 5
+    hour = np.where(is_weekend,
+                    _weighted(rng, WEEKEND_HOURS, WEEKEND_HOUR_WEIGHTS, n),
+                    _weighted(rng, WEEKDAY_HOURS, WEEKDAY_HOUR_WEIGHTS, n))
+    order_time = (order_day + hour * HOUR
+                  + rng.integers(0, 60, n) * 60 * SECOND
+                  + rng.integers(0, 60, n) * SECOND)
+    is_promotion_month = np.isin(_month(order_day), [11, 12])  # Holiday season
+
+    # how many distinct products per order (big buyers buy more)
+    num_items = np.where(buying_power > 1.2,
+                         _weighted(rng, [1, 2, 3, 4], [0.2, 0.3, 0.3, 0.2], n),
+                         _weighted(rng, [1, 2, 3], [0.5, 0.35, 0.15], n))
+    max_items = min(4, product_count)
+    num_items = np.minimum(num_items, max_items)
+    picks = _sample_without_replacement(rng, n, max_items, product_count)
+
+    # one row per order line
+    line_order = np.repeat(np.arange(n), num_items)
+    line_slot = np.arange(len(line_order)) - np.repeat(np.cumsum(num_items) - num_items, num_items)
+    product = picks[line_order, line_slot]
+
+    stock = (catalog['stock_offsets'][product]
+             + (rng.random(len(product)) * catalog['stock_counts'][product]).astype(np.int64))
+
+    quantity = calculate_realistic_quantities(
+        product_prices=catalog['product_price'][product],
+        product_multipliers=catalog['product_multiplier'][product],
+        user_buying_powers=buying_power[line_order],
+        is_weekend=is_weekend[line_order],
+        is_promotion_month=is_promotion_month[line_order],
+        hours=hour[line_order],
+        rng=rng
+    )
+    quantity = np.minimum(quantity, catalog['stock_quantity'][stock])
+
+    order_id = np.arange(start + 1, stop + 1)
+
+    # logistics: one record per order
+    company = rng.integers(0, len(EXPRESS_COMPANIES), n)
+    delivered = rng.random(n) >= 0.10
+    shipping_delay = np.where(hour < 18, rng.integers(2, 25, n), rng.integers(12, 37, n))
+    shipping_time = order_time + shipping_delay * HOUR
+
+    min_days = np.array([days[0] for _, days in EXPRESS_COMPANIES])[company]
+    max_days = np.array([days[1] for _, days in EXPRESS_COMPANIES])[company]
+    delivery_days = rng.integers(min_days, max_days + 1)
+    # nothing is delivered on Sundays
+    delivery_days += _weekday(shipping_time + delivery_days * DAY) == 6
+    delivery_time = shipping_time + delivery_days * DAY + rng.integers(9, 21, n) * HOUR
+    shipping_address = _addresses(rng, n, apartments=True)
+
+    return {
+        'orders': {
+            'order_id': order_id,
+            'user_id': user + 1,
+            'order_time': order_time,
+        },
+        'inform': {
+            'order_id': order_id[line_order],
+            'product_id': product + 1,
+            'warehouse_id': catalog['stock_warehouse'][stock] + 1,
+            'orderquantity': quantity,
+            'status': _weighted(rng, np.arange(len(ORDER_STATUSES)), ORDER_STATUS_WEIGHTS, len(product)),
+        },
+        'logistics': {
+            'logistics_id': order_id,
+            'order_id': order_id,
+            'express_company': company,
+            'logistics_status': delivered.astype(np.int64),
+        },
+        'shipping_product': {
+            'logistics_id': order_id,
+            'shipping_time': shipping_time,
+            'shipping_address': shipping_address,
+        },
+        'delivery_product': {
+            'logistics_id': order_id[delivered],
+            'delivery_time': delivery_time[delivered],
+            'delivery_address': shipping_address[delivered],
+        },
+    }
+
+
+# Shards are fixed-size index ranges, independent of the worker count, and each
+# one draws from its own stream default_rng([seed, table salt, shard index]).
+# Output is therefore identical for any number of workers, and since IDs come
+# from global indexes, shards merge without primary-key collisions.
+SHARD_SIZES = {'users': 100000, 'orders': 250000}
+SHARD_SALTS = {'users': 1, 'orders': 2}
+SHARD_GENERATORS = {'users': generate_users, 'orders': generate_orders}
+
+_worker_catalog = None
+
+
+def plan_shards(users, orders):
+    """[(part, shard index, start, stop)] covering users[0:users] and orders[0:orders]"""
+    shards = []
+    for part, total in (('users', users), ('orders', orders)):
+        size = SHARD_SIZES[part]
+        for index, start in enumerate(range(0, total, size)):
+            shards.append((part, index, start, min(start + size, total)))
+    return shards
+
+
+def generate_shard(catalog, part, index, start, stop):
+    rng = np.random.default_rng([catalog['seed'], SHARD_SALTS[part], index])
+    return SHARD_GENERATORS[part](catalog, start, stop, rng)
+
+
+def _init_worker(catalog_args):
+    # the catalog is deterministic: rebuild it once per worker instead of pickling it per shard
+    global _worker_catalog
+    _worker_catalog = generate_catalog(**catalog_args)
+
+
+def _generate_shard_in_worker(shard):
+    return generate_shard(_worker_catalog, *shard)
+
+
+def merge_shards(parts):
+    """Concatenate shard outputs ({table: {column: array}}) in shard order"""
+    merged = {}
+    for part in parts:
+        for table, columns in part.items():
+            merged.setdefault(table, []).append(columns)
+
+    return {
+        table: {name: np.concatenate([c[name] for c in chunks]) for name in chunks[0]}
+        for table, chunks in merged.items()
+    }
+
+
+def iter_shards(seed=42, users=100, orders=2000, products=100, suppliers=10, workers=1, today=None):
+    """
+    Yield the catalog's {table: columns} first, then each shard's, in shard order.
+    With workers > 1 the shards are generated in a process pool.
+    """
+    catalog_args = {'seed': seed, 'users': users, 'products': products, 'suppliers': suppliers,
+                    'today': today or datetime.now().date()}
+    catalog = generate_catalog(**catalog_args)
+    yield catalog, catalog['tables']
+
+    shards = plan_shards(users, orders)
+    if workers <= 1:
+        for shard in shards:
+            yield catalog, generate_shard(catalog, *shard)
+        return
+
+    # at most 2 shards per worker in flight, so a slow consumer (the bulk loader)
+    # does not make finished shards pile up in memory
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(catalog_args,)) as pool:
+        pending = deque()
+        for shard in shards:
+            pending.append(pool.submit(_generate_shard_in_worker, shard))
+            if len(pending) >= 2 * workers:
+                yield catalog, pending.popleft().result()
+        while pending:
+            yield catalog, pending.popleft().result()
+
+
+def generate_dataset(seed=42, users=100, orders=2000, products=100, suppliers=10, workers=1, today=None):
+    """Every table, merged from its shards"""
+    catalog, parts = None, []
+    for catalog, part in iter_shards(seed, users, orders, products, suppliers, workers, today):
+        parts.append(part)
+    return catalog, merge_shards(parts)
+
+
+def table_rows(columns):
+    return len(next(iter(columns.values())))
+
+
+def format_ids(prefix, index, width):
+    return np.char.add(prefix, np.char.zfill(np.asarray(index).astype(str), width)).astype(object)
+
+
+def format_table(columns, catalog, start=0, stop=None):
+    """
+    Rows start:stop of a generated table with MySQL values: ID strings and labels
+    instead of indexes and codes (datetimes stay datetime64[s]). Returns {column: array}.
+    """
+    formatted = {}
+    for name, values in columns.items():
+        values = values[start:stop]
+        if name in ID_FORMATS:
+            prefix, width = ID_FORMATS[name]
+            if name == 'order_id':
+                prefix = f"{prefix}{catalog['order_year']}"
+            values = format_ids(prefix, values, width)
+        elif name in CATEGORY_LABELS and np.issubdtype(values.dtype, np.integer):
+            values = np.asarray(CATEGORY_LABELS[name], dtype=object)[values]
+        formatted[name] = values
+    return formatted
+
+
+def summarize(tables):
+    for name in TABLE_ORDER:
+        if name in tables:
+            print(f"  {name:18} {table_rows(tables[name]):>12,} rows")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Vectorized synthetic warehouse data")
+    parser.add_argument('--orders', type=int, default=2000)
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument('--products', type=int, default=100)
+    parser.add_argument('--suppliers', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    catalog, tables = generate_dataset(args.seed, args.users, args.orders, args.products, args.suppliers,
+                                       workers=args.workers)
+    elapsed = time.perf_counter() - started
+
+    print("=" * 60)
+    print(f"✓ Generated in {elapsed:.2f}s")
+    summarize(tables)
+    print("=" * 60)
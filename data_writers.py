@@ -0,0 +1,246 @@
+"""
+File targets for the data generator, so benchmark datasets can be produced
+without a database.
+
+Layout of a dataset directory:
+
+    dataset.json                               format, seed, order year, row counts
+    <table>/part-00000.<ext>                   one file per generated shard
+    orders/month=2024-03/part-00002.<ext>      orders and inform are partitioned by order month
+
+Formats:
+- npz:     uncompressed NumPy arrays of the raw generated columns (integer ids, codes)
+- parquet: the same raw columns (needs pyarrow)
+- csv:     MySQL-ready values with a header row (what LOAD DATA / the bulk loader send)
+
+Datasets are read back with iter_table()/read_table() (e.g. for training) or
+iter_formatted() (MySQL values, for bulk_loader.py --from-dir).
+
+    python data_writers.py out/bench --format npz --orders 10000000 --workers 8
+"""
+import argparse
+import csv
+import json
+import os
+import time
+
+import numpy as np
+
+from data_generator import TABLE_COLUMNS, TABLE_ORDER, format_table, iter_shards, table_rows
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+
+FORMATS = {'npz': '.npz', 'parquet': '.parquet', 'csv': '.csv'}
+
+# table -> how its month is found: its own datetime column, or its order's
+MONTH_PARTITIONED = {'orders': 'order_time', 'inform': 'order_id'}
+
+MANIFEST = 'dataset.json'
+
+
+def column_values(values):
+    """numpy column -> list of values mysql-connector / csv can write"""
+    if np.issubdtype(values.dtype, np.datetime64):
+        return [s.replace('T', ' ') for s in np.datetime_as_string(values, unit='s')]
+    return values.tolist()
+
+
+def chunk_rows(chunk, columns):
+    """{column: array} -> list of row tuples in `columns` order"""
+    return list(zip(*(column_values(np.asarray(chunk[c])) for c in columns)))
+
+
+def _months(times):
+    return np.datetime_as_string(times.astype('datetime64[M]'), unit='M')
+
+
+def month_partitions(table, columns, tables):
+    """[(partition directory or None, row indexes)] for one generated table"""
+    key = MONTH_PARTITIONED.get(table)
+    if key is None:
+        return [(None, None)]
+
+    if key == 'order_time':
+        months = _months(columns['order_time'])
+    else:
+        # inform rows take the month of their order (generated in the same shard)
+        orders = tables['orders']
+        position = np.searchsorted(orders['order_id'], columns['order_id'])
+        months = _months(orders['order_time'][position])
+
+    return [(f"month={month}", np.flatnonzero(months == month)) for month in np.unique(months)]
+
+
+def _take(columns, rows):
+    return columns if rows is None else {name: values[rows] for name, values in columns.items()}
+
+
+def _write_npz(path, columns):
+    # object (Python str) columns become fixed-width unicode so no pickle is needed
+    np.savez(path, **{name: values.astype(str) if values.dtype == object else values
+                      for name, values in columns.items()})
+
+
+def _write_parquet(path, columns):
+    pq.write_table(pa.table({name: pa.array(values) for name, values in columns.items()}), path)
+
+
+def _write_csv(path, table, columns, catalog):
+    names = TABLE_COLUMNS[table]
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f, lineterminator='\n')
+        writer.writerow(names)
+        writer.writerows(chunk_rows(format_table(columns, catalog), names))
+
+
+class DatasetWriter:
+
+    def __init__(self, out_dir, fmt='npz'):
+        if fmt not in FORMATS:
+            raise ValueError(f"unknown format: {fmt} (use {', '.join(FORMATS)})")
+        if fmt == 'parquet' and pa is None:
+            raise ValueError("parquet output needs pyarrow (pip install pyarrow)")
+
+        self.out_dir = out_dir
+        self.fmt = fmt
+        self.parts = 0
+        self.rows = {}
+        self.catalog = None
+
+    def write(self, catalog, tables):
+        """Write one generated part ({table: columns}, e.g. one shard) as part-NNNNN files"""
+        self.catalog = catalog
+        name = f"part-{self.parts:05d}{FORMATS[self.fmt]}"
+
+        for table, columns in tables.items():
+            for partition, rows in month_partitions(table, columns, tables):
+                part = _take(columns, rows)
+                if table_rows(part) == 0:
+                    continue
+
+                directory = os.path.join(self.out_dir, table, *([partition] if partition else []))
+                os.makedirs(directory, exist_ok=True)
+                path = os.path.join(directory, name)
+
+                if self.fmt == 'npz':
+                    _write_npz(path, part)
+                elif self.fmt == 'parquet':
+                    _write_parquet(path, part)
+                else:
+                    _write_csv(path, table, part, self.catalog)
+
+                self.rows[table] = self.rows.get(table, 0) + table_rows(part)
+
+        self.parts += 1
+
+    def close(self):
+        """Write dataset.json; readers need it to format ids and labels"""
+        manifest = {
+            'format': self.fmt,
+            'seed': self.catalog['seed'] if self.catalog else None,
+            'order_year': self.catalog['order_year'] if self.catalog else None,
+            'rows': self.rows,
+        }
+        with open(os.path.join(self.out_dir, MANIFEST), 'w') as f:
+            json.dump(manifest, f, indent=2)
+        return manifest
+
+
+def write_dataset(out_dir, fmt='npz', seed=42, users=100, orders=2000, products=100, suppliers=10, workers=1):
+    """Generate straight to files, shard by shard; returns the manifest"""
+    writer = DatasetWriter(out_dir, fmt)
+    for catalog, tables in iter_shards(seed, users, orders, products, suppliers, workers):
+        writer.write(catalog, tables)
+    return writer.close()
+
+
+def load_manifest(path):
+    with open(os.path.join(path, MANIFEST)) as f:
+        return json.load(f)
+
+
+def table_files(path, table, fmt, months=None):
+    """Files of one table in load order; `months` (['2024-03', ...]) limits partitioned tables"""
+    root = os.path.join(path, table)
+    if not os.path.isdir(root):
+        return []
+
+    files = []
+    for directory, _, names in sorted(os.walk(root)):
+        partition = os.path.basename(directory)
+        if months is not None and partition.startswith('month=') and partition[6:] not in months:
+            continue
+        files.extend(os.path.join(directory, n) for n in sorted(names) if n.endswith(FORMATS[fmt]))
+    return files
+
+
+def read_file(file, fmt, columns=None):
+    """One data file -> {column: array}"""
+    if fmt == 'npz':
+        with np.load(file) as data:
+            return {name: data[name] for name in (columns or data.files)}
+
+    if fmt == 'parquet':
+        if pq is None:
+            raise ValueError("reading parquet needs pyarrow (pip install pyarrow)")
+        arrow_table = pq.read_table(file, columns=columns)
+        return {name: arrow_table.column(name).to_numpy() for name in arrow_table.column_names}
+
+    import pandas as pd
+    frame = pd.read_csv(file, usecols=columns, keep_default_na=False)
+    return {name: frame[name].to_numpy() for name in frame.columns}
+
+
+def iter_table(path, table, columns=None, months=None):
+    """Yield {column: array} per file of `table`"""
+    fmt = load_manifest(path)['format']
+    for file in table_files(path, table, fmt, months):
+        yield read_file(file, fmt, columns)
+
+
+def read_table(path, table, columns=None, months=None):
+    """Whole table as {column: array} (None if the dataset has no such table)"""
+    chunks = list(iter_table(path, table, columns, months))
+    if not chunks:
+        return None
+    return {name: np.concatenate([c[name] for c in chunks]) for name in chunks[0]}
+
+
+def iter_formatted(path, table, months=None):
+    """Yield chunks of MySQL-ready values (ids and labels formatted)"""
+    manifest = load_manifest(path)
+    for chunk in iter_table(path, table, months=months):
+        if manifest['format'] == 'csv':
+            yield chunk
+        else:
+            yield format_table(chunk, manifest)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate synthetic warehouse data to files")
+    parser.add_argument('out_dir')
+    parser.add_argument('--format', choices=list(FORMATS), default='npz')
+    parser.add_argument('--orders', type=int, default=2000)
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument('--products', type=int, default=100)
+    parser.add_argument('--suppliers', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    manifest = write_dataset(args.out_dir, args.format, args.seed, args.users, args.orders,
+                             args.products, args.suppliers, args.workers)
+
+    print("=" * 60)
+    print(f"✓ Wrote {args.format} dataset to {args.out_dir} in {time.perf_counter() - started:.2f}s")
+    for table in TABLE_ORDER:
+        if table in manifest['rows']:
+            print(f"  {table:18} {manifest['rows'][table]:>12,} rows")
+    print("=" * 60)
@@ -1,46 +1,19 @@
-import mysql.connector
 from mysql.connector import Error
-import os
-import tempfile
-from dotenv import load_dotenv
+from db_pool import get_pool
+from settings import get_settings
 
 
 
 class DatabaseManager:
 
     def __init__(self):
-        # load db_config
-        load_dotenv('config.env')
-        # Database configuration
-        ssl_ca_content = os.environ.get('DB_SSL_CA_CONTENT')
-        if ssl_ca_content:
-
-            temp_file = tempfile.NamedTemporaryFile(mode='w', delete=False)
-            temp_file.write(ssl_ca_content)
-            temp_file.close()
-        # get db_config KEY
-        DB_CONFIG = {
-            'host': os.environ.get('DB_HOST'),
-            'database': os.environ.get('DB_DATABASE'),
-            'user': os.environ.get('DB_USER'),
-            'password': os.environ.get('DB_PASSWORD'),
-            'port': int(os.environ.get('DB_PORT', 5432)),
-            'ssl_ca': temp_file.name,
-            'ssl_verify_cert': bool(os.environ.get('DB_SSL_VERIFY_CERT')) == True
-        }
-        self.config = DB_CONFIG.copy()
-        # add config for aiven
-        self.config.update({
-            'use_pure': True,
-            'autocommit': False,
-            'pool_name': 'mypool',
-            'pool_size': 3
-        })
+        # shared settings: config.env and the SSL CA file are only read/written once per process
+        self.settings = get_settings()
 
     def get_connection(self):
-        """get new connection"""
+        """get connection from the shared pool (close() gives it back)"""
         try:
-            return mysql.connector.connect(**self.config)
+            return get_pool().get_connection()
         except Error as e:
             print(f"connect fail: {e}")
             return None
@@ -94,6 +67,51 @@ class DatabaseManager:
                 except:
                     pass
 
+    def execute_transaction(self, statements):
+        """
+        Run (sql, params) statements in one transaction over one connection:
+        all of them are committed together, or none is
+        """
+        conn = None
+        cursor = None
+        sql = None
+        try:
+            conn = self.get_connection()
+            if not conn:
+                return False
+
+            cursor = conn.cursor()
+            for sql, params in statements:
+                if params:
+                    cursor.execute(sql, params)
+                else:
+                    cursor.execute(sql)
+
+            conn.commit()
+            return True
+
+        except Error as e:
+            print(f"execute fail: {e}")
+            print(f"SQL: {(sql or '')[:100]}...")
+            if conn:
+                try:
+                    conn.rollback()
+                except:
+                    pass
+            return False
+
+        finally:
+            if cursor:
+                try:
+                    cursor.close()
+                except:
+                    pass
+            if conn:
+                try:
+                    conn.close()
+                except:
+                    pass
+
     def fetch_all(self, query, params=None):
         """all result"""
         conn = None
@@ -164,5 +182,106 @@ class DatabaseManager:
                 except:
                     pass
 
+    def fetch_many(self, queries, dictionary=False):
+        """
+        Run several named queries over one connection.
+
+        queries: [(name, sql), (name, sql, params), ...]
+        returns {name: rows} in the same order, or None if any query fails
+
+        mysql-connector cannot pipeline parameterised statements, so the queries run
+        back to back on one cursor; N queries pay for one connection checkout.
+        """
+        conn = None
+        cursor = None
+        try:
+            conn = self.get_connection()
+            if not conn:
+                return None
+
+            cursor = conn.cursor(dictionary=dictionary)
+
+            results = {}
+            for name, query, *params in queries:
+                params = params[0] if params else None
+                if params:
+                    cursor.execute(query, params)
+                else:
+                    cursor.execute(query)
+                results[name] = cursor.fetchall()
+
+            return results
+
+        except Error as e:
+            print(f"query fail: {e}")
+            return None
+
+        finally:
+            if cursor:
+                try:
+                    cursor.close()
+                except:
+                    pass
+            if conn:
+                try:
+                    conn.close()
+                except:
+                    pass
+
+    def _stream(self, query, params=None, chunk_size=None, dictionary=False):
+        """
+        Yield (column_names, rows) batches from an unbuffered (server-side) cursor,
+        so at most chunk_size rows are held in memory at a time.
+        """
+        chunk_size = chunk_size or self.settings.extract_chunk_size
+        conn = self.get_connection()
+        if not conn:
+            return
+
+        cursor = None
+        finished = False
+        try:
+            cursor = conn.cursor(buffered=False, dictionary=dictionary)
+            if params:
+                cursor.execute(query, params)
+            else:
+                cursor.execute(query)
+
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield cursor.column_names, rows
+
+            finished = True
+
+        except Error as e:
+            # a half-read stream must not look like a complete extract
+            print(f"query fail: {e}")
+            raise
+
+        finally:
+            if finished:
+                try:
+                    cursor.close()
+                except:
+                    pass
+                conn.close()
+            else:
+                # rows may still be on the wire: drop the connection instead of draining it
+                conn.invalidate()
+
+    def fetch_iter(self, query, params=None, chunk_size=None, dictionary=False):
+        """Generator of row batches (lists of at most chunk_size rows)"""
+        for _, rows in self._stream(query, params, chunk_size, dictionary):
+            yield rows
+
+    def read_chunks(self, query, params=None, chunk_size=None):
+        """Generator of pandas DataFrame chunks (bounded-memory pd.read_sql)"""
+        import pandas as pd
+
+        for columns, rows in self._stream(query, params, chunk_size):
+            yield pd.DataFrame.from_records(rows, columns=columns, coerce_float=True)
+
     def close(self):
         print("database operations completed")
\ No newline at end of file
@@ -144,3 +144,36 @@ FOREIGN KEY (logistics_id) REFERENCES logistics(logistics_id)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
 '''
 
+
+# Summary table maintained by triggers (see summary_tables.py).
+# One row per product/warehouse that has been supplied.
+create_sell_through = '''
+DROP TABLE IF EXISTS product_sell_through;
+CREATE TABLE product_sell_through (
+product_id VARCHAR(32) NOT NULL,
+warehouse_id VARCHAR(32) NOT NULL,
+supplier_id VARCHAR(32),
+stock_quantity INT,
+supply_quantity INT,
+first_supply_time DATETIME,
+sell_through_rate DECIMAL(6,4),
+updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+PRIMARY KEY (product_id, warehouse_id),
+KEY idx_sell_through_supply_time (first_supply_time),
+KEY idx_sell_through_rate (sell_through_rate)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+'''
+
+# Daily sales rollup maintained by triggers on inform (see summary_tables.py).
+# Trailing-N-day sales for a product/warehouse is a range sum over at most N rows.
+create_daily_sales = '''
+DROP TABLE IF EXISTS daily_sales;
+CREATE TABLE daily_sales (
+product_id VARCHAR(32) NOT NULL,
+warehouse_id VARCHAR(32) NOT NULL,
+sale_date DATE NOT NULL,
+quantity INT NOT NULL DEFAULT 0,
+PRIMARY KEY (product_id, warehouse_id, sale_date),
+KEY idx_daily_sales_date (sale_date)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+'''
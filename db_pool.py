@@ -0,0 +1,216 @@
+import os
+import threading
+import time
+
+import mysql.connector
+from mysql.connector import Error
+
+from settings import get_settings
+
+
+class PoolExhaustedError(Error):
+    """Raised when no pooled connection frees up before the checkout timeout"""
+
+
+class PooledConnection:
+    """
+    Thin wrapper around a raw mysql connection.
+    Everything is delegated to the real connection except close(), which hands
+    the connection back to the pool instead of tearing down the TLS session.
+    """
+
+    def __init__(self, pool, raw):
+        self._pool = pool
+        self._raw = raw
+        self._released = False
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    def close(self):
+        if not self._released:
+            self._released = True
+            self._pool._release(self._raw)
+
+    def invalidate(self):
+        """Drop the underlying connection instead of reusing it (e.g. after an aborted stream)"""
+        if not self._released:
+            self._released = True
+            self._pool._discard(self._raw)
+
+
+class ConnectionPool:
+    """
+    Bounded, process-local pool of MySQL connections.
+
+    - health check (ping) on checkout when a connection sat idle for a while
+    - connections idle longer than max_idle are recycled
+    - callers wait up to `timeout` seconds when the pool is exhausted
+    """
+
+    def __init__(self, config, size=3, timeout=10.0, max_idle=300.0, ping_after=10.0):
+        self.config = dict(config)
+        self.size = size
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.ping_after = ping_after
+
+        self._lock = threading.Condition()
+        self._idle = []  # [(raw_connection, last_used)]
+        self._open = 0
+        self._pid = os.getpid()
+        self._metrics = {
+            'created': 0,
+            'reused': 0,
+            'recycled': 0,
+            'failed_health_checks': 0,
+            'exhausted': 0,
+            'wait_seconds': 0.0,
+        }
+
+    def _check_fork(self):
+        # gunicorn forks workers after import: never share sockets with the parent
+        if os.getpid() != self._pid:
+            self._pid = os.getpid()
+            self._idle = []
+            self._open = 0
+
+    def get_connection(self):
+        """Check out a connection, waiting for a free slot if the pool is full"""
+        deadline = time.monotonic() + self.timeout
+        started = time.monotonic()
+
+        while True:
+            raw = None
+            last_used = None
+            create = False
+
+            with self._lock:
+                self._check_fork()
+                while True:
+                    if self._idle:
+                        raw, last_used = self._idle.pop()
+                        break
+                    if self._open < self.size:
+                        self._open += 1
+                        create = True
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._metrics['exhausted'] += 1
+                        raise PoolExhaustedError(
+                            msg=f"connection pool exhausted ({self.size} connections in use)")
+                    self._lock.wait(remaining)
+                self._metrics['wait_seconds'] += time.monotonic() - started
+
+            if create:
+                try:
+                    raw = mysql.connector.connect(**self.config)
+                except Exception:
+                    with self._lock:
+                        self._open -= 1
+                        self._lock.notify()
+                    raise
+                with self._lock:
+                    self._metrics['created'] += 1
+                return PooledConnection(self, raw)
+
+            idle_for = time.monotonic() - last_used
+            if idle_for > self.max_idle:
+                # recycle: the server (or a proxy) may already have dropped it
+                self._discard(raw)
+                with self._lock:
+                    self._metrics['recycled'] += 1
+                continue
+
+            if idle_for > self.ping_after:
+                try:
+                    raw.ping(reconnect=False)
+                except Exception:
+                    self._discard(raw)
+                    with self._lock:
+                        self._metrics['failed_health_checks'] += 1
+                    continue
+
+            with self._lock:
+                self._metrics['reused'] += 1
+            return PooledConnection(self, raw)
+
+    def _release(self, raw):
+        try:
+            # end the implicit transaction so the next user does not read a stale snapshot
+            if raw.unread_result:
+                raw.consume_results()
+            if raw.in_transaction:
+                raw.rollback()
+        except Exception:
+            self._discard(raw)
+            return
+
+        with self._lock:
+            if os.getpid() != self._pid:
+                return
+            self._idle.append((raw, time.monotonic()))
+            self._lock.notify()
+
+    def _discard(self, raw):
+        try:
+            raw.close()
+        except Exception:
+            pass
+        with self._lock:
+            if os.getpid() == self._pid:
+                self._open -= 1
+            self._lock.notify()
+
+    def stats(self):
+        with self._lock:
+            self._check_fork()
+            stats = dict(self._metrics)
+            stats['size'] = self.size
+            stats['open'] = self._open
+            stats['idle'] = len(self._idle)
+            stats['in_use'] = self._open - len(self._idle)
+        stats['wait_seconds'] = round(stats['wait_seconds'], 3)
+        return stats
+
+    def close_all(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+            self._open -= len(idle)
+        for raw, _ in idle:
+            try:
+                raw.close()
+            except Exception:
+                pass
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """
+    Return the process-wide pool, creating it from the shared settings on first use.
+    Pool size is per process, i.e. per gunicorn worker (DB_POOL_SIZE).
+    """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                settings = get_settings()
+                _pool = ConnectionPool(
+                    settings.mysql_config(),
+                    size=settings.db_pool_size,
+                    timeout=settings.db_pool_timeout,
+                    max_idle=settings.db_pool_max_idle,
+                    ping_after=settings.db_pool_ping_after,
+                )
+    return _pool
+
+
+def pool_stats():
+    """Pool metrics for /health, or None when nothing has connected yet"""
+    if _pool is None:
+        return None
+    return _pool.stats()
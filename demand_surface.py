@@ -0,0 +1,192 @@
+"""
+Precomputed demand response surface for the random forest demand model.
+
+Every feature except price is discrete (category, warehouse, hour, day, month),
+and a forest is a step function of price that only changes at its split
+thresholds. So the model can be evaluated once, offline, for every discrete
+combination and every price interval between thresholds; serving is then an
+array lookup instead of a model.predict call.
+
+Discrete values the forest never separates (e.g. hours 0-8) share one bucket,
+which keeps the artifact small. Lookups are exact for in-range inputs: the
+interval search mirrors the forest's own float32 `x <= threshold` comparison.
+
+The artifact is a directory of uncompressed .npy files that serving
+memory-maps, so gunicorn workers share one copy through the page cache.
+
+    python demand_surface.py   # after train_model.py: writes models/demand_surface/
+"""
+import hashlib
+import json
+import os
+import time
+
+import joblib
+import numpy as np
+
+from encoders import load_encoder
+
+
+SURFACE_PATH = 'models/demand_surface'
+MODEL_PATH = 'models/demand_forecast_model.pkl'
+
+# feature index -> integer values the serving side can send (day: DAYOFWEEK, Sunday = 1 ... Saturday = 7)
+HOURS = np.arange(0, 24)
+DAYS = np.arange(1, 8)
+MONTHS = np.arange(1, 13)
+
+PRICE = 1
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def split_thresholds(model, feature):
+    """Sorted distinct thresholds the forest uses on one feature"""
+    return np.unique(np.concatenate([
+        tree.tree_.threshold[tree.tree_.feature == feature] for tree in model.estimators_
+    ]))
+
+
+def bucket_values(domain, thresholds):
+    """
+    Group integer feature values that fall between the same thresholds.
+    Returns (bucket index per domain value, one representative value per bucket).
+    """
+    codes = np.searchsorted(thresholds, domain.astype(np.float32), side='left')
+    _, first, bucket = np.unique(codes, return_index=True, return_inverse=True)
+    return bucket.astype(np.int16), domain[first]
+
+
+def price_edges(thresholds):
+    """
+    One representative float32 price per interval between thresholds.
+    The forest sends x <= threshold left, so interval k is (t[k-1], t[k]]; its
+    representative is the largest float32 not above t[k] (one past the end for the last one).
+    """
+    edges = thresholds.astype(np.float32)
+    edges = np.where(edges.astype(np.float64) > thresholds, np.nextafter(edges, np.float32(-np.inf)), edges)
+    top = np.nextafter(np.float32(thresholds[-1]), np.float32(np.inf)) if len(thresholds) else np.float32(0)
+    return np.append(edges, top)
+
+
+def build_surface(model, category_encoder, warehouse_encoder, chunk_rows=1000000):
+    """Evaluate the model over every discrete combination x price interval"""
+    thresholds = split_thresholds(model, PRICE)
+    prices = price_edges(thresholds)
+
+    categories = np.arange(len(category_encoder.classes_))
+    warehouses = np.arange(len(warehouse_encoder.classes_))
+    hour_bucket, hour_values = bucket_values(HOURS, split_thresholds(model, 2))
+    day_bucket, day_values = bucket_values(DAYS, split_thresholds(model, 3))
+    month_bucket, month_values = bucket_values(MONTHS, split_thresholds(model, 4))
+
+    # feature order: category, price, hour, day, month, warehouse
+    axes = [categories, warehouses, hour_values, day_values, month_values, prices]
+    grid = np.stack([a.ravel() for a in np.meshgrid(*axes, indexing='ij')], axis=1).astype(np.float32)
+    X = grid[:, [0, 5, 2, 3, 4, 1]]
+
+    values = np.empty(len(X))
+    for start in range(0, len(X), chunk_rows):
+        values[start:start + chunk_rows] = model.predict(X[start:start + chunk_rows])
+
+    return {
+        'values': values.reshape([len(a) for a in axes]),
+        'price_thresholds': thresholds,
+        'hour_bucket': hour_bucket,
+        'day_bucket': day_bucket,
+        'month_bucket': month_bucket,
+        'categories': np.asarray(category_encoder.classes_, dtype=str),
+        'warehouses': np.asarray(warehouse_encoder.classes_, dtype=str),
+    }
+
+
+def save_surface(surface, path=SURFACE_PATH, model_sha256=None, model_path=MODEL_PATH):
+    """Store the surface with the hash of the model it was computed from"""
+    os.makedirs(path, exist_ok=True)
+    for name, values in surface.items():
+        np.save(os.path.join(path, f"{name}.npy"), values)
+    with open(os.path.join(path, 'surface.json'), 'w') as f:
+        json.dump({'model_sha256': model_sha256 or file_sha256(model_path)}, f)
+
+
+class DemandSurface:
+    """Serving side of the surface: exact forest output by array lookup"""
+
+    def __init__(self, path=SURFACE_PATH, mmap_mode='r'):
+        with open(os.path.join(path, 'surface.json')) as f:
+            self.model_sha256 = json.load(f)['model_sha256']
+
+        def load(name):
+            return np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mmap_mode)
+
+        self.values = load('values')
+        self.price_thresholds = load('price_thresholds')
+        self.hour_bucket = load('hour_bucket')
+        self.day_bucket = load('day_bucket')
+        self.month_bucket = load('month_bucket')
+        self.categories = load('categories')
+        self.warehouses = load('warehouses')
+
+    def matches(self, model_sha256, category_encoder, warehouse_encoder):
+        """False when the surface was built from another model or other encoders"""
+        return (self.model_sha256 == model_sha256
+                and list(self.categories) == list(category_encoder.classes_)
+                and list(self.warehouses) == list(warehouse_encoder.classes_))
+
+    def covers(self, hour, day, month):
+        """True if the time features are inside the precomputed integer domain"""
+        hour, day, month = (np.asarray(v) for v in (hour, day, month))
+        return bool(
+            np.all(np.isin(hour, HOURS)) and np.all(np.isin(day, DAYS)) and np.all(np.isin(month, MONTHS))
+        )
+
+    def lookup(self, category_encoded, price, hour, day, month, warehouse_encoded):
+        """
+        Predicted quantities; every argument may be a scalar or an array (broadcast).
+        Check covers() first: out-of-domain time features raise IndexError.
+        """
+        price = np.asarray(price, dtype=np.float64).astype(np.float32).astype(np.float64)
+        interval = np.searchsorted(self.price_thresholds, price, side='left')
+
+        return self.values[
+            np.asarray(category_encoded, dtype=np.intp),
+            np.asarray(warehouse_encoded, dtype=np.intp),
+            self.hour_bucket[np.asarray(hour, dtype=np.intp) - HOURS[0]],
+            self.day_bucket[np.asarray(day, dtype=np.intp) - DAYS[0]],
+            self.month_bucket[np.asarray(month, dtype=np.intp) - MONTHS[0]],
+            interval
+        ]
+
+
+def load_surface(path=SURFACE_PATH, model_sha256=None, category_encoder=None, warehouse_encoder=None):
+    """The surface if it exists and matches the given model and encoders, else None"""
+    try:
+        surface = DemandSurface(path)
+    except (OSError, KeyError, ValueError) as e:
+        print(f"Demand surface not loaded - {e}")
+        return None
+
+    if model_sha256 is not None and not surface.matches(model_sha256, category_encoder, warehouse_encoder):
+        print("Demand surface is stale (model or encoders changed): run demand_surface.py")
+        return None
+
+    return surface
+
+
+if __name__ == "__main__":
+    model = joblib.load(MODEL_PATH)
+    category_encoder = load_encoder('models/category_encoder.pkl', 'category')
+    warehouse_encoder = load_encoder('models/warehouse_encoder.pkl', 'warehouse')
+
+    started = time.perf_counter()
+    surface = build_surface(model, category_encoder, warehouse_encoder)
+    save_surface(surface)
+
+    print(f"✓ Demand surface {surface['values'].shape} saved to {SURFACE_PATH} "
+          f"in {time.perf_counter() - started:.1f}s")
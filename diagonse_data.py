@@ -1,7 +1,16 @@
 import pandas as pd
 import matplotlib.pyplot as plt
 
-df = pd.read_csv('warehouse_data.csv')
+from feature_store import FeatureStore
+
+COLUMNS = ['orderquantity', 'price', 'product_category', 'order_hour']
+
+# Only the columns used below: from the feature store, else from the CSV extract
+store = FeatureStore()
+if store.rows:
+    df = store.frame(COLUMNS)
+else:
+    df = pd.read_csv('warehouse_data.csv', usecols=COLUMNS)
 
 print("="*60)
 print("Data Diagnosis")
@@ -0,0 +1,79 @@
+"""
+Feature drift between a reference window and recent months of the feature store.
+
+Population stability index (PSI) per model input and the target: numeric
+columns are binned at the reference deciles, discrete ones by value.
+PSI < 0.1 is stable, 0.1-0.2 worth watching, > 0.2 a shift the model may not handle.
+Reads only the checked columns of the selected month partitions.
+
+    python drift_check.py                  # latest month vs the 3 months before it
+    python drift_check.py --current 2024-11 --reference 2024-06 2024-07 2024-08
+"""
+import argparse
+
+import numpy as np
+
+from feature_store import FeatureStore
+
+
+NUMERIC_COLUMNS = ['price', 'orderquantity']
+DISCRETE_COLUMNS = ['category_code', 'warehouse_code', 'order_hour', 'order_day']
+
+PSI_WARN = 0.1
+PSI_ALERT = 0.2
+
+
+def psi(expected, actual, eps=1e-4):
+    """PSI of two histograms (counts over the same bins)"""
+    expected = np.maximum(expected / max(expected.sum(), 1), eps)
+    actual = np.maximum(actual / max(actual.sum(), 1), eps)
+    return float(np.sum((actual - expected) * np.log(actual / expected)))
+
+
+def numeric_psi(reference, current, bins=10):
+    edges = np.unique(np.quantile(reference, np.linspace(0, 1, bins + 1)[1:-1]))
+    return psi(np.bincount(np.searchsorted(edges, reference), minlength=len(edges) + 1),
+               np.bincount(np.searchsorted(edges, current), minlength=len(edges) + 1))
+
+
+def discrete_psi(reference, current):
+    values = np.union1d(np.unique(reference), np.unique(current))
+    return psi(np.bincount(np.searchsorted(values, reference), minlength=len(values)),
+               np.bincount(np.searchsorted(values, current), minlength=len(values)))
+
+
+def check_drift(store, current_months, reference_months):
+    """{column: psi}"""
+    columns = NUMERIC_COLUMNS + DISCRETE_COLUMNS
+    reference = store.read(columns, reference_months)
+    current = store.read(columns, current_months)
+
+    report = {}
+    for column in columns:
+        if not len(reference[column]) or not len(current[column]):
+            continue
+        compare = numeric_psi if column in NUMERIC_COLUMNS else discrete_psi
+        report[column] = compare(np.asarray(reference[column]), np.asarray(current[column]))
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Feature drift check on the feature store")
+    parser.add_argument('--current', nargs='+', help="months to check (default: the latest)")
+    parser.add_argument('--reference', nargs='+', help="reference months (default: the 3 before)")
+    parser.add_argument('--path', default=None)
+    args = parser.parse_args()
+
+    store = FeatureStore(args.path)
+    months = store.months
+    if len(months) < 2 and not (args.current and args.reference):
+        raise SystemExit("Need at least two months in the feature store")
+
+    current_months = args.current or months[-1:]
+    reference_months = args.reference or [m for m in months if m < min(current_months)][-3:]
+
+    print(f"Current {', '.join(current_months)} vs reference {', '.join(reference_months)}")
+    print("=" * 60)
+    for column, value in check_drift(store, current_months, reference_months).items():
+        flag = "ALERT" if value > PSI_ALERT else "watch" if value > PSI_WARN else "ok"
+        print(f"{column:<16} PSI {value:7.4f}  {flag}")
@@ -0,0 +1,96 @@
+"""
+Dict-backed categorical encoders shared by training and serving.
+
+Same codes as sklearn's LabelEncoder (position in the sorted classes), but a
+lookup is a dict access instead of array conversion + searchsorted, and unknown
+values follow an explicit policy instead of always raising.
+
+Training fits a CategoryEncoder and still saves a LabelEncoder pickle
+(to_label_encoder), so the model artifacts keep their format; serving rebuilds
+the CategoryEncoder from that pickle (from_label_encoder).
+"""
+import joblib
+import numpy as np
+from sklearn.preprocessing import LabelEncoder
+
+
+class CategoryEncoder:
+    """
+    unknown='error': unseen values raise ValueError (LabelEncoder behaviour)
+    unknown='value': unseen values get `unknown_value` (e.g. -1)
+    """
+
+    def __init__(self, classes, name='value', unknown='error', unknown_value=-1):
+        if unknown not in ('error', 'value'):
+            raise ValueError(f"unknown policy must be 'error' or 'value', not {unknown!r}")
+
+        self.classes_ = np.asarray(classes)
+        self.name = name
+        self.unknown = unknown
+        self.unknown_value = unknown_value
+        self.codes = {value: code for code, value in enumerate(self.classes_.tolist())}
+
+    @classmethod
+    def fit(cls, values, **kwargs):
+        """Classes are the sorted distinct values, exactly like LabelEncoder.fit"""
+        return cls(np.unique(np.asarray(values)), **kwargs)
+
+    @classmethod
+    def from_label_encoder(cls, label_encoder, **kwargs):
+        return cls(label_encoder.classes_, **kwargs)
+
+    def to_label_encoder(self):
+        label_encoder = LabelEncoder()
+        label_encoder.classes_ = self.classes_
+        return label_encoder
+
+    def _missing(self, value):
+        if self.unknown == 'error':
+            raise ValueError(f"unknown {self.name}: {value!r}")
+        return self.unknown_value
+
+    def encode(self, value):
+        """One value -> int code"""
+        code = self.codes.get(value)
+        return self._missing(value) if code is None else code
+
+    def encode_many(self, values):
+        """
+        Array / list of values -> int64 codes. Each distinct value is looked up
+        once, so this stays fast for millions of rows.
+        """
+        values = np.asarray(values)
+        if values.size == 0:
+            return np.empty(values.shape, dtype=np.int64)
+
+        uniques, inverse = np.unique(values, return_inverse=True)
+        codes = np.array([self.encode(value) for value in uniques.tolist()], dtype=np.int64)
+        return codes[inverse].reshape(values.shape)
+
+    def encode_known(self, values):
+        """
+        Like encode_many, but never raises: returns (codes, known mask) with
+        unknown values coded as unknown_value (for per-row error reporting)
+        """
+        values = np.asarray(values)
+        if values.size == 0:
+            return np.empty(values.shape, dtype=np.int64), np.empty(values.shape, dtype=bool)
+
+        uniques, inverse = np.unique(values, return_inverse=True)
+        codes = np.array([self.codes.get(value, self.unknown_value) for value in uniques.tolist()], dtype=np.int64)
+        known = np.array([value in self.codes for value in uniques.tolist()], dtype=bool)
+        return codes[inverse].reshape(values.shape), known[inverse].reshape(values.shape)
+
+    def decode(self, code):
+        return self.classes_[code]
+
+    def __contains__(self, value):
+        return value in self.codes
+
+    def __len__(self):
+        return len(self.classes_)
+
+
+def load_encoder(path, name='value', **kwargs):
+    """CategoryEncoder from a pickled LabelEncoder (models/*_encoder.pkl)"""
+    return CategoryEncoder.from_label_encoder(joblib.load(path), name=name, **kwargs)
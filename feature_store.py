@@ -0,0 +1,325 @@
+"""
+Columnar, append-only store of the demand model's training features.
+
+Layout (month partitions of typed, uncompressed .npy columns):
+
+    features/store.json                        columns, dictionaries, partitions, watermark
+    features/month=2024-03/<column>.npy        one file per column, rows sorted by order_time
+
+Category and warehouse are dictionary-encoded: the store keeps int32 codes and
+an append-only list of values in store.json, so appending new values never
+rewrites old partitions. Training maps the store codes to its encoder's codes
+with a small lookup array (encode()).
+
+Appends come from MySQL (ml_data.iter_since after the watermark) or a generated
+dataset; only the months they touch are rewritten. Readers open just the
+columns and months they ask for, memory-mapped, and `since` is a binary search
+on the sorted order_time column.
+
+    python feature_store.py sync                 # append new orders from MySQL
+    python feature_store.py sync --from-dir ds/  # or from a data_writers.py dataset
+    python feature_store.py info
+"""
+import argparse
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from encoders import CategoryEncoder
+from model_store import FEATURE_COLUMNS
+from settings import get_settings
+
+
+MANIFEST = 'store.json'
+
+# stored column -> dtype
+COLUMNS = {
+    'order_time': 'datetime64[s]',
+    'category_code': np.int32,
+    'warehouse_code': np.int32,
+    'price': np.float64,
+    'order_hour': np.int8,
+    'order_day': np.int8,
+    'order_month': np.int8,
+    'orderquantity': np.int32,
+}
+
+# dictionary-encoded column -> (source column in the extract, dictionary name)
+DICTIONARY_COLUMNS = {
+    'category_code': ('product_category', 'category'),
+    'warehouse_code': ('warehouse_id', 'warehouse'),
+}
+
+# decoded (virtual) column -> stored code column
+DECODED_COLUMNS = {source: code for code, (source, _) in DICTIONARY_COLUMNS.items()}
+
+TRAINING_COLUMNS = ['order_time', 'category_code', 'warehouse_code', 'price',
+                    'order_hour', 'order_day', 'order_month', 'orderquantity']
+
+
+def derive_time_features(df):
+    """HOUR / DAYOFWEEK (Sunday = 1) / MONTH of order_time, as in the SQL extract"""
+    times = pd.to_datetime(df['order_time'])
+    df['order_hour'] = times.dt.hour
+    df['order_day'] = (times.dt.dayofweek + 1) % 7 + 1
+    df['order_month'] = times.dt.month
+    return df
+
+
+class FeatureStore:
+
+    def __init__(self, path=None):
+        self.path = path or get_settings().feature_store_dir
+        try:
+            with open(os.path.join(self.path, MANIFEST)) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            manifest = {'dictionaries': {'category': [], 'warehouse': []}, 'partitions': {},
+                        'watermark': None}
+
+        self.dictionaries = manifest['dictionaries']
+        self.partitions = manifest['partitions']
+        self.watermark = manifest['watermark']
+
+    @property
+    def months(self):
+        return sorted(self.partitions)
+
+    @property
+    def rows(self):
+        return sum(p['rows'] for p in self.partitions.values())
+
+    def _file(self, month, column):
+        return os.path.join(self.path, f"month={month}", f"{column}.npy")
+
+    def _save_manifest(self):
+        tmp = os.path.join(self.path, MANIFEST + '.tmp')
+        with open(tmp, 'w') as f:
+            json.dump({'columns': {c: np.dtype(t).name for c, t in COLUMNS.items()},
+                       'dictionaries': self.dictionaries, 'partitions': self.partitions,
+                       'watermark': self.watermark}, f, indent=2)
+        os.replace(tmp, os.path.join(self.path, MANIFEST))
+
+    def _codes(self, values, name):
+        """Dictionary codes for a column of values, extending the dictionary"""
+        dictionary = self.dictionaries[name]
+        codes = {value: code for code, value in enumerate(dictionary)}
+        uniques, inverse = np.unique(np.asarray(values, dtype=str), return_inverse=True)
+        for value in uniques.tolist():
+            if value not in codes:
+                codes[value] = len(dictionary)
+                dictionary.append(value)
+        return np.array([codes[value] for value in uniques.tolist()], dtype=np.int32)[inverse]
+
+    # -- writing --
+
+    def append(self, df):
+        """
+        Append extract rows (ml_data.query columns; the time features are derived
+        when missing). Rows may not be older than the watermark: the sync methods
+        select order_time > watermark, and a streamed extract may split rows that
+        share a timestamp across chunks. Returns rows appended.
+        """
+        if df.empty:
+            return 0
+        df = df.copy()
+        df['order_time'] = pd.to_datetime(df['order_time'])
+        if self.watermark is not None and df['order_time'].min() < pd.Timestamp(self.watermark):
+            raise ValueError(f"rows older than the feature store watermark {self.watermark}")
+        if 'order_hour' not in df:
+            df = derive_time_features(df)
+        df = df.sort_values('order_time', kind='stable')
+
+        columns = {}
+        for column, dtype in COLUMNS.items():
+            if column in DICTIONARY_COLUMNS:
+                source, name = DICTIONARY_COLUMNS[column]
+                columns[column] = self._codes(df[source], name)
+            else:
+                columns[column] = df[column].to_numpy(dtype=dtype)
+
+        months = np.datetime_as_string(columns['order_time'].astype('datetime64[M]'), unit='M')
+        for month in np.unique(months):
+            rows = months == month
+            self._append_month(str(month), {c: v[rows] for c, v in columns.items()})
+
+        self.watermark = str(columns['order_time'][-1]).replace('T', ' ')
+        self._save_manifest()
+        return len(df)
+
+    def _append_month(self, month, columns):
+        # rows arrive after the watermark, so concatenating keeps the partition time-sorted
+        os.makedirs(os.path.dirname(self._file(month, 'order_time')), exist_ok=True)
+        existing = self.partitions.get(month)
+
+        for column, values in columns.items():
+            path = self._file(month, column)
+            if existing:
+                values = np.concatenate([np.load(path, mmap_mode='r'), values])
+            tmp = path + '.tmp.npy'
+            np.save(tmp, values.astype(COLUMNS[column], copy=False))
+            os.replace(tmp, path)
+
+        times = columns['order_time']
+        self.partitions[month] = {
+            'rows': (existing['rows'] if existing else 0) + len(times),
+            'first': existing['first'] if existing else str(times[0]),
+            'last': str(times[-1]),
+        }
+
+    def sync_mysql(self, chunk_size=None):
+        """Append the orders placed after the watermark, streamed from MySQL"""
+        from ML_extract_data import ml_data
+
+        rows = 0
+        for chunk in ml_data().iter_since(self.watermark, chunk_size):
+            rows += self.append(chunk)
+        return rows
+
+    def sync_files(self, dataset_dir, months=None):
+        """Append the orders after the watermark from a data_writers.py dataset"""
+        from ML_extract_data import extract_from_files
+
+        return self.append(extract_from_files(dataset_dir, months=months, since=self.watermark))
+
+    # -- reading --
+
+    def _window(self, month, since=None, until=None):
+        """Row slice of one partition with since < order_time <= until"""
+        times = np.load(self._file(month, 'order_time'), mmap_mode='r')
+        start = 0 if since is None else np.searchsorted(times, np.datetime64(pd.Timestamp(since), 's'), 'right')
+        stop = len(times) if until is None else np.searchsorted(times, np.datetime64(pd.Timestamp(until), 's'), 'right')
+        return slice(start, stop)
+
+    def _selected(self, months=None, since=None, until=None):
+        selected = self.months if months is None else [m for m in self.months if m in months]
+        if since is not None:
+            since_ts = pd.Timestamp(since)
+            selected = [m for m in selected if pd.Timestamp(self.partitions[m]['last']) > since_ts]
+        if until is not None:
+            until_ts = pd.Timestamp(until)
+            selected = [m for m in selected if pd.Timestamp(self.partitions[m]['first']) <= until_ts]
+        return selected
+
+    def read(self, columns=None, months=None, since=None, until=None):
+        """
+        {column: array} for the requested stored columns (default: all) over the
+        requested months, optionally only rows with since < order_time <= until.
+        A single partition comes back memory-mapped; several are concatenated.
+        """
+        columns = list(columns or COLUMNS)
+        selected = self._selected(months, since, until)
+        windows = {m: self._window(m, since, until) for m in selected} if since or until else {}
+
+        result = {}
+        for column in columns:
+            parts = [np.load(self._file(m, column), mmap_mode='r')[windows.get(m, slice(None))]
+                     for m in selected]
+            if not parts:
+                result[column] = np.empty(0, dtype=COLUMNS[column])
+            elif len(parts) == 1:
+                result[column] = parts[0]
+            else:
+                result[column] = np.concatenate(parts)
+        return result
+
+    def frame(self, columns=None, months=None, since=None, until=None):
+        """DataFrame of stored columns; 'product_category' / 'warehouse_id' are decoded"""
+        columns = list(columns or COLUMNS)
+        stored = [DECODED_COLUMNS.get(c, c) for c in columns]
+        data = self.read(list(dict.fromkeys(stored)), months, since, until)
+
+        out = {}
+        for column, source in zip(columns, stored):
+            if column in DECODED_COLUMNS:
+                out[column] = self.decode(source, data[source])
+            else:
+                out[column] = data[column]
+        return pd.DataFrame(out)
+
+    def sample(self, rows, until, rng, columns=TRAINING_COLUMNS):
+        """
+        About `rows` random rows with order_time <= until. Rows are drawn per month in
+        proportion to its size and gathered from the memmaps, so the cost follows `rows`.
+        """
+        selected = self._selected(until=until)
+        windows = {m: self._window(m, until=until) for m in selected}
+        sizes = np.array([windows[m].stop for m in selected])
+        if not len(sizes) or sizes.sum() == 0:
+            return pd.DataFrame({c: np.empty(0, dtype=COLUMNS[c]) for c in columns})
+
+        counts = rng.multinomial(min(rows, int(sizes.sum())), sizes / sizes.sum())
+        frames = []
+        for month, size, count in zip(selected, sizes, counts):
+            if count == 0:
+                continue
+            picked = np.sort(rng.choice(size, min(count, size), replace=False))
+            frames.append(pd.DataFrame({c: np.load(self._file(month, c), mmap_mode='r')[picked]
+                                        for c in columns}))
+        return pd.concat(frames, ignore_index=True)
+
+    # -- dictionaries / encoders --
+
+    def decode(self, column, codes):
+        return np.asarray(self.dictionaries[DICTIONARY_COLUMNS[column][1]])[codes]
+
+    def fit_encoders(self, months=None):
+        """CategoryEncoders over the values present in the selected months (training)"""
+        if months is None:
+            return (CategoryEncoder.fit(self.dictionaries['category'], name='category'),
+                    CategoryEncoder.fit(self.dictionaries['warehouse'], name='warehouse'))
+        data = self.read(['category_code', 'warehouse_code'], months)
+        return (CategoryEncoder.fit(self.decode('category_code', np.unique(data['category_code'])),
+                                    name='category'),
+                CategoryEncoder.fit(self.decode('warehouse_code', np.unique(data['warehouse_code'])),
+                                    name='warehouse'))
+
+    def lookup(self, column, encoder):
+        """store code -> encoder code (-1 where the encoder does not know the value)"""
+        return np.array([encoder.codes.get(value, -1)
+                         for value in self.dictionaries[DICTIONARY_COLUMNS[column][1]]], dtype=np.int64)
+
+    def encode(self, df, category_encoder, warehouse_encoder):
+        """
+        Training frame (TRAINING_COLUMNS) -> (X in FEATURE_COLUMNS order, y, known),
+        known marking rows whose category and warehouse the encoders have
+        """
+        category = self.lookup('category_code', category_encoder)[df['category_code'].to_numpy()]
+        warehouse = self.lookup('warehouse_code', warehouse_encoder)[df['warehouse_code'].to_numpy()]
+        X = pd.DataFrame({
+            'product_category_encoded': category,
+            'price': df['price'].to_numpy(),
+            'order_hour': df['order_hour'].to_numpy(),
+            'order_day': df['order_day'].to_numpy(),
+            'order_month': df['order_month'].to_numpy(),
+            'warehouse_encoded': warehouse,
+        })[FEATURE_COLUMNS]
+        return X, df['orderquantity'].reset_index(drop=True), (category >= 0) & (warehouse >= 0)
+
+    def describe(self):
+        return {
+            'path': self.path,
+            'rows': self.rows,
+            'watermark': self.watermark,
+            'months': {m: self.partitions[m]['rows'] for m in self.months},
+            'categories': len(self.dictionaries['category']),
+            'warehouses': len(self.dictionaries['warehouse']),
+        }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Columnar training feature store")
+    parser.add_argument('command', choices=['sync', 'info'])
+    parser.add_argument('--path', default=None)
+    parser.add_argument('--from-dir', help="append from a generated dataset directory instead of MySQL")
+    parser.add_argument('--chunk-size', type=int, default=None)
+    args = parser.parse_args()
+
+    store = FeatureStore(args.path)
+    if args.command == 'sync':
+        rows = store.sync_files(args.from_dir) if args.from_dir else store.sync_mysql(args.chunk_size)
+        print(f"✓ Appended {rows:,} rows (store: {store.rows:,} rows, watermark {store.watermark})")
+    else:
+        print(json.dumps(store.describe(), indent=2))
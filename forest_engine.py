@@ -0,0 +1,131 @@
+"""
+Array-compiled inference for the RandomForestRegressor demand model.
+
+sklearn's predict on one row is dominated by input validation and thread
+dispatch, not by walking the trees. CompiledForest copies every tree into flat
+node arrays (feature, threshold, left, right, value) and walks all trees for a
+batch of rows at once, one tree level per NumPy step.
+
+Predictions are bit-identical to RandomForestRegressor.predict: inputs are
+compared as float32 against the float64 thresholds like sklearn does, and the
+per-tree outputs are summed in tree order before dividing by the tree count.
+
+save()/load() store the node arrays as plain .npy files; load() memory-maps
+them, so every worker process shares one copy through the OS page cache.
+"""
+import json
+import os
+
+import numpy as np
+
+NODE_ARRAYS = ('feature', 'threshold', 'children', 'value', 'missing_left', 'roots')
+
+
+class CompiledForest:
+
+    def __init__(self, feature, threshold, children, value, missing_left, roots, max_depth):
+        self.feature = feature
+        self.threshold = threshold
+        # children[2 * node] is the left child, children[2 * node + 1] the right one
+        self.children = children
+        self.value = value
+        self.missing_left = missing_left
+        self.roots = roots
+        self.max_depth = max_depth
+        self.n_trees = len(roots)
+        self.has_missing_rules = bool(missing_left.any())
+
+    @classmethod
+    def from_sklearn(cls, model):
+        """Flatten a fitted single-output RandomForestRegressor"""
+        if getattr(model, 'n_outputs_', 1) != 1:
+            raise ValueError("only single-output forests are supported")
+
+        feature, threshold, children, value, missing_left, roots = [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            n = tree.node_count
+            is_leaf = tree.children_left == -1
+            own = np.arange(offset, offset + n)
+
+            # leaves point at themselves, so extra steps past a shallow leaf stay on it
+            feature.append(np.where(is_leaf, 0, tree.feature))
+            threshold.append(np.where(is_leaf, np.inf, tree.threshold))
+            children.append(np.stack([
+                np.where(is_leaf, own, tree.children_left + offset),
+                np.where(is_leaf, own, tree.children_right + offset),
+            ], axis=1).ravel())
+            value.append(tree.value[:, 0, 0])
+            missing = getattr(tree, 'missing_go_to_left', None)
+            missing_left.append(np.zeros(n, dtype=bool) if missing is None else missing.astype(bool))
+            roots.append(offset)
+
+            max_depth = max(max_depth, tree.max_depth)
+            offset += n
+
+        return cls(
+            feature=np.concatenate(feature).astype(np.int32),
+            threshold=np.concatenate(threshold).astype(np.float64),
+            children=np.concatenate(children).astype(np.int32),
+            value=np.concatenate(value).astype(np.float64),
+            missing_left=np.concatenate(missing_left),
+            roots=np.asarray(roots, dtype=np.int32),
+            max_depth=max_depth,
+        )
+
+    def save(self, directory):
+        """Uncompressed .npy per node array plus forest.json"""
+        os.makedirs(directory, exist_ok=True)
+        for name in NODE_ARRAYS:
+            np.save(os.path.join(directory, f"{name}.npy"), getattr(self, name))
+        with open(os.path.join(directory, 'forest.json'), 'w') as f:
+            json.dump({'max_depth': self.max_depth, 'n_trees': self.n_trees}, f)
+
+    @classmethod
+    def load(cls, directory, mmap_mode='r'):
+        """Memory-mapped (read-only, shared between processes) by default"""
+        with open(os.path.join(directory, 'forest.json')) as f:
+            meta = json.load(f)
+        arrays = {name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mmap_mode)
+                  for name in NODE_ARRAYS}
+        return cls(max_depth=meta['max_depth'], **arrays)
+
+    def leaves(self, X):
+        """Leaf node (global index) reached in every tree: shape (rows, trees)"""
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+
+        rows, n_features = X.shape
+        flat = X.ravel()
+        row_start = (np.arange(rows, dtype=np.int32) * n_features)[:, None]
+        check_missing = self.has_missing_rules and bool(np.isnan(flat).any())
+
+        node = np.repeat(self.roots[None, :], rows, axis=0)
+        for _ in range(self.max_depth):
+            x = np.take(flat, row_start + np.take(self.feature, node))
+            go_right = ~(x <= np.take(self.threshold, node))
+            if check_missing:
+                go_right &= ~(np.isnan(x) & np.take(self.missing_left, node))
+            node = np.take(self.children, 2 * node + go_right)
+
+        return node
+
+    def predict(self, X, batch_rows=256):
+        """Same output as RandomForestRegressor.predict(X)"""
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+
+        out = np.empty(len(X))
+        # small batches keep the (rows x trees) node arrays in cache
+        for start in range(0, len(X), batch_rows):
+            values = np.take(self.value, self.leaves(X[start:start + batch_rows]))
+
+            # cumsum adds tree by tree, in sklearn's order, for identical rounding
+            out[start:start + batch_rows] = np.cumsum(values, axis=1)[:, -1] / self.n_trees
+
+        return out
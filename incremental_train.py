@@ -0,0 +1,213 @@
+"""
+Incremental retraining of the demand model from an order_time watermark.
+
+Each run
+  1. appends only the orders placed after the store's watermark to the
+     feature store (feature_store.py: ml_data.iter_since, or a generated dataset)
+  2. updates the model with the rows it has not been trained on yet:
+       warm_start  grow NEW_TREES trees on the new rows plus a bounded sample of
+                   history and drop the oldest trees beyond MAX_TREES
+       refit       train from scratch on the whole feature store (no MySQL re-extract)
+     warm_start falls back to refit when there is no model yet, or when the new
+     rows bring categories / warehouses the current encoders do not know
+  3. scores the candidate and the current model on the newest rows (time-based
+     holdout) and publishes only if the candidate is not worse than tolerated;
+     with fewer than MIN_NEW_ROWS new rows a round is postponed (refit then
+     holds out the newest share of the whole store instead)
+  4. publishes the candidate as the next registry version (model_registry.py,
+     which serving hot-swaps in) and records how far it trained in
+     models/training_state.json
+
+So a nightly run reads and trains on the day's orders, not the whole history.
+
+    python incremental_train.py                      # MySQL, since the watermark
+    python incremental_train.py --from-dir dataset/  # a data_writers.py dataset
+    python incremental_train.py --refit
+"""
+import argparse
+import copy
+import json
+import os
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from encoders import load_encoder
+from feature_store import TRAINING_COLUMNS, FeatureStore
+from model_registry import ModelRegistry
+from model_store import CATEGORY_ENCODER_FILE, MODEL_FILE, WAREHOUSE_ENCODER_FILE
+from train_model import MODEL_PARAMS, evaluate, train_forest
+
+
+MODEL_DIR = 'models'
+STATE_FILE = 'training_state.json'
+
+NEW_TREES = 25
+MAX_TREES = MODEL_PARAMS['n_estimators']
+HISTORY_SAMPLE = 3         # history rows sampled per new row for warm_start trees
+MIN_NEW_ROWS = 500         # fewer new rows than this: extract only, train later
+HOLDOUT_FRACTION = 0.2     # newest share of the new rows held out for the gate
+RMSE_TOLERANCE = 0.02      # candidate RMSE may exceed the current one by 2%
+MIN_R2 = 0.0
+
+
+def load_state(model_dir=MODEL_DIR):
+    try:
+        with open(os.path.join(model_dir, STATE_FILE)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {'trained_through': None, 'rounds': 0, 'version': None}
+
+
+def save_state(state, model_dir=MODEL_DIR):
+    os.makedirs(model_dir, exist_ok=True)
+    state['updated_at'] = time.strftime('%Y-%m-%d %H:%M:%S')
+    with open(os.path.join(model_dir, STATE_FILE), 'w') as f:
+        json.dump(state, f, indent=2)
+
+
+def extract_new(store, dataset_dir=None, chunk_size=None):
+    """Append the orders after the store's watermark; returns the rows appended"""
+    if dataset_dir:
+        return store.sync_files(dataset_dir)
+    return store.sync_mysql(chunk_size)
+
+
+def time_holdout(df, fraction=HOLDOUT_FRACTION):
+    """(train, holdout): the holdout is the newest `fraction` of the rows"""
+    df = df.sort_values('order_time', kind='stable').reset_index(drop=True)
+    cut = len(df) - max(1, int(len(df) * fraction))
+    return df.iloc[:cut], df.iloc[cut:]
+
+
+def load_current(registry, model_dir=MODEL_DIR):
+    """(model, category encoder, warehouse encoder) of the current version (else model_dir), or None"""
+    version = registry.current()
+    if version is not None:
+        model_dir = registry.path(version)
+    try:
+        return (joblib.load(os.path.join(model_dir, MODEL_FILE)),
+                load_encoder(os.path.join(model_dir, CATEGORY_ENCODER_FILE), 'category'),
+                load_encoder(os.path.join(model_dir, WAREHOUSE_ENCODER_FILE), 'warehouse'))
+    except (OSError, ValueError) as e:
+        print(f"No current model - {e}")
+        return None
+
+
+def warm_start(model, X, y, round_number, new_trees=NEW_TREES, max_trees=MAX_TREES):
+    """Copy of `model` with `new_trees` more trees fit on (X, y), oldest ones dropped"""
+    model = copy.deepcopy(model)
+    # a fresh seed per round: trimmed forests would otherwise repeat the bootstrap seeds
+    model.set_params(warm_start=True, n_estimators=len(model.estimators_) + new_trees,
+                     random_state=MODEL_PARAMS['random_state'] + round_number)
+    model.fit(X, y)
+
+    if len(model.estimators_) > max_trees:
+        model.estimators_ = model.estimators_[-max_trees:]
+    model.set_params(warm_start=False, n_estimators=len(model.estimators_))
+    return model
+
+
+def run(strategy='warm_start', dataset_dir=None, model_dir=MODEL_DIR, store_dir=None, registry_dir=None,
+        chunk_size=None, seed=0):
+    """One incremental training round; returns True if a new version was published"""
+    state = load_state(model_dir)
+    store = FeatureStore(store_dir)
+    registry = ModelRegistry(registry_dir)
+    rng = np.random.default_rng(seed)
+
+    started = time.perf_counter()
+    extracted = extract_new(store, dataset_dir, chunk_size)
+    print(f"✓ Extracted {extracted:,} new rows in {time.perf_counter() - started:.1f}s "
+          f"(store: {store.rows:,} rows, watermark {store.watermark})")
+
+    if not extracted and strategy != 'refit':
+        print("Nothing new to train on")
+        return False
+
+    new_rows = store.frame(TRAINING_COLUMNS, since=state['trained_through'])
+    if strategy == 'refit' and len(new_rows) < MIN_NEW_ROWS:
+        # too few untrained rows to score a refit on: hold out the newest share of the whole store
+        new_rows = store.frame(TRAINING_COLUMNS)
+    if len(new_rows) < MIN_NEW_ROWS:
+        print(f"Only {len(new_rows)} untrained rows (< {MIN_NEW_ROWS}): training postponed")
+        return False
+
+    current = load_current(registry, model_dir)
+    if strategy == 'warm_start':
+        if current is None or state['trained_through'] is None:
+            print("No incrementally trained model yet: refitting")
+            strategy = 'refit'
+        elif not store.encode(new_rows, current[1], current[2])[2].all():
+            print("New categories or warehouses: refitting")
+            strategy = 'refit'
+
+    train_rows, holdout = time_holdout(new_rows)
+    round_number = state.get('rounds', 0) + 1
+    started = time.perf_counter()
+
+    if strategy == 'refit':
+        history = store.frame(TRAINING_COLUMNS)
+        history = history[history['order_time'] < holdout['order_time'].iloc[0]]
+        category_encoder, warehouse_encoder = store.fit_encoders()
+        X, y, _ = store.encode(history, category_encoder, warehouse_encoder)
+        model = train_forest(X, y)
+    else:
+        model, category_encoder, warehouse_encoder = current
+        sample = store.sample(len(train_rows) * HISTORY_SAMPLE, state['trained_through'], rng)
+        X, y, _ = store.encode(pd.concat([train_rows, sample], ignore_index=True),
+                               category_encoder, warehouse_encoder)
+        model = warm_start(model, X, y, round_number)
+
+    print(f"✓ {strategy} on {len(X):,} rows in {time.perf_counter() - started:.1f}s")
+
+    # Holdout gate: the candidate must hold the current model's metrics on the newest rows
+    candidate = evaluate(model, *store.encode(holdout, category_encoder, warehouse_encoder)[:2])
+    print(f"Candidate holdout: RMSE {candidate['rmse']:.3f}, R² {candidate['r2']:.3f} "
+          f"({candidate['rows']:,} rows)")
+
+    baseline = None
+    if current is not None:
+        X_current, y_current, known = store.encode(holdout, current[1], current[2])
+        if known.any():
+            baseline = evaluate(current[0], X_current[known], y_current[known])
+            print(f"Current holdout:   RMSE {baseline['rmse']:.3f}, R² {baseline['r2']:.3f} "
+                  f"({baseline['rows']:,} rows)")
+
+    if np.isnan(candidate['r2']) or candidate['r2'] < MIN_R2:
+        print(f"✗ Not published: holdout R² below {MIN_R2}")
+        return False
+    if baseline is not None and candidate['rmse'] > baseline['rmse'] * (1 + RMSE_TOLERANCE):
+        print(f"✗ Not published: holdout RMSE more than {RMSE_TOLERANCE:.0%} worse than the current model")
+        return False
+
+    metrics = {'round': round_number, 'strategy': strategy, 'holdout': candidate, 'current_holdout': baseline,
+               'trained_rows': int(len(X)), 'trees': len(model.estimators_),
+               'extracted_through': store.watermark}
+    version = registry.publish(model, category_encoder, warehouse_encoder, metrics, source='incremental_train')
+
+    # The holdout rows were not trained on: leave them for the next round
+    state['trained_through'] = str(train_rows['order_time'].iloc[-1]) if len(train_rows) else state['trained_through']
+    state['rounds'] = round_number
+    state['version'] = version
+    state['metrics'] = metrics
+    save_state(state, model_dir)
+
+    print(f"✓ Published version {version} to {registry.path(version)}")
+    return True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Incremental demand model retraining")
+    parser.add_argument('--from-dir', help="read a generated dataset directory instead of MySQL")
+    parser.add_argument('--refit', action='store_true', help="refit on the whole feature store")
+    parser.add_argument('--model-dir', default=MODEL_DIR)
+    parser.add_argument('--store-dir', default=None, help="feature store (default: FEATURE_STORE_DIR)")
+    parser.add_argument('--registry-dir', default=None, help="model registry (default: MODEL_REGISTRY_DIR)")
+    parser.add_argument('--chunk-size', type=int, default=None)
+    args = parser.parse_args()
+
+    run('refit' if args.refit else 'warm_start', args.from_dir, args.model_dir, args.store_dir, args.registry_dir,
+        args.chunk_size)
@@ -0,0 +1,175 @@
+"""
+Versioned secondary-index migrations plus an EXPLAIN check of the analyzer queries.
+
+    python migrations.py migrate   # apply pending migrations, rebuild missing indexes
+    python migrations.py status    # list applied / pending versions
+    python migrations.py verify    # EXPLAIN every analyzer query, exit 1 on a full scan
+"""
+import sys
+
+from database import DatabaseManager
+from SalesAnalyzer import (INVENTORY_SNAPSHOT_QUERY, CATEGORY_PERFORMANCE_QUERY,
+                           TRAILING_SALES_QUERY, TRAILING_SALES_BY_WAREHOUSE_QUERY)
+from summary_tables import DAILY_SALES_REBUILD
+
+
+create_schema_migrations = '''
+CREATE TABLE IF NOT EXISTS schema_migrations (
+version INT PRIMARY KEY,
+description VARCHAR(255),
+applied_at DATETIME DEFAULT CURRENT_TIMESTAMP
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+'''
+
+# (version, description, [(table, index name, columns)])
+# columns None: the index must not exist (it is dropped).
+# Never edit an applied entry: add a new version instead.
+# The FOREIGN KEYs already give InnoDB indexes on good_supply and inform
+# (product_id, warehouse_id), so no migration adds those.
+MIGRATIONS = [
+    (1, 'orders: order_time and user_id/order_time indexes', [
+        ('orders', 'idx_orders_order_time', '(order_time)'),
+        ('orders', 'idx_orders_user_time', '(user_id, order_time)'),
+    ]),
+    (2, 'good_supply: supply_time index', [
+        ('good_supply', 'idx_good_supply_time', '(supply_time)'),
+    ]),
+    (3, 'good_supply, inform: drop product/warehouse indexes duplicating the FK indexes', [
+        ('good_supply', 'idx_good_supply_product_warehouse', None),
+        ('inform', 'idx_inform_product_warehouse', None),
+    ]),
+]
+
+# (name, query, params, tables allowed to be read in full)
+# The snapshot and category queries read the whole catalog by design; every
+# other table they touch must be reached through an index.
+VERIFY_QUERIES = [
+    ('inventory_snapshot', INVENTORY_SNAPSHOT_QUERY, None, {'sr'}),
+    ('category_performance', CATEGORY_PERFORMANCE_QUERY, None, {'p'}),
+    ('trailing_sales', TRAILING_SALES_QUERY, ('P00000001', 30), set()),
+    ('trailing_sales_by_warehouse', TRAILING_SALES_BY_WAREHOUSE_QUERY, ('P00000001', 30, 'W00000001'), set()),
+    ('daily_sales_backfill', DAILY_SALES_REBUILD.format(where="WHERE o.order_time >= %s"), ('2024-11-01',), set()),
+]
+
+
+def index_exists(db, table, index_name):
+    row = db.fetch_one(
+        "SELECT COUNT(*) FROM information_schema.statistics "
+        "WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s",
+        (table, index_name)
+    )
+    return bool(row and row[0])
+
+
+def applied_versions(db):
+    db.execute_sql(create_schema_migrations)
+    rows = db.fetch_all("SELECT version FROM schema_migrations")
+    return {row[0] for row in rows or []}
+
+
+def apply_index(db, table, index_name, columns):
+    """Create (or, with columns None, drop) one index unless it is already in that state"""
+    # MySQL has no CREATE INDEX IF NOT EXISTS
+    exists = index_exists(db, table, index_name)
+    if columns is None:
+        if not exists:
+            return True
+        sql, action = f"DROP INDEX {index_name} ON {table}", 'dropped'
+    else:
+        if exists:
+            return True
+        sql, action = f"CREATE INDEX {index_name} ON {table} {columns}", 'created'
+
+    if not db.execute_sql(sql):
+        print(f"  fail: {index_name}")
+        return False
+    print(f"  {action} {index_name}")
+    return True
+
+
+def migrate(db):
+    """
+    Apply migrations in version order; returns False on the first failure.
+    Applied versions are checked against information_schema too, so indexes
+    lost when a table is recreated are built again.
+    """
+    done = applied_versions(db)
+
+    for version, description, indexes in MIGRATIONS:
+        print(f"[{version}] {description}{'' if version not in done else ' (applied, checking)'}")
+        for table, index_name, columns in indexes:
+            if not apply_index(db, table, index_name, columns):
+                return False
+
+        if version not in done and not db.execute_sql(
+                "INSERT INTO schema_migrations (version, description) VALUES (%s, %s)",
+                (version, description)):
+            return False
+
+    return True
+
+
+def status(db):
+    done = applied_versions(db)
+    for version, description, _ in MIGRATIONS:
+        state = 'applied' if version in done else 'pending'
+        print(f"[{version}] {state:8} {description}")
+
+
+def explain(db, query, params=None):
+    results = db.fetch_many([('plan', f"EXPLAIN {query}", params)], dictionary=True)
+    return results['plan'] if results else None
+
+
+def verify(db):
+    """
+    EXPLAIN each analyzer query and report any table read with a full table scan
+    (type ALL) or full index scan (type index) that is not explicitly allowed.
+    Returns True when every plan is indexed.
+    """
+    ok = True
+
+    for name, query, params, allowed in VERIFY_QUERIES:
+        plan = explain(db, query, params)
+        if plan is None:
+            print(f"✗ {name}: EXPLAIN failed")
+            ok = False
+            continue
+
+        full_scans = [
+            row['table'] for row in plan
+            if row['type'] in ('ALL', 'index')
+            and row['table'] not in allowed
+            and not str(row['table']).startswith('<')  # materialized derived tables
+        ]
+
+        if full_scans:
+            ok = False
+            print(f"✗ {name}: full scan on {', '.join(full_scans)}")
+        else:
+            print(f"✓ {name}")
+
+    return ok
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else 'migrate'
+
+    db = DatabaseManager()
+    if not db.connect():
+        print("connect database fail")
+        sys.exit(1)
+
+    if command == 'migrate':
+        success = migrate(db)
+    elif command == 'status':
+        status(db)
+        success = True
+    elif command == 'verify':
+        success = verify(db)
+    else:
+        print(f"unknown command: {command} (use migrate, status or verify)")
+        success = False
+
+    db.close()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,212 @@
+"""
+Local registry of versioned demand model artifacts.
+
+    models/versions/v0003/            one directory per version (train_model.save_model layout:
+                                      pickles, compiled/, demand_surface/)
+    models/versions/v0003/manifest.json
+                                      version, metrics, feature columns, model hash,
+                                      sha256 of every file in the version
+    models/versions/CURRENT           name of the version serving should use
+    models/versions/history.json      promotions and rollbacks, newest last
+
+A version is written to a temporary directory and renamed into place, and
+CURRENT is replaced atomically, so readers never see a half-written version.
+Serving (model_store.ModelStore with a registry) polls CURRENT and swaps the
+new version in the background; see ModelStore.start_watching.
+
+    python model_registry.py list
+    python model_registry.py publish models/     # register the artifacts train_model.py wrote
+    python model_registry.py promote v0002
+    python model_registry.py rollback
+    python model_registry.py verify v0003
+"""
+import argparse
+import json
+import os
+import shutil
+import time
+
+from demand_surface import file_sha256
+from model_store import FEATURE_COLUMNS, MODEL_FILE
+from settings import get_settings
+
+
+MANIFEST = 'manifest.json'
+CURRENT = 'CURRENT'
+HISTORY = 'history.json'
+
+
+def _write_atomic(path, text):
+    tmp = f"{path}.tmp.{os.getpid()}"
+    with open(tmp, 'w') as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+def _checksums(directory):
+    """{relative path: sha256} of every file below `directory` except the manifest"""
+    files = {}
+    for root, _, names in os.walk(directory):
+        for name in names:
+            path = os.path.join(root, name)
+            relative = os.path.relpath(path, directory)
+            if relative != MANIFEST:
+                files[relative.replace(os.sep, '/')] = file_sha256(path)
+    return dict(sorted(files.items()))
+
+
+class ModelRegistry:
+
+    def __init__(self, root=None):
+        self.root = root or get_settings().model_registry_dir
+
+    def path(self, version):
+        return os.path.join(self.root, version)
+
+    def versions(self):
+        try:
+            names = os.listdir(self.root)
+        except OSError:
+            return []
+        return sorted(n for n in names if n.startswith('v') and os.path.exists(os.path.join(self.root, n, MANIFEST)))
+
+    def manifest(self, version):
+        with open(os.path.join(self.path(version), MANIFEST)) as f:
+            return json.load(f)
+
+    def current(self):
+        """Version name CURRENT points at, or None"""
+        try:
+            with open(os.path.join(self.root, CURRENT)) as f:
+                return f.read().strip() or None
+        except OSError:
+            return None
+
+    def history(self):
+        try:
+            with open(os.path.join(self.root, HISTORY)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return []
+
+    # -- writing --
+
+    def _next_version(self):
+        versions = self.versions()
+        return f"v{int(versions[-1][1:]) + 1:04d}" if versions else 'v0001'
+
+    def _register(self, write, metrics=None, params=None, source=None, promote=True):
+        """Create the next version with `write(directory)`, add its manifest, rename it into place"""
+        os.makedirs(self.root, exist_ok=True)
+        version = self._next_version()
+        tmp = self.path(f".{version}.tmp")
+        shutil.rmtree(tmp, ignore_errors=True)
+
+        write(tmp)
+        files = _checksums(tmp)
+        manifest = {
+            'version': version,
+            'created_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'model_sha256': files.get(MODEL_FILE),
+            'feature_columns': FEATURE_COLUMNS,
+            'metrics': metrics or {},
+            'params': params or {},
+            'source': source,
+            'files': files,
+        }
+        _write_atomic(os.path.join(tmp, MANIFEST), json.dumps(manifest, indent=2))
+        os.rename(tmp, self.path(version))
+
+        if promote:
+            self.promote(version)
+        return version
+
+    def publish(self, model, category_encoder, warehouse_encoder, metrics=None, with_surface=True,
+                promote=True, source=None):
+        """Save a trained model as the next version (and make it current)"""
+        from train_model import save_model
+
+        params = {k: v for k, v in model.get_params().items()
+                  if k in ('n_estimators', 'max_depth', 'min_samples_split', 'min_samples_leaf')}
+        params['n_estimators'] = len(model.estimators_)
+
+        def write(directory):
+            save_model(model, category_encoder, warehouse_encoder, directory, with_surface=with_surface)
+
+        return self._register(write, metrics, params, source, promote)
+
+    def import_dir(self, model_dir, metrics=None, promote=True):
+        """Register artifacts already written to a directory (e.g. models/ by train_model.py)"""
+        def write(directory):
+            shutil.copytree(model_dir, directory,
+                            ignore=shutil.ignore_patterns('versions', 'training_state.json', 'tuning_results.json',
+                                                          '*.tmp*'))
+
+        return self._register(write, metrics, source=os.path.abspath(model_dir), promote=promote)
+
+    def verify(self, version):
+        """Files whose checksum differs from the manifest (missing ones included); [] if intact"""
+        expected = self.manifest(version)['files']
+        actual = _checksums(self.path(version))
+        return sorted(name for name in expected if actual.get(name) != expected[name])
+
+    def _record(self, version, action):
+        _write_atomic(os.path.join(self.root, CURRENT), version + '\n')
+        history = self.history()
+        history.append({'version': version, 'action': action, 'at': time.strftime('%Y-%m-%d %H:%M:%S')})
+        _write_atomic(os.path.join(self.root, HISTORY), json.dumps(history, indent=2))
+        print(f"✓ {version} is now current")
+        return version
+
+    def promote(self, version):
+        """Point CURRENT at `version` after checking its files"""
+        broken = self.verify(version)
+        if broken:
+            raise ValueError(f"{version} failed verification: {', '.join(broken)}")
+        return self._record(version, 'promote')
+
+    def rollback(self):
+        """Go back to the version that was current before the last promotion"""
+        # replay the history as a stack: promotions push, rollbacks pop
+        stack = []
+        for entry in self.history():
+            if entry.get('action') == 'rollback':
+                stack.pop()
+            else:
+                stack.append(entry['version'])
+        if len(stack) < 2:
+            raise ValueError("no earlier version to roll back to")
+
+        version = stack[-2]
+        broken = self.verify(version)
+        if broken:
+            raise ValueError(f"{version} failed verification: {', '.join(broken)}")
+        return self._record(version, 'rollback')
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local demand model registry")
+    parser.add_argument('command', choices=['list', 'publish', 'promote', 'rollback', 'verify'])
+    parser.add_argument('target', nargs='?', help="publish: artifact directory; promote / verify: version")
+    parser.add_argument('--root', default=None)
+    parser.add_argument('--no-promote', action='store_true')
+    args = parser.parse_args()
+
+    registry = ModelRegistry(args.root)
+    if args.command == 'list':
+        current = registry.current()
+        for version in registry.versions():
+            manifest = registry.manifest(version)
+            rmse = manifest['metrics'].get('holdout', {}).get('rmse')
+            print(f"{'*' if version == current else ' '} {version}  {manifest['created_at']}  "
+                  f"{'RMSE %.4f' % rmse if rmse is not None else ''}")
+    elif args.command == 'publish':
+        version = registry.import_dir(args.target or 'models', promote=not args.no_promote)
+        print(f"✓ Registered {version}")
+    elif args.command == 'promote':
+        registry.promote(args.target)
+    elif args.command == 'rollback':
+        registry.rollback()
+    else:
+        broken = registry.verify(args.target or registry.current())
+        print("✓ intact" if not broken else f"✗ changed: {', '.join(broken)}")
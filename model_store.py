@@ -0,0 +1,312 @@
+"""
+Serving-side demand model: memory-mapped artifacts, loaded lazily.
+
+train_model.py still writes the joblib pickles; export_model() adds an
+uncompressed, mmap-friendly copy that serving prefers:
+
+    models/compiled/*.npy           forest node arrays (forest_engine.CompiledForest)
+    models/compiled/encoders.json   category / warehouse classes
+    models/compiled/meta.json       hash of the pickle it was exported from, feature columns
+    models/demand_surface/          optional precomputed surface (demand_surface.py)
+
+Arrays are opened with mmap_mode='r': every gunicorn worker maps the same file
+pages instead of decompressing a private copy, so RSS does not grow per worker.
+Nothing is read at import time; ModelStore loads on the first prediction, or
+up front with warm_up() (MODEL_WARM_UP=1, e.g. together with gunicorn --preload).
+With a model registry (model_registry.py) it serves the current version and
+hot-swaps new ones without a restart.
+
+    python model_store.py   # export models/compiled from the current pickles
+"""
+import json
+import os
+import threading
+import time
+
+import joblib
+import numpy as np
+
+from demand_surface import file_sha256, load_surface
+from encoders import CategoryEncoder, load_encoder
+from forest_engine import CompiledForest
+
+
+MODEL_FILE = 'demand_forecast_model.pkl'
+CATEGORY_ENCODER_FILE = 'category_encoder.pkl'
+WAREHOUSE_ENCODER_FILE = 'warehouse_encoder.pkl'
+COMPILED_DIR = 'compiled'
+SURFACE_DIR = 'demand_surface'
+
+# Above this many rows sklearn's vectorized predict beats the compiled forest
+# (benchmark_forest.py: compiled 16 ms vs 19 ms at 1,000 rows, 152 ms vs 95 ms at 10,000;
+# they cross between 1,500 and 2,000)
+COMPILED_MAX_ROWS = 1500
+
+FEATURE_COLUMNS = ['product_category_encoded', 'price', 'order_hour', 'order_day', 'order_month',
+                   'warehouse_encoded']
+
+
+def export_model(model, category_encoder, warehouse_encoder, model_dir='models', model_sha256=None):
+    """Write the mmap-friendly copy of a trained model next to its pickles"""
+    out = os.path.join(model_dir, COMPILED_DIR)
+    CompiledForest.from_sklearn(model).save(out)
+
+    with open(os.path.join(out, 'encoders.json'), 'w') as f:
+        json.dump({
+            'category': [str(c) for c in category_encoder.classes_],
+            'warehouse': [str(c) for c in warehouse_encoder.classes_],
+        }, f)
+
+    with open(os.path.join(out, 'meta.json'), 'w') as f:
+        json.dump({
+            'model_sha256': model_sha256 or file_sha256(os.path.join(model_dir, MODEL_FILE)),
+            'feature_columns': FEATURE_COLUMNS,
+            'exported_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+        }, f, indent=2)
+
+    return out
+
+
+class DemandModel:
+    """Encoders plus the fastest available predictor for them"""
+
+    def __init__(self, category_encoder, warehouse_encoder, predictor, surface=None, source=None,
+                 model=None, model_path=None):
+        self.category_encoder = category_encoder
+        self.warehouse_encoder = warehouse_encoder
+        self.predictor = predictor
+        self.surface = surface
+        self.source = source
+        # sklearn forest for large batches; unpickled on first use when only model_path is given
+        self._model = model
+        self._model_path = model_path
+        self._model_lock = threading.Lock()
+
+    def _batch_predictor(self):
+        if self._model is None and self._model_path is not None:
+            with self._model_lock:
+                if self._model is None:
+                    try:
+                        self._model = joblib.load(self._model_path)
+                    except Exception as e:
+                        print(f"Warning: cannot load {self._model_path} for batch prediction - {e}")
+                        self._model_path = None
+        return self._model if self._model is not None else self.predictor
+
+    def predict(self, X):
+        """
+        X: rows in FEATURE_COLUMNS order. Served from the surface when it covers
+        every row, else from the compiled forest, or sklearn for batches above
+        COMPILED_MAX_ROWS (identical results either way).
+        """
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+
+        if self.surface is not None and self.surface.covers(X[:, 2], X[:, 3], X[:, 4]):
+            return self.surface.lookup(X[:, 0], X[:, 1], X[:, 2], X[:, 3], X[:, 4], X[:, 5])
+        if len(X) > COMPILED_MAX_ROWS:
+            return self._batch_predictor().predict(X)
+        return self.predictor.predict(X)
+
+    def describe(self):
+        return {
+            'source': self.source,
+            'predictor': type(self.predictor).__name__,
+            'batch_sklearn_loaded': self._model is not None,
+            'demand_surface': self.surface is not None,
+        }
+
+
+def load_model(model_dir='models'):
+    """
+    Prefer models/compiled (memory-mapped) when it was exported from the current
+    pickle; otherwise load the pickle and compile it in memory.
+    """
+    compiled = os.path.join(model_dir, COMPILED_DIR)
+    pickle_path = os.path.join(model_dir, MODEL_FILE)
+    pickle_sha256 = file_sha256(pickle_path) if os.path.exists(pickle_path) else None
+
+    meta = None
+    try:
+        with open(os.path.join(compiled, 'meta.json')) as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        pass
+
+    if meta is not None and pickle_sha256 in (None, meta['model_sha256']):
+        with open(os.path.join(compiled, 'encoders.json')) as f:
+            classes = json.load(f)
+        category_encoder = CategoryEncoder(classes['category'], name='category')
+        warehouse_encoder = CategoryEncoder(classes['warehouse'], name='warehouse')
+        predictor = CompiledForest.load(compiled)
+        model = None  # unpickled only if a batch above COMPILED_MAX_ROWS needs it
+        model_sha256 = meta['model_sha256']
+        source = compiled
+    else:
+        if meta is not None:
+            print("Compiled model is stale (pickle changed): run model_store.py to re-export")
+        model = joblib.load(pickle_path)
+        category_encoder = load_encoder(os.path.join(model_dir, CATEGORY_ENCODER_FILE), 'category')
+        warehouse_encoder = load_encoder(os.path.join(model_dir, WAREHOUSE_ENCODER_FILE), 'warehouse')
+        try:
+            predictor = CompiledForest.from_sklearn(model)
+        except Exception as e:
+            print(f"Warning: forest not compiled, using sklearn predict - {e}")
+            predictor = model
+        model_sha256 = pickle_sha256
+        source = pickle_path
+
+    surface = load_surface(os.path.join(model_dir, SURFACE_DIR), model_sha256,
+                           category_encoder, warehouse_encoder)
+
+    return DemandModel(category_encoder, warehouse_encoder, predictor, surface, source,
+                       model=model, model_path=pickle_path if pickle_sha256 else None)
+
+
+class ModelStore:
+    """
+    Process-wide holder of the DemandModel: loaded lazily (thread-safe, once),
+    then hot-swapped when the registry's current version changes.
+
+    With a registry (model_registry.ModelRegistry) the current version is served,
+    else the artifacts in model_dir. A new version is loaded and warmed up next to
+    the serving one and swapped in with a single reference assignment, so
+    requests never wait for a load; if it fails, the old version keeps serving.
+    """
+
+    def __init__(self, model_dir='models', registry=None):
+        self.model_dir = model_dir
+        self.registry = registry
+        self._lock = threading.Lock()
+        self._swap_lock = threading.Lock()
+        self._model = None
+        self._error = None
+        self.load_seconds = None
+        self.version = None
+        self.swaps = 0
+        self.swap_error = None
+        self._failed_version = None
+        self._watch_interval = None
+        self._watcher_pid = None
+
+    def _source(self):
+        """(version, directory) to load: the registry's current version, else model_dir"""
+        if self.registry is not None:
+            version = self.registry.current()
+            if version is not None:
+                return version, self.registry.path(version)
+        return None, self.model_dir
+
+    def get(self):
+        """The loaded model, loading it on first use; None if loading failed"""
+        self._check_watcher()
+        if self._model is not None or self._error is not None:
+            return self._model
+
+        with self._lock:
+            if self._model is None and self._error is None:
+                version, directory = self._source()
+                started = time.perf_counter()
+                try:
+                    self._model = load_model(directory)
+                    self.version = version
+                    self.load_seconds = round(time.perf_counter() - started, 3)
+                    print(f"✓ ML model loaded from {self._model.source} in {self.load_seconds}s")
+                except Exception as e:
+                    print(f"Warning: ML models not loaded - {e}")
+                    self._error = str(e)
+        return self._model
+
+    def warm_up(self):
+        """Load now and run one prediction so the mapped pages are faulted in"""
+        model = self.get()
+        if model is not None:
+            model.predict(np.zeros((1, len(FEATURE_COLUMNS))))
+        return model is not None
+
+    def swap(self, version=None):
+        """
+        Load `version` (default: the registry's current one) while the old model
+        keeps serving, then swap it in. Returns False, keeping the old model, if
+        the version fails verification or loading.
+        """
+        with self._swap_lock:
+            if version is None:
+                version, directory = self._source()
+            else:
+                directory = self.registry.path(version)
+
+            started = time.perf_counter()
+            try:
+                if self.registry is not None and version is not None:
+                    broken = self.registry.verify(version)
+                    if broken:
+                        raise ValueError(f"checksum mismatch: {', '.join(broken)}")
+                model = load_model(directory)
+                model.predict(np.zeros((1, len(FEATURE_COLUMNS))))
+            except Exception as e:
+                self._failed_version = version
+                self.swap_error = f"{version}: {e}"
+                print(f"Warning: model {version} not swapped in, still serving {self.version} - {e}")
+                return False
+
+            # one reference assignment: a request sees either the old or the new model
+            self._model = model
+            self._error = None
+            self.version = version
+            self.load_seconds = round(time.perf_counter() - started, 3)
+            self.swaps += 1
+            self.swap_error = None
+            print(f"✓ ML model {version or directory} swapped in after {self.load_seconds}s")
+            return True
+
+    def reload(self):
+        """Load the artifacts again and swap them in (serving continues meanwhile)"""
+        return self.swap()
+
+    def start_watching(self, interval):
+        """Poll the registry every `interval` seconds and swap in a new current version"""
+        if self.registry is None or not interval:
+            return
+        self._watch_interval = interval
+        self._watcher_pid = None
+        self._check_watcher()
+
+    def _check_watcher(self):
+        # threads do not survive fork (gunicorn --preload): start one per worker process
+        if self._watch_interval and self._watcher_pid != os.getpid():
+            self._watcher_pid = os.getpid()
+            threading.Thread(target=self._watch, name='model-watcher', daemon=True).start()
+
+    def _watch(self):
+        while True:
+            time.sleep(self._watch_interval)
+            try:
+                version = self.registry.current()
+                # not loaded yet: the first get() loads the current version anyway
+                if (self._model is not None and version is not None
+                        and version != self.version and version != self._failed_version):
+                    self.swap(version)
+            except Exception as e:
+                print(f"Warning: model registry poll failed - {e}")
+
+    def stats(self):
+        return {
+            'loaded': self._model is not None,
+            'error': self._error,
+            'load_seconds': self.load_seconds,
+            'version': self.version,
+            'swaps': self.swaps,
+            'swap_error': self.swap_error,
+            **(self._model.describe() if self._model is not None else {}),
+        }
+
+
+if __name__ == "__main__":
+    model = joblib.load(os.path.join('models', MODEL_FILE))
+    category_encoder = load_encoder(os.path.join('models', CATEGORY_ENCODER_FILE), 'category')
+    warehouse_encoder = load_encoder(os.path.join('models', WAREHOUSE_ENCODER_FILE), 'warehouse')
+
+    out = export_model(model, category_encoder, warehouse_encoder)
+    print(f"✓ Compiled model exported to {out}")
@@ -1,4 +1,3 @@
-import os
 import sys
 import json
 from datetime import datetime
@@ -9,15 +8,15 @@ from pymongo.errors import ServerSelectionTimeoutError
 import traceback
 from bson.objectid import ObjectId
 from bson.errors import InvalidId
-from dotenv import load_dotenv
+from settings import get_settings
 
 
-load_dotenv('config.env')
+settings = get_settings()
 # MongoDB Configuration
 # Connection URI (adjust as needed for remote/Atlas connections)
-MONGO_URI = os.environ.get("MONGODB_URI")
-DB_NAME = os.environ.get("MONGODB_NAME")
-COLLECTION_NAME = os.environ.get("COLLECTION_NAME")
+MONGO_URI = settings.mongodb_uri
+DB_NAME = settings.mongodb_name
+COLLECTION_NAME = settings.collection_name
 
 
 class HistoryDB:
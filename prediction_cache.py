@@ -0,0 +1,107 @@
+"""
+Bounded LRU cache of demand predictions.
+
+Keys are the encoded feature rows (category, price in cents, hour, day, month,
+warehouse), so the pricing page asking for the same products and discounts
+within the same hour is answered without touching the model. Prices are
+quantized to cents before inference too, so a cached value is exactly what
+the model returns for its key. Rows whose other features are not whole
+numbers (e.g. order_hour 9.5) have no exact key: they go to the model and
+are not cached.
+
+Entries belong to one model: when ModelStore swaps in another version the
+whole cache is dropped on the next lookup.
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+class PredictionCache:
+
+    def __init__(self, max_entries=100000):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._model = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def quantize(X):
+        """
+        Feature rows with the price rounded to cents, their integer cache keys,
+        and which rows may be cached (every feature but the price a whole number)
+        """
+        X = np.array(X, dtype=np.float64, ndmin=2)
+        cents = np.round(X[:, 1] * 100)
+        X[:, 1] = cents / 100
+        rest = np.column_stack([X[:, 0], X[:, 2:]])
+        cacheable = (rest == np.round(rest)).all(axis=1)
+        keys = np.ascontiguousarray(np.column_stack([X[:, 0], cents, X[:, 2:]]).astype(np.int64))
+        # one bytes object per row: much cheaper to build and hash than tuples
+        return X, keys.view(f"S{keys.shape[1] * 8}").ravel().tolist(), cacheable.tolist()
+
+    def _check_model(self, model):
+        if model is not self._model:
+            if self._model is not None:
+                self.invalidations += 1
+            self._entries.clear()
+            self._model = model
+
+    def predict(self, model, X):
+        """model.predict(X), served from the cache where possible; misses go to the model in one batch"""
+        if not self.max_entries:
+            return model.predict(X)
+
+        X, keys, cacheable = self.quantize(X)
+        result = np.empty(len(keys))
+        missing = []
+
+        with self._lock:
+            self._check_model(model)
+            entries = self._entries
+            for i, key in enumerate(keys):
+                value = entries.get(key) if cacheable[i] else None
+                if value is None:
+                    missing.append(i)
+                else:
+                    entries.move_to_end(key)
+                    result[i] = value
+            self.hits += len(keys) - len(missing)
+            self.misses += len(missing)
+
+        if missing:
+            predicted = model.predict(X[missing])
+            result[missing] = predicted
+
+            with self._lock:
+                # the model may have been swapped while predicting: do not cache for the old one
+                if model is self._model:
+                    for i, value in zip(missing, predicted.tolist()):
+                        if cacheable[i]:
+                            self._entries[keys[i]] = value
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+                        self.evictions += 1
+
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else None,
+            'evictions': self.evictions,
+            'invalidations': self.invalidations,
+        }
@@ -0,0 +1,100 @@
+"""
+Revenue-maximizing price search over a continuous price range.
+
+A dense grid of cent-rounded prices is predicted in one batch, then the
+bracket around the best grid point is searched again, more finely, until it
+is one cent wide. The demand forest is a step function of price, so the
+revenue optimum usually sits just below one of its split thresholds, between
+the points of any fixed grid.
+
+Constraints narrow the range before the search:
+- floor:      lowest allowed price
+- min_margin: lowest allowed margin over unit_cost, in percent of the price
+              (price >= unit_cost / (1 - min_margin / 100))
+
+predict is any callable prices -> quantities (e.g. app.predict_quantities for
+one product), so every step costs a single batched model call.
+"""
+import numpy as np
+
+
+GRID_POINTS = 200
+REFINE_POINTS = 50
+MAX_REFINE_ROUNDS = 4
+
+
+def price_bounds(low, high, floor=None, unit_cost=None, min_margin=None):
+    """Search range after applying the floor and margin constraints"""
+    if floor is not None:
+        low = max(low, float(floor))
+    if min_margin is not None:
+        if unit_cost is None:
+            raise ValueError("min_margin needs unit_cost")
+        if not 0 <= min_margin < 100:
+            raise ValueError("min_margin must be between 0 and 100 percent")
+        low = max(low, float(unit_cost) / (1 - min_margin / 100))
+
+    low, high = np.ceil(low * 100) / 100, np.floor(high * 100) / 100
+    if low <= 0 or low > high:
+        raise ValueError(f"no feasible price between {low:.2f} and {high:.2f} under the given constraints")
+    return float(low), float(high)
+
+
+def cent_grid(low, high, points):
+    """Up to `points` distinct cent-rounded prices spanning [low, high]"""
+    return np.unique(np.round(np.linspace(low, high, points), 2))
+
+
+def optimize_price(predict, low, high, floor=None, unit_cost=None, min_margin=None, objective='revenue',
+                   grid_points=GRID_POINTS, refine_points=REFINE_POINTS):
+    """
+    Returns {'price', 'quantity', 'value', 'curve': (prices, quantities, values),
+    'bounds', 'evaluations'} with value = price * quantity (revenue) or
+    (price - unit_cost) * quantity (profit). The curve holds every evaluated price, sorted.
+    """
+    if objective not in ('revenue', 'profit'):
+        raise ValueError("objective must be 'revenue' or 'profit'")
+    if objective == 'profit' and unit_cost is None:
+        raise ValueError("objective 'profit' needs unit_cost")
+
+    low, high = price_bounds(low, high, floor, unit_cost, min_margin)
+    cost = float(unit_cost) if objective == 'profit' else 0.0
+
+    prices = cent_grid(low, high, grid_points)
+    quantities = np.asarray(predict(prices), dtype=np.float64)
+    evaluated_prices, evaluated_quantities = [prices], [quantities]
+
+    for _ in range(MAX_REFINE_ROUNDS):
+        best = int(np.argmax((prices - cost) * quantities))
+        left = prices[max(best - 1, 0)]
+        right = prices[min(best + 1, len(prices) - 1)]
+        if right - left <= 0.011:
+            break
+        # search the bracket around the best point again; the model call only sees new prices
+        candidates = cent_grid(left, right, refine_points)
+        new = candidates[~np.isin(candidates, np.concatenate(evaluated_prices))]
+        if len(new):
+            evaluated_prices.append(new)
+            evaluated_quantities.append(np.asarray(predict(new), dtype=np.float64))
+
+        all_prices = np.concatenate(evaluated_prices)
+        all_quantities = np.concatenate(evaluated_quantities)
+        inside = (all_prices >= left) & (all_prices <= right)
+        order = np.argsort(all_prices[inside])
+        prices, quantities = all_prices[inside][order], all_quantities[inside][order]
+
+    curve_prices = np.concatenate(evaluated_prices)
+    curve_quantities = np.concatenate(evaluated_quantities)
+    order = np.argsort(curve_prices)
+    curve_prices, curve_quantities = curve_prices[order], curve_quantities[order]
+    values = (curve_prices - cost) * curve_quantities
+    best = int(np.argmax(values))
+
+    return {
+        'price': float(curve_prices[best]),
+        'quantity': float(curve_quantities[best]),
+        'value': float(values[best]),
+        'curve': (curve_prices, curve_quantities, values),
+        'bounds': (low, high),
+        'evaluations': len(curve_prices),
+    }
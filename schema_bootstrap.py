@@ -0,0 +1,199 @@
+"""
+Idempotent schema bootstrap.
+
+Takes the table definitions in db_config.py, orders them by their FOREIGN KEY
+references and applies them over one connection: CREATE TABLE IF NOT EXISTS
+for every table, then the summary triggers, then the index migrations.
+
+The applied DDL is recorded in schema_version as two hashes, one of the table
+definitions (id 1) and one of the triggers (id 2), so running it again on an
+up-to-date database is a no-op. Triggers are dropped and recreated whenever
+anything is applied, so a trigger change is simply applied; a table definition
+change cannot be applied to existing tables (CREATE TABLE IF NOT EXISTS does
+not alter them) and is reported until the tables are recreated with reset=True
+(e.g. a fresh database per test module).
+
+    python schema_bootstrap.py           # create what is missing
+    python schema_bootstrap.py --reset   # drop everything and recreate
+"""
+import hashlib
+import re
+import sys
+
+from mysql.connector import Error
+
+import db_config
+from database import DatabaseManager
+from migrations import migrate
+from summary_tables import trigger_statements
+
+
+# Every table definition in db_config.py, in any order
+TABLE_DEFINITIONS = [
+    db_config.create_user, db_config.create_warehouses, db_config.create_product,
+    db_config.create_supplier, db_config.create_store, db_config.create_orders,
+    db_config.create_information, db_config.create_good_supply, db_config.create_logistic,
+    db_config.create_shipping, db_config.create_delivery,
+    db_config.create_sell_through, db_config.create_daily_sales,
+]
+
+create_schema_version = '''
+CREATE TABLE IF NOT EXISTS schema_version (
+id TINYINT PRIMARY KEY,
+ddl_hash CHAR(64) NOT NULL,
+applied_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+'''
+
+
+def parse_table(definition):
+    """
+    db_config string -> (table name, CREATE TABLE IF NOT EXISTS statement, referenced tables).
+    The DROP / SET FOREIGN_KEY_CHECKS lines in front of each definition are skipped.
+    """
+    match = re.search(r'CREATE TABLE\s+(\w+)', definition)
+    if not match:
+        raise ValueError(f"no CREATE TABLE in definition: {definition[:60]!r}")
+
+    name = match.group(1)
+    statement = definition[match.start():].strip().rstrip(';').strip()
+    statement = statement.replace(match.group(0), f"CREATE TABLE IF NOT EXISTS {name}", 1)
+    references = set(re.findall(r'REFERENCES\s+(\w+)', statement)) - {name}
+    return name, statement, references
+
+
+def dependency_order(definitions=None):
+    """
+    [(table, statement)] with every table after the tables it references
+    (definition order is kept where there is no dependency)
+    """
+    tables = [parse_table(d) for d in (definitions or TABLE_DEFINITIONS)]
+    known = {name for name, _, _ in tables}
+
+    for name, _, references in tables:
+        missing = references - known
+        if missing:
+            raise ValueError(f"{name} references undefined table(s): {', '.join(sorted(missing))}")
+
+    ordered, done = [], set()
+    while len(ordered) < len(tables):
+        ready = [t for t in tables if t[0] not in done and t[2] <= done]
+        if not ready:
+            cycle = [name for name, _, _ in tables if name not in done]
+            raise ValueError(f"foreign key cycle between: {', '.join(cycle)}")
+        for name, statement, _ in ready:
+            ordered.append((name, statement))
+            done.add(name)
+
+    return ordered
+
+
+TABLES_HASH_ID = 1
+TRIGGERS_HASH_ID = 2
+
+
+def schema_hash(statements):
+    """Hash of the normalized DDL: changes only when a definition changes"""
+    digest = hashlib.sha256()
+    for statement in statements:
+        digest.update(' '.join(statement.split()).encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def bootstrap(db=None, reset=False):
+    """
+    Bring the schema up to date; returns True on success.
+    Without reset this never drops anything: existing tables are left as they are.
+    """
+    db = db or DatabaseManager()
+    tables = dependency_order()
+    triggers = trigger_statements()
+    tables_hash = schema_hash([statement for _, statement in tables])
+    triggers_hash = schema_hash(triggers)
+
+    conn = db.get_connection()
+    if not conn:
+        return False
+
+    cursor = None
+    try:
+        cursor = conn.cursor()
+        cursor.execute(create_schema_version)
+
+        if reset:
+            cursor.execute("SET FOREIGN_KEY_CHECKS = 0")
+            for name, _ in reversed(tables):
+                cursor.execute(f"DROP TABLE IF EXISTS {name}")
+            # the dropped tables took their indexes with them: re-run every migration
+            cursor.execute("DROP TABLE IF EXISTS schema_migrations")
+            cursor.execute("SET FOREIGN_KEY_CHECKS = 1")
+            cursor.execute("DELETE FROM schema_version")
+            print(f"dropped {len(tables)} tables")
+
+        cursor.execute("SELECT id, ddl_hash FROM schema_version")
+        applied = dict(cursor.fetchall())
+        cursor.execute(
+            "SELECT COUNT(*) FROM information_schema.tables WHERE table_schema = DATABASE() "
+            f"AND table_name IN ({', '.join(['%s'] * len(tables))})",
+            [name for name, _ in tables]
+        )
+        existing = cursor.fetchone()[0]
+
+        applied_tables = applied.get(TABLES_HASH_ID)
+        # tables created from older definitions: IF NOT EXISTS does not alter them
+        stale = applied_tables is not None and applied_tables != tables_hash and existing > 0
+
+        if (applied_tables == tables_hash and applied.get(TRIGGERS_HASH_ID) == triggers_hash
+                and existing == len(tables)):
+            print(f"schema up to date ({tables_hash[:12]} / {triggers_hash[:12]})")
+        else:
+            for name, statement in tables:
+                cursor.execute(statement)
+            for statement in triggers:
+                cursor.execute(statement)
+
+            record = [(TRIGGERS_HASH_ID, triggers_hash)]
+            if stale:
+                print(f"table definitions changed since {applied_tables[:12]}: "
+                      "existing tables were kept, use --reset to recreate them")
+            else:
+                record.append((TABLES_HASH_ID, tables_hash))
+            cursor.executemany(
+                "INSERT INTO schema_version (id, ddl_hash) VALUES (%s, %s) "
+                "ON DUPLICATE KEY UPDATE ddl_hash = VALUES(ddl_hash)",
+                record
+            )
+            print(f"schema applied: {len(tables)} tables, {len(triggers) // 2} triggers "
+                  f"({tables_hash[:12]} / {triggers_hash[:12]})")
+            conn.commit()
+
+    except Error as e:
+        print(f"bootstrap fail: {e}")
+        try:
+            conn.rollback()
+        except:
+            pass
+        return False
+
+    finally:
+        if cursor:
+            try:
+                cursor.close()
+            except:
+                pass
+        conn.close()
+
+    # versioned separately in schema_migrations; a no-op once applied
+    return migrate(db)
+
+
+if __name__ == "__main__":
+    db = DatabaseManager()
+    if not db.connect():
+        print("connect database fail")
+        sys.exit(1)
+
+    success = bootstrap(db, reset='--reset' in sys.argv[1:])
+    db.close()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,152 @@
+import hashlib
+import os
+import stat
+import tempfile
+from dataclasses import dataclass
+from functools import lru_cache
+
+from dotenv import load_dotenv
+
+
+@dataclass(frozen=True)
+class Settings:
+    """
+    Process-wide configuration, read once from config.env / the environment.
+    Use get_settings() instead of constructing this directly.
+    """
+
+    # MySQL
+    db_host: str
+    db_database: str
+    db_user: str
+    db_password: str
+    db_port: int
+    db_ssl_ca: str
+    db_ssl_verify_cert: bool
+
+    # connection pool (per process / gunicorn worker)
+    db_pool_size: int
+    db_pool_timeout: float
+    db_pool_max_idle: float
+    db_pool_ping_after: float
+
+    # rows per batch for streamed extracts (fetch_iter / read_chunks)
+    extract_chunk_size: int
+
+    # analysis
+    analysis_days: int
+    low_sales_threshold: int
+
+    # inventory snapshot cache (SNAPSHOT_CACHE_DIR shares it across workers)
+    snapshot_ttl: float
+    snapshot_cache_dir: str
+    # POST /api/cache/invalidate requires this in X-Admin-Token (unset: endpoint disabled)
+    cache_admin_token: str
+
+    # demand model artifacts (models/compiled is memory-mapped, loaded lazily)
+    model_dir: str
+    model_warm_up: bool
+    # versioned models (model_registry.py); serving polls for a new current version
+    model_registry_dir: str
+    model_poll_seconds: float
+    # LRU entries of demand predictions (prediction_cache.py); 0 disables it
+    prediction_cache_size: int
+    # single-row p95 latency a model must meet to be picked by tune_model.py
+    model_latency_slo_ms: float
+
+    # columnar training feature store (feature_store.py)
+    feature_store_dir: str
+
+    # external services
+    gemini_api_key: str
+    mongodb_uri: str
+    mongodb_name: str
+    collection_name: str
+
+    def mysql_config(self):
+        """Keyword arguments for mysql.connector.connect"""
+        config = {
+            'host': self.db_host,
+            'database': self.db_database,
+            'user': self.db_user,
+            'password': self.db_password,
+            'port': self.db_port,
+            'ssl_verify_cert': self.db_ssl_verify_cert,
+            'use_pure': True,
+            'autocommit': False
+        }
+        if self.db_ssl_ca:
+            config['ssl_ca'] = self.db_ssl_ca
+        return config
+
+
+def _write_ssl_ca(content):
+    """
+    Write the CA bundle once, named after its hash, to a directory only this user can access.
+    Restarts (and other workers) reuse the file only if it still holds exactly this bundle.
+    """
+    directory = os.path.join(tempfile.gettempdir(), f"warehouse-db-ca-{os.getuid()}")
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    info = os.lstat(directory)
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid() or info.st_mode & 0o077:
+        raise PermissionError(f"{directory} is not a private directory of this user")
+
+    digest = hashlib.sha256(content.encode('utf-8')).hexdigest()[:16]
+    path = os.path.join(directory, f"{digest}.pem")
+    try:
+        with open(path) as f:
+            if f.read() == content:
+                return path
+    except OSError:
+        pass
+
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.pem')
+    with os.fdopen(fd, 'w') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+    return path
+
+
+def get_settings(env_file='config.env'):
+    """Load config.env once and return the shared, immutable Settings"""
+    # one cache entry per file, however the path is spelled
+    return _load_settings(os.path.abspath(env_file))
+
+
+@lru_cache(maxsize=None)
+def _load_settings(env_file):
+    load_dotenv(env_file)
+
+    ssl_ca_content = os.environ.get('DB_SSL_CA_CONTENT')
+    ssl_ca = _write_ssl_ca(ssl_ca_content) if ssl_ca_content else None
+
+    return Settings(
+        db_host=os.environ.get('DB_HOST'),
+        db_database=os.environ.get('DB_DATABASE'),
+        db_user=os.environ.get('DB_USER'),
+        db_password=os.environ.get('DB_PASSWORD'),
+        db_port=int(os.environ.get('DB_PORT', 3306)),
+        db_ssl_ca=ssl_ca,
+        db_ssl_verify_cert=bool(os.environ.get('DB_SSL_VERIFY_CERT')),
+        db_pool_size=int(os.environ.get('DB_POOL_SIZE', 3)),
+        db_pool_timeout=float(os.environ.get('DB_POOL_TIMEOUT', 10)),
+        db_pool_max_idle=float(os.environ.get('DB_POOL_MAX_IDLE', 300)),
+        db_pool_ping_after=float(os.environ.get('DB_POOL_PING_AFTER', 10)),
+        extract_chunk_size=int(os.environ.get('EXTRACT_CHUNK_SIZE', 50000)),
+        analysis_days=int(os.environ.get('ANALYSIS_DAYS', 30)),
+        low_sales_threshold=int(os.environ.get('LOW_SALES_THRESHOLD', 10)),
+        snapshot_ttl=float(os.environ.get('SNAPSHOT_TTL_SECONDS', 300)),
+        snapshot_cache_dir=os.environ.get('SNAPSHOT_CACHE_DIR'),
+        cache_admin_token=os.environ.get('CACHE_ADMIN_TOKEN'),
+        model_dir=os.environ.get('MODEL_DIR', 'models'),
+        model_warm_up=bool(os.environ.get('MODEL_WARM_UP')),
+        model_registry_dir=os.environ.get('MODEL_REGISTRY_DIR', 'models/versions'),
+        model_poll_seconds=float(os.environ.get('MODEL_POLL_SECONDS', 30)),
+        prediction_cache_size=int(os.environ.get('PREDICTION_CACHE_SIZE', 100000)),
+        model_latency_slo_ms=float(os.environ.get('MODEL_LATENCY_SLO_MS', 1.0)),
+        feature_store_dir=os.environ.get('FEATURE_STORE_DIR', 'features'),
+        gemini_api_key=os.environ.get('GEMINI_API_KEY'),
+        mongodb_uri=os.environ.get('MONGODB_URI'),
+        mongodb_name=os.environ.get('MONGODB_NAME'),
+        collection_name=os.environ.get('COLLECTION_NAME'),
+    )
@@ -0,0 +1,125 @@
+import os
+import pickle
+import tempfile
+import threading
+import time
+
+
+class SnapshotCache:
+    """
+    TTL cache for one expensive dataset (e.g. the inventory snapshot).
+
+    - in-process: every caller in this worker shares the cached value
+    - cross-worker (optional): with cache_dir set, the value is also written to a
+      pickle file there so other gunicorn workers reuse it until it expires; every
+      read checks that file's mtime, so an invalidation (or a newer load) in one
+      worker reaches the others on their next read
+    - only one thread per process reloads at a time; a failed load (None) is not cached
+    """
+
+    def __init__(self, name, loader, ttl=300, cache_dir=None):
+        self.name = name
+        self.loader = loader
+        self.ttl = ttl
+        self.cache_dir = cache_dir
+
+        self._lock = threading.Lock()
+        self._value = None
+        self._loaded_at = 0.0
+        # mtime of the shared file our value came from / went to (None: not shared)
+        self._shared_mtime = None
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self):
+        return os.path.join(self.cache_dir, f"{self.name}.pkl")
+
+    def _fresh(self, loaded_at):
+        return time.time() - loaded_at < self.ttl
+
+    def _current(self):
+        """The cached value if it is still fresh and still the shared one, else None"""
+        if self._value is None or not self._fresh(self._loaded_at):
+            return None
+        if self._shared_mtime is not None:
+            try:
+                if os.path.getmtime(self._path()) != self._shared_mtime:
+                    return None
+            except OSError:
+                # removed by invalidate() in some worker
+                return None
+        return self._value
+
+    def _read_shared(self):
+        try:
+            path = self._path()
+            loaded_at = os.path.getmtime(path)
+            if not self._fresh(loaded_at):
+                return None, 0.0
+            with open(path, 'rb') as f:
+                return pickle.load(f), loaded_at
+        except (OSError, pickle.PickleError, EOFError):
+            return None, 0.0
+
+    def _write_shared(self, value):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self._path())
+            return os.path.getmtime(self._path())
+        except OSError as e:
+            print(f"Snapshot cache write failed: {e}")
+            return None
+
+    def get(self):
+        value = self._current()
+        if value is not None:
+            self.hits += 1
+            return value
+
+        with self._lock:
+            # another thread may have reloaded while we waited
+            value = self._current()
+            if value is not None:
+                self.hits += 1
+                return value
+
+            self._value, self._shared_mtime = None, None
+            if self.cache_dir:
+                value, loaded_at = self._read_shared()
+                if value is not None:
+                    self._value, self._loaded_at, self._shared_mtime = value, loaded_at, loaded_at
+                    self.hits += 1
+                    return value
+
+            self.misses += 1
+            value = self.loader()
+            if value is None:
+                return None
+
+            self._value, self._loaded_at = value, time.time()
+            if self.cache_dir:
+                self._shared_mtime = self._write_shared(value)
+            return value
+
+    def invalidate(self):
+        with self._lock:
+            self._value = None
+            self._loaded_at = 0.0
+            self._shared_mtime = None
+            if self.cache_dir:
+                try:
+                    os.remove(self._path())
+                except OSError:
+                    pass
+
+    def stats(self):
+        return {
+            'name': self.name,
+            'ttl': self.ttl,
+            'hits': self.hits,
+            'misses': self.misses,
+            'age_seconds': round(time.time() - self._loaded_at, 1) if self._value is not None else None,
+        }
@@ -0,0 +1,184 @@
+"""
+Summary tables that the analyzer reads instead of re-aggregating the raw tables.
+
+product_sell_through: per product/warehouse stock, supplied quantity, earliest
+supply time and sell-through rate. Kept up to date by INSERT/UPDATE/DELETE triggers
+on good_supply and store_records; rebuild_sell_through() recomputes it from scratch (backfill).
+
+daily_sales: units sold per product/warehouse/day, kept up to date by triggers on
+inform; rebuild_daily_sales() backfills it from inform/orders history.
+
+Bulk loaders can `SET @skip_summary_triggers = 1` for their session and rebuild
+once at the end instead of paying for a refresh per inserted row.
+"""
+from database import DatabaseManager
+
+
+# Recompute the summary row(s) matching `{where}` from the raw tables
+SELL_THROUGH_REFRESH = """
+INSERT INTO product_sell_through
+    (product_id, warehouse_id, supplier_id, stock_quantity, supply_quantity,
+     first_supply_time, sell_through_rate)
+SELECT
+    gs.product_id,
+    gs.warehouse_id,
+    MIN(gs.supplier_id),
+    MAX(sr.storequantity),
+    SUM(gs.quantity),
+    MIN(gs.supply_time),
+    ROUND((SUM(gs.quantity) - MAX(sr.storequantity)) / SUM(gs.quantity), 4)
+FROM good_supply gs
+LEFT JOIN store_records sr
+    ON gs.warehouse_id = sr.warehouse_id
+    AND gs.product_id = sr.product_id
+{where}
+GROUP BY gs.product_id, gs.warehouse_id
+ON DUPLICATE KEY UPDATE
+    supplier_id = VALUES(supplier_id),
+    stock_quantity = VALUES(stock_quantity),
+    supply_quantity = VALUES(supply_quantity),
+    first_supply_time = VALUES(first_supply_time),
+    sell_through_rate = VALUES(sell_through_rate)
+"""
+
+# Drop the summary row once the last supply row for a product/warehouse is gone
+SELL_THROUGH_PRUNE = """
+DELETE FROM product_sell_through
+WHERE product_id = {row}.product_id AND warehouse_id = {row}.warehouse_id
+    AND NOT EXISTS (
+        SELECT 1 FROM good_supply gs
+        WHERE gs.product_id = {row}.product_id AND gs.warehouse_id = {row}.warehouse_id
+    )
+"""
+
+# Add (sign=+1) or remove (sign=-1) one order line from its day's bucket.
+# The order row must exist before its lines for the trigger to find order_time.
+DAILY_SALES_APPLY = """
+INSERT INTO daily_sales (product_id, warehouse_id, sale_date, quantity)
+SELECT {row}.product_id, {row}.warehouse_id, DATE(o.order_time), {sign} * COALESCE({row}.orderquantity, 0)
+FROM orders o
+WHERE o.order_id = {row}.order_id
+ON DUPLICATE KEY UPDATE quantity = quantity + VALUES(quantity)
+"""
+
+DAILY_SALES_REBUILD = """
+INSERT INTO daily_sales (product_id, warehouse_id, sale_date, quantity)
+SELECT i.product_id, i.warehouse_id, DATE(o.order_time), SUM(i.orderquantity)
+FROM inform i
+JOIN orders o ON i.order_id = o.order_id
+{where}
+GROUP BY i.product_id, i.warehouse_id, DATE(o.order_time)
+"""
+
+TRIGGER_TEMPLATE = """
+CREATE TRIGGER {name} AFTER {event} ON {table}
+FOR EACH ROW
+BEGIN
+    IF @skip_summary_triggers IS NULL THEN
+        {body}
+    END IF;
+END
+"""
+
+
+def _refresh_for(row):
+    where = (f"WHERE gs.product_id = {row}.product_id "
+             f"AND gs.warehouse_id = {row}.warehouse_id")
+    return SELL_THROUGH_REFRESH.format(where=where).strip() + ";"
+
+
+def _prune_for(row):
+    return SELL_THROUGH_PRUNE.format(row=row).strip() + ";"
+
+
+def _if_key_changed(statements):
+    """Run `statements` only when an UPDATE moved the row to another product/warehouse"""
+    return ("IF NOT (OLD.product_id <=> NEW.product_id AND OLD.warehouse_id <=> NEW.warehouse_id) THEN\n"
+            + "\n".join(statements) + "\nEND IF;")
+
+
+def _daily_sales_for(row, sign):
+    return DAILY_SALES_APPLY.format(row=row, sign=sign).strip() + ";"
+
+
+# (trigger name, event, table, body statements)
+SELL_THROUGH_TRIGGERS = [
+    ('trg_good_supply_sell_through_ins', 'INSERT', 'good_supply', [_refresh_for('NEW')]),
+    ('trg_good_supply_sell_through_upd', 'UPDATE', 'good_supply',
+     [_refresh_for('NEW'), _refresh_for('OLD'), _prune_for('OLD')]),
+    ('trg_good_supply_sell_through_del', 'DELETE', 'good_supply', [_refresh_for('OLD'), _prune_for('OLD')]),
+    ('trg_store_records_sell_through_ins', 'INSERT', 'store_records', [_refresh_for('NEW')]),
+    ('trg_store_records_sell_through_upd', 'UPDATE', 'store_records',
+     [_refresh_for('NEW'), _if_key_changed([_refresh_for('OLD'), _prune_for('OLD')])]),
+    ('trg_store_records_sell_through_del', 'DELETE', 'store_records', [_refresh_for('OLD'), _prune_for('OLD')]),
+]
+
+DAILY_SALES_TRIGGERS = [
+    ('trg_inform_daily_sales_ins', 'INSERT', 'inform', [_daily_sales_for('NEW', 1)]),
+    ('trg_inform_daily_sales_upd', 'UPDATE', 'inform', [_daily_sales_for('OLD', -1), _daily_sales_for('NEW', 1)]),
+    ('trg_inform_daily_sales_del', 'DELETE', 'inform', [_daily_sales_for('OLD', -1)]),
+]
+
+
+def trigger_statements(triggers=None):
+    """DROP/CREATE statements for the summary triggers, one statement per string"""
+    statements = []
+    for name, event, table, body in (triggers or SELL_THROUGH_TRIGGERS + DAILY_SALES_TRIGGERS):
+        statements.append(f"DROP TRIGGER IF EXISTS {name}")
+        statements.append(TRIGGER_TEMPLATE.format(
+            name=name, event=event, table=table,
+            body="\n        ".join(body)
+        ).strip())
+    return statements
+
+
+def install_triggers(db):
+    """(Re)create all summary triggers"""
+    ok = True
+    for sql in trigger_statements():
+        ok = db.execute_sql(sql) and ok
+    return ok
+
+
+def rebuild_sell_through(db):
+    """Recompute product_sell_through from good_supply/store_records (backfill), in one transaction"""
+    return db.execute_transaction([
+        ("DELETE FROM product_sell_through", None),
+        (SELL_THROUGH_REFRESH.format(where=""), None),
+    ])
+
+
+def rebuild_daily_sales(db, since=None):
+    """
+    Backfill daily_sales from inform/orders history.
+    With `since` (a date) only days from that date on are recomputed.
+    DELETE and INSERT commit together, so readers never see the days emptied.
+    """
+    if since is None:
+        return db.execute_transaction([
+            ("DELETE FROM daily_sales", None),
+            (DAILY_SALES_REBUILD.format(where=""), None),
+        ])
+
+    return db.execute_transaction([
+        ("DELETE FROM daily_sales WHERE sale_date >= %s", (since,)),
+        (DAILY_SALES_REBUILD.format(where="WHERE o.order_time >= %s"), (since,)),
+    ])
+
+
+if __name__ == "__main__":
+    db = DatabaseManager()
+    if not db.connect():
+        print("connect database fail")
+        exit(1)
+
+    print("installing summary triggers...")
+    print("successful" if install_triggers(db) else "fail")
+
+    print("rebuilding product_sell_through...")
+    print("successful" if rebuild_sell_through(db) else "fail")
+
+    print("rebuilding daily_sales...")
+    print("successful" if rebuild_daily_sales(db) else "fail")
+
+    db.close()
@@ -0,0 +1,43 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# the modules live flat at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from encoders import CategoryEncoder  # noqa: E402
+from train_model import train_forest  # noqa: E402
+
+
+CATEGORIES = ['Beverages', 'Dairy', 'Snacks', 'Produce']
+WAREHOUSES = ['W00000001', 'W00000002', 'W00000003']
+
+
+def random_features(n, seed=0):
+    """Rows in FEATURE_COLUMNS order with integer time features, as serving sends them"""
+    rng = np.random.default_rng(seed)
+    return np.column_stack([
+        rng.integers(0, len(CATEGORIES), n),
+        np.round(rng.uniform(0.5, 50, n), 2),
+        rng.integers(0, 24, n),
+        rng.integers(1, 8, n),
+        rng.integers(1, 13, n),
+        rng.integers(0, len(WAREHOUSES), n),
+    ]).astype(np.float64)
+
+
+@pytest.fixture(scope='session')
+def encoders():
+    return (CategoryEncoder.fit(CATEGORIES, name='category'),
+            CategoryEncoder.fit(WAREHOUSES, name='warehouse'))
+
+
+@pytest.fixture(scope='session')
+def forest():
+    """A small forest fitted on a price/time-dependent demand curve"""
+    X = random_features(3000, seed=1)
+    rng = np.random.default_rng(2)
+    y = 20 / (1 + X[:, 1] / 10) + X[:, 0] + (X[:, 3] >= 6) * 2 + (X[:, 2] > 17) + rng.normal(0, 0.5, len(X))
+    return train_forest(X, y, n_estimators=10, max_depth=6, min_samples_split=2, min_samples_leaf=5, n_jobs=1)
@@ -0,0 +1,81 @@
+import pytest
+
+from model_store import ModelStore
+from train_model import save_model
+
+
+@pytest.fixture
+def client(forest, encoders, tmp_path, monkeypatch):
+    import app
+
+    save_model(forest, *encoders, str(tmp_path), with_surface=False)
+    monkeypatch.setattr(app, 'model_store', ModelStore(str(tmp_path)))
+    return app.app.test_client()
+
+
+def row(**overrides):
+    values = {'product_category': 'Dairy', 'warehouse_id': 'W00000002', 'price': 4.99,
+              'order_hour': 10, 'order_day': 3, 'order_month': 6}
+    values.update(overrides)
+    return values
+
+
+def test_rows_come_back_in_order_with_per_row_errors(client, forest, encoders):
+    rows = [
+        row(),
+        row(product_category='Frozen'),
+        row(warehouse_id='W99999999'),
+        {key: value for key, value in row().items() if key != 'price'},
+        row(order_hour=24),
+        row(order_day=2.5),
+        row(price='cheap'),
+        row(price=12.5, order_month=12),
+    ]
+    response = client.post('/api/predict-demand/batch', json={'rows': rows})
+    assert response.status_code == 200
+
+    body = response.get_json()
+    assert body['count'] == 8 and body['error_count'] == 6
+    assert [r.get('error') for r in body['results']] == [
+        None,
+        "unknown category: 'Frozen'",
+        "unknown warehouse: 'W99999999'",
+        'missing price',
+        'order_hour out of range',
+        'order_day out of range',
+        'price must be a number',
+        None,
+    ]
+
+    category_encoder, warehouse_encoder = encoders
+    expected = forest.predict([
+        [category_encoder.encode('Dairy'), 4.99, 10, 3, 6, warehouse_encoder.encode('W00000002')],
+        [category_encoder.encode('Dairy'), 12.5, 10, 3, 12, warehouse_encoder.encode('W00000002')],
+    ])
+    assert body['results'][0]['predicted_quantity'] == round(float(expected[0]), 1)
+    assert body['results'][7]['predicted_quantity'] == round(float(expected[1]), 1)
+
+
+def test_columns_layout(client):
+    rows = [row(), row(product_category='Frozen'), row(price=7.25)]
+    columns = {field: [r[field] for r in rows] for field in rows[0]}
+    response = client.post('/api/predict-demand/batch', json={'columns': columns})
+    assert response.status_code == 200
+
+    body = response.get_json()
+    assert body['errors'] == [None, "unknown category: 'Frozen'", None]
+    assert body['predicted_quantity'][1] is None
+    assert None not in (body['predicted_quantity'][0], body['predicted_quantity'][2])
+
+
+@pytest.mark.parametrize('payload, message', [
+    ([1, 2], "expected a JSON object with 'rows' or 'columns'"),
+    ({}, "expected 'rows' or 'columns'"),
+    ({'columns': {'price': [1.0]}}, 'missing columns'),
+    ({'rows': [row()] * 10001}, 'too many rows'),
+])
+def test_malformed_requests_are_rejected(client, payload, message):
+    response = client.post('/api/predict-demand/batch', json=payload)
+
+    assert response.status_code == 400
+    assert message in response.get_json()['error']
@@ -0,0 +1,49 @@
+from datetime import date
+
+import numpy as np
+import pytest
+
+import data_generator
+from data_generator import generate_dataset, plan_shards
+
+
+TODAY = date(2025, 1, 1)
+
+
+@pytest.fixture
+def small_shards(monkeypatch):
+    # several shards per table without generating hundreds of thousands of rows
+    monkeypatch.setattr(data_generator, 'SHARD_SIZES', {'users': 40, 'orders': 300})
+
+
+def assert_same_tables(left, right):
+    assert left.keys() == right.keys()
+    for table in left:
+        assert left[table].keys() == right[table].keys(), table
+        for column in left[table]:
+            assert np.array_equal(left[table][column], right[table][column]), f"{table}.{column}"
+
+
+def test_plan_shards_covers_every_row(small_shards):
+    shards = plan_shards(100, 1000)
+
+    for part, total in (('users', 100), ('orders', 1000)):
+        ranges = [(start, stop) for p, _, start, stop in shards if p == part]
+        assert ranges[0][0] == 0 and ranges[-1][1] == total
+        assert all(stop == next_start for (_, stop), (next_start, _) in zip(ranges, ranges[1:]))
+
+
+def test_shards_are_identical_for_any_worker_count(small_shards):
+    _, serial = generate_dataset(seed=7, users=100, orders=1000, products=30, suppliers=5,
+                                 workers=1, today=TODAY)
+    _, parallel = generate_dataset(seed=7, users=100, orders=1000, products=30, suppliers=5,
+                                   workers=3, today=TODAY)
+
+    assert_same_tables(serial, parallel)
+
+
+def test_different_seeds_give_different_orders(small_shards):
+    _, first = generate_dataset(seed=7, users=50, orders=300, products=30, suppliers=5, today=TODAY)
+    _, second = generate_dataset(seed=8, users=50, orders=300, products=30, suppliers=5, today=TODAY)
+
+    assert not np.array_equal(first['orders']['order_time'], second['orders']['order_time'])
@@ -0,0 +1,32 @@
+import numpy as np
+
+from conftest import random_features
+from demand_surface import build_surface, load_surface, save_surface
+
+
+def test_surface_lookup_matches_sklearn(forest, encoders, tmp_path):
+    save_surface(build_surface(forest, *encoders), str(tmp_path), model_sha256='test')
+    surface = load_surface(str(tmp_path), 'test', *encoders)
+    assert surface is not None
+
+    X = random_features(5000, seed=7)
+    # include prices exactly on the forest's price thresholds
+    X[:len(surface.price_thresholds), 1] = surface.price_thresholds
+
+    assert surface.covers(X[:, 2], X[:, 3], X[:, 4])
+    looked_up = surface.lookup(X[:, 0], X[:, 1], X[:, 2], X[:, 3], X[:, 4], X[:, 5])
+    assert np.array_equal(looked_up, forest.predict(X))
+
+
+def test_surface_is_rejected_for_another_model(forest, encoders, tmp_path):
+    save_surface(build_surface(forest, *encoders), str(tmp_path), model_sha256='test')
+
+    assert load_surface(str(tmp_path), 'other', *encoders) is None
+
+
+def test_surface_does_not_cover_fractional_hours(forest, encoders, tmp_path):
+    save_surface(build_surface(forest, *encoders), str(tmp_path), model_sha256='test')
+    surface = load_surface(str(tmp_path), 'test', *encoders)
+
+    assert not surface.covers([9.5], [3], [5])
+    assert not surface.covers([24], [3], [5])
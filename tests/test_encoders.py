@@ -0,0 +1,63 @@
+import joblib
+import numpy as np
+import pytest
+from sklearn.preprocessing import LabelEncoder
+
+from encoders import CategoryEncoder, load_encoder
+
+
+VALUES = ['Snacks', 'Dairy', 'Beverages', 'Dairy', 'Produce']
+
+
+def test_codes_match_label_encoder():
+    encoder = CategoryEncoder.fit(VALUES)
+    label_encoder = LabelEncoder().fit(VALUES)
+
+    assert list(encoder.classes_) == list(label_encoder.classes_)
+    assert encoder.encode_many(VALUES).tolist() == label_encoder.transform(VALUES).tolist()
+    assert [encoder.encode(v) for v in VALUES] == label_encoder.transform(VALUES).tolist()
+
+
+def test_round_trip():
+    encoder = CategoryEncoder.fit(VALUES)
+
+    assert [encoder.decode(encoder.encode(v)) for v in VALUES] == VALUES
+    assert list(encoder.decode(encoder.encode_many(VALUES))) == VALUES
+
+
+def test_round_trip_through_label_encoder_pickle(tmp_path):
+    encoder = CategoryEncoder.fit(VALUES, name='category')
+    path = tmp_path / 'category_encoder.pkl'
+    joblib.dump(encoder.to_label_encoder(), path)
+    loaded = load_encoder(str(path), 'category')
+
+    assert list(loaded.classes_) == list(encoder.classes_)
+    assert loaded.encode_many(VALUES).tolist() == encoder.encode_many(VALUES).tolist()
+
+
+def test_unknown_values_are_rejected():
+    encoder = CategoryEncoder.fit(VALUES, name='category')
+
+    with pytest.raises(ValueError, match="unknown category: 'Frozen'"):
+        encoder.encode('Frozen')
+    with pytest.raises(ValueError):
+        encoder.encode_many(['Dairy', 'Frozen'])
+    assert 'Frozen' not in encoder
+
+
+def test_unknown_values_with_value_policy():
+    encoder = CategoryEncoder.fit(VALUES, unknown='value', unknown_value=-1)
+
+    assert encoder.encode('Frozen') == -1
+    assert encoder.encode_many(['Dairy', 'Frozen']).tolist() == [1, -1]
+
+
+def test_encode_known_reports_unknown_rows():
+    encoder = CategoryEncoder.fit(VALUES)
+
+    codes, known = encoder.encode_known(['Dairy', 'Frozen', 'Snacks'])
+    assert codes.tolist() == [1, -1, 3]
+    assert known.tolist() == [True, False, True]
+
+    codes, known = encoder.encode_known(np.array([], dtype=str))
+    assert codes.shape == known.shape == (0,)
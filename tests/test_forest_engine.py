@@ -0,0 +1,41 @@
+import numpy as np
+
+from conftest import random_features
+from forest_engine import CompiledForest
+from model_store import COMPILED_MAX_ROWS, DemandModel
+
+
+def test_compiled_forest_matches_sklearn(forest):
+    X = random_features(2000, seed=3)
+    compiled = CompiledForest.from_sklearn(forest)
+
+    assert np.array_equal(compiled.predict(X), forest.predict(X))
+    assert np.array_equal(compiled.predict(X[:1]), forest.predict(X[:1]))
+
+
+def test_compiled_forest_matches_sklearn_on_split_thresholds(forest):
+    # prices exactly on (and next to) a split threshold take the same branch
+    compiled = CompiledForest.from_sklearn(forest)
+    tree = forest.estimators_[0].tree_
+    thresholds = tree.threshold[tree.feature == 1]
+    X = np.repeat(random_features(1, seed=4), 3 * len(thresholds), axis=0)
+    X[:, 1] = np.concatenate([thresholds, np.nextafter(thresholds, -np.inf), np.nextafter(thresholds, np.inf)])
+
+    assert np.array_equal(compiled.predict(X), forest.predict(X))
+
+
+def test_saved_compiled_forest_loads_memory_mapped(forest, tmp_path):
+    X = random_features(500, seed=5)
+    CompiledForest.from_sklearn(forest).save(str(tmp_path))
+    loaded = CompiledForest.load(str(tmp_path))
+
+    assert isinstance(loaded.value, np.memmap)
+    assert np.array_equal(loaded.predict(X), forest.predict(X))
+
+
+def test_demand_model_large_batches_match_small_ones(forest, encoders):
+    model = DemandModel(*encoders, CompiledForest.from_sklearn(forest), model=forest)
+    X = random_features(COMPILED_MAX_ROWS + 1, seed=6)
+
+    assert np.array_equal(model.predict(X), forest.predict(X))
+    assert np.array_equal(model.predict(X[:100]), forest.predict(X[:100]))
@@ -0,0 +1,44 @@
+import numpy as np
+
+from conftest import random_features
+from prediction_cache import PredictionCache
+
+
+def test_prices_are_quantized_to_cents(forest):
+    cache = PredictionCache(1000)
+    X = random_features(50, seed=8)
+    X[:, 1] += 0.004  # rounds back to the same cent
+
+    result = cache.predict(forest, X)
+    X[:, 1] = np.round(X[:, 1], 2)
+    assert np.array_equal(result, forest.predict(X))
+
+    # the same products again, a fraction of a cent apart: all hits
+    X[:, 1] -= 0.003
+    assert np.array_equal(cache.predict(forest, X), result)
+    assert cache.stats()['hits'] == 50
+
+
+def test_rows_with_fractional_time_features_are_not_cached(forest):
+    cache = PredictionCache(1000)
+    X = random_features(2, seed=9)
+    X[1] = X[0]
+    X[1, 2] += 0.5
+
+    result = cache.predict(forest, X)
+    assert np.array_equal(result, forest.predict(X))
+    assert cache.stats()['entries'] == 1
+    assert np.array_equal(cache.predict(forest, X), result)
+
+
+def test_cache_is_dropped_when_the_model_changes(forest):
+    class Constant:
+        def predict(self, X):
+            return np.full(len(X), 7.0)
+
+    cache = PredictionCache(1000)
+    X = random_features(10, seed=10)
+    cache.predict(forest, X)
+
+    assert np.all(cache.predict(Constant(), X) == 7.0)
+    assert cache.stats()['invalidations'] == 1
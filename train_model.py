@@ -2,123 +2,179 @@ import pandas as pd
 import numpy as np
 from sklearn.model_selection import train_test_split
 from sklearn.ensemble import RandomForestRegressor
-from sklearn.preprocessing import LabelEncoder
 from sklearn.metrics import mean_squared_error, r2_score, mean_absolute_error
 import joblib
 import os
-
-from ML_extract_data import ml_data
-
-# Create models folder if not exists
-if not os.path.exists('models'):
-    os.makedirs('models')
-    print("✓ Created 'models' folder")
-
-# Load data from CSV
-# Load data from CSV or database
-if os.path.exists('warehouse_data.csv'):
-    print("\n✓ Found existing CSV file, loading...")
-    df = pd.read_csv('warehouse_data.csv')
-else:
-    ml = ml_data()
-    df = ml.extract()
+import sys
+
+from ML_extract_data import ml_data, extract_from_files
+from demand_surface import build_surface, save_surface
+from encoders import CategoryEncoder
+from feature_store import TRAINING_COLUMNS, FeatureStore
+from model_registry import ModelRegistry
+from model_store import FEATURE_COLUMNS, export_model
+
+# Hyperparameters of the production forest
+MODEL_PARAMS = {
+    'n_estimators': 100,
+    'max_depth': 12,
+    'min_samples_split': 20,
+    'min_samples_leaf': 10,
+    'random_state': 42,
+    'n_jobs': -1
+}
+
+
+def load_training_data(dataset_dir=None):
+    """Generated dataset directory, warehouse_data.csv, or a MySQL extract"""
+    if dataset_dir:
+        print(f"\n✓ Loading generated dataset from {dataset_dir}...")
+        return extract_from_files(dataset_dir)
+    if os.path.exists('warehouse_data.csv'):
+        print("\n✓ Found existing CSV file, loading...")
+        return pd.read_csv('warehouse_data.csv')
     print("loading data from MySQL")
+    return ml_data().extract()
+
+
+def load_store_features(store, months=None):
+    """(X, y, category encoder, warehouse encoder) reading only the training columns"""
+    category_encoder, warehouse_encoder = store.fit_encoders(months)
+    df = store.frame([c for c in TRAINING_COLUMNS if c != 'order_time'], months)
+    X, y, _ = store.encode(df, category_encoder, warehouse_encoder)
+    return X, y, category_encoder, warehouse_encoder
+
+
+def fit_encoders(df):
+    # (same encoder class as serving, so the codes cannot drift)
+    category_encoder = CategoryEncoder.fit(df['product_category'], name='category')
+    warehouse_encoder = CategoryEncoder.fit(df['warehouse_id'], name='warehouse')
+    return category_encoder, warehouse_encoder
+
+
+def encode_features(df, category_encoder, warehouse_encoder):
+    """(X, y) in FEATURE_COLUMNS order"""
+    df = df.copy()
+    df['product_category_encoded'] = category_encoder.encode_many(df['product_category'])
+    df['warehouse_encoded'] = warehouse_encoder.encode_many(df['warehouse_id'])
+    return df[FEATURE_COLUMNS], df['orderquantity']
+
+
+def train_forest(X, y, **params):
+    model = RandomForestRegressor(**{**MODEL_PARAMS, **params})
+    model.fit(X, y)
+    return model
 
-# Feature Engineering
-print("\n" + "="*60)
-print("Feature Engineering...")
-print("="*60)
-
-# Encode categorical variables
-le_category = LabelEncoder()
-le_warehouse = LabelEncoder()
-
-df['product_category_encoded'] = le_category.fit_transform(df['product_category'])
-df['warehouse_encoded'] = le_warehouse.fit_transform(df['warehouse_id'])
-
-# Select features for training
-feature_columns = [
-    'product_category_encoded',
-    'price',
-    'order_hour',
-    'order_day',
-    'order_month',
-    'warehouse_encoded'
-]
-
-X = df[feature_columns]
-y = df['orderquantity']
-
-
-# Split data
-X_train, X_test, y_train, y_test = train_test_split(
-    X, y, test_size=0.2, random_state=42
-)
-
-# Train model
-print("\n" + "="*60)
-print("Training Random Forest model...")
-print("="*60)
-
-model = RandomForestRegressor(
-    n_estimators=100,
-    max_depth=12,
-    min_samples_split=20,
-    min_samples_leaf=10,
-    random_state=42,
-    n_jobs=-1
-)
-
-model.fit(X_train, y_train)
-print("✓ Model trained successfully!")
-
-# Evaluate model
-print("\n" + "="*60)
-print("Model Evaluation:")
-print("="*60)
-
-y_pred_train = model.predict(X_train)
-y_pred_test = model.predict(X_test)
-
-train_rmse = np.sqrt(mean_squared_error(y_train, y_pred_train))
-test_rmse = np.sqrt(mean_squared_error(y_test, y_pred_test))
-train_r2 = r2_score(y_train, y_pred_train)
-test_r2 = r2_score(y_test, y_pred_test)
-test_mae = mean_absolute_error(y_test, y_pred_test)
-
-print(f"Training RMSE: {train_rmse:.3f}")
-print(f"Test RMSE: {test_rmse:.3f}")
-print(f"Training R²: {train_r2:.3f}")
-print(f"Test R²: {test_r2:.3f}")
-print(f"Test MAE: {test_mae:.3f}")
-
-# Feature importance
-print("\n" + "="*60)
-print("Feature Importance:")
-print("="*60)
-feature_importance = pd.DataFrame({
-    'feature': feature_columns,
-    'importance': model.feature_importances_
-}).sort_values('importance', ascending=False)
-
-print(feature_importance)
-
-# Save model and encoders
-print("\n" + "="*60)
-print("Saving model...")
-print("="*60)
-
-joblib.dump(model, 'models/demand_forecast_model.pkl', compress=3)
-joblib.dump(le_category, 'models/category_encoder.pkl')
-joblib.dump(le_warehouse, 'models/warehouse_encoder.pkl')
-joblib.dump(feature_columns, 'models/feature_columns.pkl')
-
-# Check model file size
-model_size = os.path.getsize('models/demand_forecast_model.pkl') / (1024 * 1024)
-print(f"✓ Model saved: {model_size:.2f} MB")
-print("✓ Encoders saved")
-
-print("\n" + "="*60)
-print("Step 2 Complete!")
-print("="*60)
-print("\nNext: Create Flask API for predictions")
\ No newline at end of file
+
+def evaluate(model, X, y):
+    y_pred = model.predict(X)
+    return {
+        'rmse': float(np.sqrt(mean_squared_error(y, y_pred))),
+        'r2': float(r2_score(y, y_pred)),
+        'mae': float(mean_absolute_error(y, y_pred)),
+        'rows': int(len(y)),
+    }
+
+
+def save_model(model, category_encoder, warehouse_encoder, model_dir='models', with_surface=True):
+    """Pickles, the memory-mappable serving copy and (optionally) the demand surface"""
+    os.makedirs(model_dir, exist_ok=True)
+    model_path = os.path.join(model_dir, 'demand_forecast_model.pkl')
+
+    joblib.dump(model, model_path, compress=3)
+    joblib.dump(category_encoder.to_label_encoder(), os.path.join(model_dir, 'category_encoder.pkl'))
+    joblib.dump(warehouse_encoder.to_label_encoder(), os.path.join(model_dir, 'warehouse_encoder.pkl'))
+    joblib.dump(FEATURE_COLUMNS, os.path.join(model_dir, 'feature_columns.pkl'))
+
+    # Memory-mappable copy for serving (models/compiled)
+    export_model(model, category_encoder, warehouse_encoder, model_dir)
+
+    if with_surface:
+        # Precompute the demand surface for serving (array lookups instead of model.predict)
+        surface = build_surface(model, category_encoder, warehouse_encoder)
+        save_surface(surface, os.path.join(model_dir, 'demand_surface'), model_path=model_path)
+
+    return model_path
+
+
+if __name__ == "__main__":
+    # Create models folder if not exists
+    if not os.path.exists('models'):
+        os.makedirs('models')
+        print("✓ Created 'models' folder")
+
+    # Load data from a generated dataset directory, the feature store, CSV or database
+    store = FeatureStore()
+    if len(sys.argv) == 1 and store.rows:
+        print(f"\n✓ Loading features from {store.path} ({store.rows:,} rows)...")
+        X, y, category_encoder, warehouse_encoder = load_store_features(store)
+    else:
+        df = load_training_data(sys.argv[1] if len(sys.argv) > 1 else None)
+
+        # Feature Engineering
+        print("\n" + "="*60)
+        print("Feature Engineering...")
+        print("="*60)
+
+        # Encode categorical variables
+        category_encoder, warehouse_encoder = fit_encoders(df)
+        X, y = encode_features(df, category_encoder, warehouse_encoder)
+
+    # Split data
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=0.2, random_state=42
+    )
+
+    # Train model
+    print("\n" + "="*60)
+    print("Training Random Forest model...")
+    print("="*60)
+
+    model = train_forest(X_train, y_train)
+    print("✓ Model trained successfully!")
+
+    # Evaluate model
+    print("\n" + "="*60)
+    print("Model Evaluation:")
+    print("="*60)
+
+    train_metrics = evaluate(model, X_train, y_train)
+    test_metrics = evaluate(model, X_test, y_test)
+
+    print(f"Training RMSE: {train_metrics['rmse']:.3f}")
+    print(f"Test RMSE: {test_metrics['rmse']:.3f}")
+    print(f"Training R²: {train_metrics['r2']:.3f}")
+    print(f"Test R²: {test_metrics['r2']:.3f}")
+    print(f"Test MAE: {test_metrics['mae']:.3f}")
+
+    # Feature importance
+    print("\n" + "="*60)
+    print("Feature Importance:")
+    print("="*60)
+    feature_importance = pd.DataFrame({
+        'feature': FEATURE_COLUMNS,
+        'importance': model.feature_importances_
+    }).sort_values('importance', ascending=False)
+
+    print(feature_importance)
+
+    # Save model and encoders
+    print("\n" + "="*60)
+    print("Saving model...")
+    print("="*60)
+
+    model_path = save_model(model, category_encoder, warehouse_encoder)
+
+    # Check model file size
+    model_size = os.path.getsize(model_path) / (1024 * 1024)
+    print(f"✓ Model saved: {model_size:.2f} MB")
+    print("✓ Encoders, compiled model and demand surface saved")
+
+    # Serving follows the registry's current version: register and promote this one
+    version = ModelRegistry().import_dir('models', metrics={'holdout': test_metrics, 'source': 'train_model'})
+    print(f"✓ Registered as {version}")
+
+    print("\n" + "="*60)
+    print("Step 2 Complete!")
+    print("="*60)
+    print("\nNext: Create Flask API for predictions")
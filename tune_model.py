@@ -0,0 +1,227 @@
+"""
+Hyperparameter search for the demand forest, scored on accuracy and serving cost.
+
+Candidate configurations are trained in a process pool until the wall-clock
+budget runs out; candidates still training then are stopped. Each finished
+candidate gets
+  - holdout RMSE / MAE / R² (same 80/20 split as train_model.py)
+  - single-row p50/p95 and 1,000-row batch latency of the serving predictor
+    (forest_engine.CompiledForest, what model_store falls back to when the
+    demand surface does not cover a request)
+  - artifact size: compressed pickle and compiled node arrays
+
+Latency is measured after the pool has finished, one candidate at a time, so
+training processes do not skew the timings. The best candidate is the one with
+the lowest holdout RMSE whose single-row p95 meets the SLO
+(MODEL_LATENCY_SLO_MS, or --slo-ms).
+
+    python tune_model.py --budget 600 --workers 4
+    python tune_model.py dataset/ --budget 300 --save   # also save the winner and make it current
+"""
+import argparse
+import io
+import itertools
+import json
+import multiprocessing
+import os
+import queue
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+import joblib
+import numpy as np
+from sklearn.model_selection import train_test_split
+
+from feature_store import FeatureStore
+from forest_engine import CompiledForest
+from model_registry import ModelRegistry
+from settings import get_settings
+from train_model import (encode_features, evaluate, fit_encoders, load_store_features, load_training_data,
+                         save_model, train_forest)
+
+
+SEARCH_SPACE = {
+    'n_estimators': [25, 50, 100, 200],
+    'max_depth': [6, 8, 10, 12, 16],
+    'min_samples_leaf': [5, 10, 20],
+}
+
+RESULTS_FILE = 'models/tuning_results.json'
+LATENCY_REPEAT = 200
+BATCH_ROWS = 1000
+
+# set in each pool worker by _init_worker (sent once per process, not per task)
+_data = None
+
+
+def candidates(space=SEARCH_SPACE, seed=0):
+    """Every combination of the search space, in random order"""
+    grid = [dict(zip(space, values)) for values in itertools.product(*space.values())]
+    random.Random(seed).shuffle(grid)
+    return grid
+
+
+def _init_worker(X_train, y_train, X_test, y_test):
+    global _data
+    _data = (X_train, y_train, X_test, y_test)
+
+
+def _fit_candidate(params, out_dir):
+    """Pool task: fit one configuration, score it, keep the model on disk for timing"""
+    X_train, y_train, X_test, y_test = _data
+    started = time.perf_counter()
+    model = train_forest(X_train, y_train, **params, n_jobs=1)
+    fit_seconds = time.perf_counter() - started
+
+    path = os.path.join(out_dir, '-'.join(f"{k}={v}" for k, v in params.items()) + '.pkl')
+    joblib.dump(model, path)
+    return {
+        'params': params,
+        'fit_seconds': round(fit_seconds, 2),
+        'holdout': evaluate(model, X_test, y_test),
+        'model_path': path,
+    }
+
+
+def measure_serving(model, X):
+    """Latency of the compiled serving predictor and the artifact sizes"""
+    forest = CompiledForest.from_sklearn(model)
+    rows = np.asarray(X, dtype=np.float64)
+
+    single = []
+    for i in range(LATENCY_REPEAT):
+        row = rows[i % len(rows)].reshape(1, -1)
+        started = time.perf_counter()
+        forest.predict(row)
+        single.append(time.perf_counter() - started)
+
+    batch = rows[:BATCH_ROWS]
+    started = time.perf_counter()
+    for _ in range(5):
+        forest.predict(batch)
+    batch_seconds = (time.perf_counter() - started) / 5
+
+    pickled = io.BytesIO()
+    joblib.dump(model, pickled, compress=3)
+
+    return {
+        'single_p50_ms': round(float(np.percentile(single, 50)) * 1e3, 4),
+        'single_p95_ms': round(float(np.percentile(single, 95)) * 1e3, 4),
+        'batch_ms': round(batch_seconds * 1e3, 3),
+        'batch_rows': len(batch),
+        'pickle_mb': round(len(pickled.getvalue()) / 1024 ** 2, 3),
+        'compiled_mb': round(sum(getattr(forest, name).nbytes for name in
+                                 ('feature', 'threshold', 'children', 'value', 'missing_left', 'roots'))
+                             / 1024 ** 2, 3),
+        'nodes': int(len(forest.value)),
+    }
+
+
+def search(X_train, y_train, X_test, y_test, budget, workers, slo_ms, space=SEARCH_SPACE):
+    """Run the search; returns (results sorted by holdout RMSE, best result or None)"""
+    out_dir = tempfile.mkdtemp(prefix='tune-')
+    deadline = time.monotonic() + budget
+    results = []
+
+    finished = queue.Queue()
+    pool = multiprocessing.Pool(workers, initializer=_init_worker, initargs=(X_train, y_train, X_test, y_test))
+    try:
+        grid = candidates(space)
+        for params in grid:
+            pool.apply_async(_fit_candidate, (params, out_dir),
+                             callback=finished.put, error_callback=finished.put)
+
+        for done in range(len(grid)):
+            try:
+                result = finished.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                print(f"Budget of {budget:.0f}s used up: {len(grid) - done} candidates stopped")
+                break
+            if isinstance(result, Exception):
+                print(f"Candidate failed - {result}")
+                continue
+            results.append(result)
+            print(f"  {result['params']}: RMSE {result['holdout']['rmse']:.4f} ({result['fit_seconds']}s)")
+    finally:
+        # stops the candidates still training, so the budget is a hard limit
+        pool.terminate()
+        pool.join()
+
+    try:
+        print(f"\nMeasuring serving latency of {len(results)} candidates...")
+        for result in results:
+            model = joblib.load(result.pop('model_path'))
+            result['serving'] = measure_serving(model, X_test)
+            result['meets_slo'] = result['serving']['single_p95_ms'] <= slo_ms
+    finally:
+        shutil.rmtree(out_dir, ignore_errors=True)
+
+    results.sort(key=lambda r: r['holdout']['rmse'])
+    best = next((r for r in results if r['meets_slo']), None)
+    return results, best
+
+
+def print_results(results, best, slo_ms):
+    print("\n" + "=" * 100)
+    print(f"{'trees':>5} {'depth':>5} {'leaf':>4} {'RMSE':>8} {'MAE':>8} {'R²':>7} "
+          f"{'p50 ms':>8} {'p95 ms':>8} {'batch ms':>9} {'pkl MB':>7} {'npy MB':>7}  SLO")
+    print("=" * 100)
+    for r in results:
+        p, h, s = r['params'], r['holdout'], r['serving']
+        marker = ' <- best' if r is best else ''
+        print(f"{p['n_estimators']:>5} {p['max_depth']:>5} {p['min_samples_leaf']:>4} "
+              f"{h['rmse']:>8.4f} {h['mae']:>8.4f} {h['r2']:>7.4f} "
+              f"{s['single_p50_ms']:>8.3f} {s['single_p95_ms']:>8.3f} {s['batch_ms']:>9.2f} "
+              f"{s['pickle_mb']:>7.2f} {s['compiled_mb']:>7.2f}  {'ok' if r['meets_slo'] else 'no'}{marker}")
+    if best is None:
+        print(f"\n✗ No candidate meets the {slo_ms} ms single-row p95 SLO")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Hyperparameter search for the demand model")
+    parser.add_argument('dataset_dir', nargs='?', help="generated dataset (default: feature store / CSV / MySQL)")
+    parser.add_argument('--budget', type=float, default=600, help="wall-clock seconds for training candidates")
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--slo-ms', type=float, default=None, help="single-row p95 latency SLO")
+    parser.add_argument('--save', action='store_true', help="retrain the best configuration and save it")
+    args = parser.parse_args()
+
+    slo_ms = args.slo_ms if args.slo_ms is not None else get_settings().model_latency_slo_ms
+
+    store = FeatureStore()
+    if args.dataset_dir is None and store.rows:
+        X, y, category_encoder, warehouse_encoder = load_store_features(store)
+    else:
+        df = load_training_data(args.dataset_dir)
+        category_encoder, warehouse_encoder = fit_encoders(df)
+        X, y = encode_features(df, category_encoder, warehouse_encoder)
+
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+    print(f"Searching {len(candidates())} configurations on {len(X_train):,} rows "
+          f"({args.workers} workers, {args.budget:.0f}s budget, SLO p95 <= {slo_ms} ms)")
+
+    started = time.perf_counter()
+    results, best = search(X_train, y_train, X_test, y_test, args.budget, args.workers, slo_ms)
+    print_results(results, best, slo_ms)
+    print(f"\nSearch took {time.perf_counter() - started:.1f}s")
+
+    os.makedirs(os.path.dirname(RESULTS_FILE), exist_ok=True)
+    with open(RESULTS_FILE, 'w') as f:
+        json.dump({'slo_ms': slo_ms, 'budget': args.budget, 'best': best, 'results': results}, f, indent=2)
+    print(f"✓ Results saved to {RESULTS_FILE}")
+
+    if best is None:
+        sys.exit(1)
+
+    print(f"\nBest within SLO: {best['params']}")
+    if args.save:
+        model = train_forest(X, y, **best['params'])
+        save_model(model, category_encoder, warehouse_encoder)
+        print("✓ Best configuration trained on all rows and saved to models/")
+        # serving follows the registry's current version, not models/
+        version = ModelRegistry().import_dir('models', metrics={
+            'holdout': best['holdout'], 'serving': best['serving'], 'source': 'tune_model'})
+        print(f"✓ Registered as {version}")